@@ -1,17 +1,22 @@
-from flask import Flask, request, jsonify
+import json
+from contextlib import ExitStack
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from app import PersonalAssistant
+from assistant.admission import Overloaded
+from assistant.metrics import collect_metrics
+from assistant.retention import start_retention_worker
+from assistant.session_manager import get_session_manager
 
 app = Flask(__name__)
 CORS(app)
 
-# Cache assistants per session to maintain conversation history
-assistants = {}
-
+# Database, plugins, skills and LLM clients are shared; each session only
+# keeps its history and the reminders waiting to be fetched
 def get_assistant(session_id):
-    if session_id not in assistants:
-        assistants[session_id] = PersonalAssistant(mode="text")
-    return assistants[session_id]
+    return get_session_manager().get(session_id)
+
+def too_many_requests(error):
+    return jsonify({"error": str(error)}), 429, {"Retry-After": str(error.retry_after)}
 
 @app.route('/api/health', methods=['GET'])
 def health():
@@ -24,23 +29,65 @@ def command():
         return jsonify({"error": "Missing command or session_id"}), 400
     cmd = data['command']
     session_id = data['session_id']
-    assistant = get_assistant(session_id)
-    response = assistant.ai_core.process_command(cmd)
+    # One command per session at a time, and a bounded number overall
+    try:
+        with get_session_manager().serve(session_id) as assistant:
+            response = assistant.ai_core.process_command(cmd)
+    except Overloaded as e:
+        return too_many_requests(e)
     return jsonify({"response": response})
 
+@app.route('/api/command/stream', methods=['POST'])
+def command_stream():
+    data = request.get_json()
+    if not data or 'command' not in data or 'session_id' not in data:
+        return jsonify({"error": "Missing command or session_id"}), 400
+    cmd = data['command']
+    # Held until the response is closed, so the stream counts as in flight
+    turn = ExitStack()
+    try:
+        assistant = turn.enter_context(get_session_manager().serve(data['session_id']))
+    except Overloaded as e:
+        return too_many_requests(e)
+
+    ai_core = assistant.ai_core
+    stream = ai_core.process_command_stream(cmd)
+    # Closed before the session is released, so a client that disconnects
+    # early still gets its partial reply saved
+    turn.callback(stream.close)
+
+    # Server-sent events: one {"delta": ...} per piece, then {"done": true, "ttft": ...}
+    def events():
+        for piece in stream:
+            yield f"data: {json.dumps({'delta': piece})}\n\n"
+        yield f"data: {json.dumps({'done': True, 'ttft': getattr(ai_core, 'last_ttft', None)})}\n\n"
+
+    response = Response(events(), mimetype='text/event-stream',
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(turn.close)
+    return response
+
 @app.route('/api/history/<session_id>', methods=['GET'])
 def history(session_id):
     assistant = get_assistant(session_id)
     # Return the raw conversation history (list of dicts)
     return jsonify(assistant.ai_core.conversation_history)
 
+@app.route('/api/reminders/<session_id>', methods=['GET'])
+def reminders(session_id):
+    # Drain reminders that fired since the last call
+    return jsonify(get_session_manager().drain_reminders(session_id))
+
 @app.route('/api/plugins', methods=['GET'])
 def plugins():
-    # Use a dummy session to get plugin list
-    assistant = get_assistant("dummy")
-    plugins = assistant.plugin_registry.get_all_plugins()
+    plugins = get_session_manager().plugin_registry.get_all_plugins()
     plugin_list = [{"name": p.get_name(), "description": p.get_description()} for p in plugins]
     return jsonify(plugin_list)
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return jsonify(collect_metrics())
+
 if __name__ == '__main__':
+    retention_worker = start_retention_worker()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -3,6 +3,7 @@ import os
 import json
 from datetime import datetime
 import hashlib
+import functools
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -45,9 +46,11 @@ try:
     from assistant.database import Database
     from assistant.plugin_registry import PluginRegistry
     from assistant.skills import Skills
+    from config.settings import Settings
 except ImportError as e:
     print(f"Import error: {e}")
     print("Creating fallback classes...")
+    Settings = None
     class Skills:
         def get_time_date(self):
             from datetime import datetime
@@ -63,8 +66,12 @@ except ImportError as e:
     class AICore:
         def process_command(self, text):
             return "AI Core not available. Check imports."
+        def process_command_stream(self, text):
+            yield self.process_command(text)
+        async def process_command_async(self, text):
+            return self.process_command(text)
     class Database:
-        def __init__(self, db_path="assistant.db"):
+        def __init__(self, db_path="assistant.db", **kwargs):
             pass
         def save_conversation(self, *args, **kwargs): pass
         def get_conversation_history(self, *args, **kwargs): return []
@@ -75,13 +82,18 @@ except ImportError as e:
         def get_due_reminders(self, *args, **kwargs): return []
         def mark_reminder_completed(self, *args, **kwargs): pass
         def get_all_reminders(self, *args, **kwargs): return []
+        def get_open_reminders(self, *args, **kwargs): return []
+        def add_reminder_listener(self, *args, **kwargs): pass
+        def remove_reminder_listener(self, *args, **kwargs): pass
     class PluginRegistry:
         def __init__(self, database=None): self._plugins = {}
         def register(self, plugin): pass
         def auto_discover(self): pass
         def get_all_plugins(self): return []
 
+@functools.lru_cache(maxsize=None)
 def get_user_identifier():
+    """This machine's user, kept in user_config.json; read (or created) once per process."""
     config_file = "user_config.json"
     if os.path.exists(config_file):
         try:
@@ -108,13 +120,19 @@ def get_user_identifier():
     return user_id
 
 class PersonalAssistant:
-    def __init__(self, mode: str = "text", reminder_callback=None):
+    def __init__(self, mode: str = "text", reminder_callback=None, session_id=None, user_identifier=None):
+        """
+        ``session_id`` (or a ``user_identifier`` to derive it from) picks whose
+        history, notes and reminders are used; user_config.json is only
+        consulted when neither is given.
+        """
         self.mode = mode
         self.reminder_callback = reminder_callback
-        user_identifier = get_user_identifier()
-        session_id = hashlib.md5(user_identifier.encode()).hexdigest()[:16]
+        if not session_id:
+            user_identifier = user_identifier or get_user_identifier()
+            session_id = hashlib.md5(user_identifier.encode()).hexdigest()[:16]
 
-        self.database = Database()
+        self.database = Database(settings_ttl=getattr(Settings, "SETTINGS_CACHE_TTL", 0) or None)
         self.plugin_registry = PluginRegistry(database=self.database)
         self.plugin_registry.auto_discover()
 
@@ -147,74 +165,30 @@ class PersonalAssistant:
         print("-"*50)
 
     def start_reminder_checker(self):
-        if not hasattr(self, 'skills') or not self.skills:
+        if not hasattr(self, 'skills') or not self.skills or not self.skills.database:
             return
-        import threading
-        import time
-        def check_loop():
-            while True:
-                try:
-                    if self.skills and self.skills.database:
-                        session_id = getattr(self.skills, 'session_id', 'default_session')
-                        overdue = self.skills.database.get_due_reminders(session_id)
-                        if overdue:
-                            for reminder in overdue:
-                                reminder_text = reminder.get('reminder_text', 'Unknown reminder')
-                                if self.reminder_callback:
-                                    self.reminder_callback(reminder_text)
-                                elif self.mode == "voice" and self.speech:
-                                    self.speech.speak(f"Reminder: {reminder_text}")
-                                else:
-                                    print(f"\nREMINDER: {reminder_text}\n")
-                                if 'id' in reminder:
-                                    self.skills.database.mark_reminder_completed(reminder['id'])
-                except Exception as e:
-                    print(f"Reminder checker error: {e}")
-                time.sleep(5)
-        thread = threading.Thread(target=check_loop, daemon=True)
-        thread.start()
-        print("Background reminder checker started")
+        from assistant.reminder_scheduler import get_reminder_scheduler
+        # One scheduler thread per database serves every assistant in the process
+        self.reminder_scheduler = get_reminder_scheduler(self.skills.database)
+        session_id = getattr(self.skills, 'session_id', 'default_session')
+        self.reminder_scheduler.subscribe(session_id, self._deliver_reminder)
+        print("Background reminder scheduler started")
+
+    def _deliver_reminder(self, reminder):
+        reminder_text = reminder.get('reminder_text', 'Unknown reminder')
+        if self.reminder_callback:
+            self.reminder_callback(reminder_text)
+        elif self.mode == "voice" and self.speech:
+            self.speech.speak(f"Reminder: {reminder_text}")
+        else:
+            print(f"\nREMINDER: {reminder_text}\n")
 
     def _register_skill_plugins(self):
         try:
-            from assistant.plugins.web_search_plugin import WebSearchPlugin
-            from assistant.plugins.reminder_plugin import ReminderPlugin, CheckRemindersPlugin
-            from assistant.plugins.time_plugin import TimePlugin
-            from assistant.plugins.news_plugin import NewsPlugin
-            from assistant.plugins.weather_plugin import WeatherPlugin
-            from assistant.plugins.file_organizer import FileOrganizerPlugin
-            from assistant.plugins.calculator import CalculatorPlugin
-            from assistant.plugins.system_info_plugin import SystemInfoPlugin
-            from assistant.plugins.notes_plugin import SaveNotePlugin, ListNotesPlugin, GetNotePlugin, DeleteNotePlugin
-
-            web_search_plugin = WebSearchPlugin()
-            self.plugin_registry.register(web_search_plugin)
-            reminder_plugin = ReminderPlugin(database=self.database, session_id=self.ai_core.session_id)
-            check_plugin = CheckRemindersPlugin(database=self.database, session_id=self.ai_core.session_id)
-            time_plugin = TimePlugin()
-            news_plugin = NewsPlugin(skills=self.skills)
-            weather_plugin = WeatherPlugin()
-            file_plugin = FileOrganizerPlugin()
-            calculator_plugin = CalculatorPlugin(skills=self.skills)
-            system_info_plugin = SystemInfoPlugin()
-            save_note_plugin = SaveNotePlugin(database=self.database, session_id=self.ai_core.session_id)
-            list_notes_plugin = ListNotesPlugin(database=self.database, session_id=self.ai_core.session_id)
-            get_note_plugin = GetNotePlugin(database=self.database, session_id=self.ai_core.session_id)
-            delete_note_plugin = DeleteNotePlugin(database=self.database, session_id=self.ai_core.session_id)
-
-            self.plugin_registry.register(reminder_plugin)
-            self.plugin_registry.register(check_plugin)
-            self.plugin_registry.register(time_plugin)
-            self.plugin_registry.register(news_plugin)
-            self.plugin_registry.register(weather_plugin)
-            self.plugin_registry.register(file_plugin)
-            self.plugin_registry.register(calculator_plugin)
-            self.plugin_registry.register(system_info_plugin)
-            self.plugin_registry.register(save_note_plugin)
-            self.plugin_registry.register(list_notes_plugin)
-            self.plugin_registry.register(get_note_plugin)
-            self.plugin_registry.register(delete_note_plugin)
-
+            from assistant.plugins import create_default_plugins
+            for plugin in create_default_plugins(database=self.database, skills=self.skills,
+                                                 session_id=self.ai_core.session_id):
+                self.plugin_registry.register(plugin)
             print("Registered skill-based plugins")
         except ImportError as e:
             print(f"Could not register skill plugins: {e}")
@@ -261,8 +235,13 @@ class PersonalAssistant:
                     elif user_input.lower() == 'plugins':
                         self.show_plugins()
                         continue
-                    response = self.ai_core.process_command(user_input)
-                    print(f"Assistant: {response}")
+                    print("Assistant: ", end="", flush=True)
+                    pieces = []
+                    for piece in self.ai_core.process_command_stream(user_input):
+                        print(piece, end="", flush=True)
+                        pieces.append(piece)
+                    print()
+                    response = "".join(pieces)
                     if self.mode == "voice" and self.speech:
                         self.speech.speak(response)
                 except KeyboardInterrupt:
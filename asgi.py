@@ -0,0 +1,258 @@
+"""
+ASGI entry point for the HTTP API.
+
+Serves the routes of api.py without Flask or any other framework. Commands
+go through AICore.process_command_async and process_command_stream_async,
+so a request waiting on the model holds a coroutine instead of a thread
+and one worker can keep hundreds of them in flight. Blocking work
+(building a session, reading history) runs on the default thread pool.
+Like api.py, a session's commands run one at a time and a saturated
+server answers 429 with Retry-After.
+
+Run it with any ASGI server, for example:
+    uvicorn asgi:app --port 5000
+"""
+import asyncio
+import json
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from assistant.admission import Overloaded
+from assistant.metrics import collect_metrics
+from assistant.retention import start_retention_worker
+from assistant.session_manager import get_session_manager
+
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Handler = Callable[[Receive, Send, str], Awaitable[None]]
+
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+MISSING_FIELDS = {"error": "Missing command or session_id"}
+
+
+def get_assistant(session_id: str):
+    return get_session_manager().get(session_id)
+
+
+async def read_json(receive: Receive) -> Optional[Any]:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def send_json(send: Send, status: int, payload: Any, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())] + CORS_HEADERS + (headers or [])
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def too_many_requests(send: Send, error: Overloaded):
+    await send_json(send, 429, {"error": str(error)}, headers=[(b"retry-after", str(error.retry_after).encode())])
+
+
+async def read_command(receive: Receive) -> Optional[Tuple[str, str]]:
+    data = await read_json(receive)
+    if not isinstance(data, dict) or 'command' not in data or 'session_id' not in data:
+        return None
+    return data['command'], data['session_id']
+
+
+async def health(receive: Receive, send: Send, _: str):
+    await send_json(send, 200, {"status": "healthy"})
+
+
+async def command(receive: Receive, send: Send, _: str):
+    request = await read_command(receive)
+    if request is None:
+        await send_json(send, 400, MISSING_FIELDS)
+        return
+    cmd, session_id = request
+    manager = await asyncio.to_thread(get_session_manager)
+    # One command per session at a time, and a bounded number overall
+    try:
+        async with manager.serve_async(session_id) as assistant:
+            response = await assistant.ai_core.process_command_async(cmd)
+    except Overloaded as e:
+        await too_many_requests(send, e)
+        return
+    await send_json(send, 200, {"response": response})
+
+
+async def command_stream(receive: Receive, send: Send, _: str):
+    request = await read_command(receive)
+    if request is None:
+        await send_json(send, 400, MISSING_FIELDS)
+        return
+    cmd, session_id = request
+    manager = await asyncio.to_thread(get_session_manager)
+    try:
+        async with manager.serve_async(session_id) as assistant:
+            await relay_stream(receive, send, assistant.ai_core, cmd)
+    except Overloaded as e:
+        await too_many_requests(send, e)
+
+
+async def relay_stream(receive: Receive, send: Send, ai_core, cmd: str):
+    # Relay the pieces as server-sent events, as api.py does. They come
+    # from the AsyncOpenAI stream, so no thread is held between them.
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        disconnected.set()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    stream = ai_core.process_command_stream_async(cmd)
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no")] + CORS_HEADERS
+        })
+        async for piece in stream:
+            if disconnected.is_set():
+                return
+            event = f"data: {json.dumps({'delta': piece})}\n\n"
+            try:
+                await send({"type": "http.response.body", "body": event.encode(), "more_body": True})
+            except OSError:
+                # The server could not deliver it; the client is gone
+                return
+        if not disconnected.is_set():
+            event = f"data: {json.dumps({'done': True, 'ttft': getattr(ai_core, 'last_ttft', None)})}\n\n"
+            await send({"type": "http.response.body", "body": event.encode()})
+    finally:
+        watcher.cancel()
+        # Close the model stream here, before serve_async hands the session
+        # to its next command, rather than whenever the generator is collected.
+        await stream.aclose()
+
+
+async def history(receive: Receive, send: Send, session_id: str):
+    assistant = await asyncio.to_thread(get_assistant, session_id)
+    await send_json(send, 200, list(assistant.ai_core.conversation_history))
+
+
+async def reminders(receive: Receive, send: Send, session_id: str):
+    # Drain reminders that fired since the last call
+    fired = await asyncio.to_thread(lambda: get_session_manager().drain_reminders(session_id))
+    await send_json(send, 200, fired)
+
+
+async def plugins(receive: Receive, send: Send, _: str):
+    registry = (await asyncio.to_thread(get_session_manager)).plugin_registry
+    plugin_list = [{"name": p.get_name(), "description": p.get_description()} for p in registry.get_all_plugins()]
+    await send_json(send, 200, plugin_list)
+
+
+async def metrics(receive: Receive, send: Send, _: str):
+    await send_json(send, 200, await asyncio.to_thread(collect_metrics))
+
+
+ROUTES: Dict[str, Dict[str, Handler]] = {
+    "/api/health": {"GET": health},
+    "/api/command": {"POST": command},
+    "/api/command/stream": {"POST": command_stream},
+    "/api/plugins": {"GET": plugins},
+    "/api/metrics": {"GET": metrics}
+}
+
+# Routes ending in a session id
+PREFIX_ROUTES: Dict[str, Dict[str, Handler]] = {
+    "/api/history/": {"GET": history},
+    "/api/reminders/": {"GET": reminders}
+}
+
+
+def resolve(path: str) -> Tuple[Optional[Dict[str, Handler]], str]:
+    if path in ROUTES:
+        return ROUTES[path], ""
+    for prefix, methods in PREFIX_ROUTES.items():
+        param = path[len(prefix):]
+        if path.startswith(prefix) and param and "/" not in param:
+            return methods, param
+    return None, ""
+
+
+async def lifespan(receive: Receive, send: Send):
+    retention_worker = None
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Build the shared components before the first request needs them.
+            await asyncio.to_thread(get_session_manager)
+            retention_worker = await asyncio.to_thread(start_retention_worker)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if retention_worker:
+                retention_worker.stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: Dict[str, Any], receive: Receive, send: Send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    methods, param = resolve(scope["path"])
+    if methods is None:
+        await send_json(send, 404, {"error": "Not found"})
+        return
+    if scope["method"] == "OPTIONS":
+        # CORS preflight
+        requested = dict(scope.get("headers", [])).get(b"access-control-request-headers", b"Content-Type")
+        await send({
+            "type": "http.response.start",
+            "status": 204,
+            "headers": CORS_HEADERS + [(b"access-control-allow-methods", ", ".join(methods).encode() + b", OPTIONS"),
+                                       (b"access-control-allow-headers", requested)]
+        })
+        await send({"type": "http.response.body", "body": b""})
+        return
+    handler = methods.get(scope["method"])
+    if handler is None:
+        await send_json(send, 405, {"error": "Method not allowed"},
+                        headers=[(b"allow", ", ".join(methods).encode())])
+        return
+
+    started = False
+
+    async def tracked_send(message: Dict[str, Any]):
+        nonlocal started
+        started = True
+        await send(message)
+
+    try:
+        await handler(receive, tracked_send, param)
+    except Exception as e:
+        print(f"API error on {scope['method']} {scope['path']}: {e}")
+        if not started:
+            await send_json(send, 500, {"error": "Internal server error"})
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print("An ASGI server is needed to serve asgi:app, e.g. pip install uvicorn")
+        sys.exit(1)
+    uvicorn.run(app, port=5000)
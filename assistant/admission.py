@@ -0,0 +1,169 @@
+"""
+Bounded admission for work that holds a scarce resource.
+
+The HTTP entry points use one controller to cap the requests in flight
+across the process and a width-one controller per session so a session's
+turns run one at a time, in arrival order. Threads wait with admit() and
+coroutines with admit_async(); both share one FIFO queue.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when the queue is full or the wait timed out."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('wake', 'granted')
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """
+    Lets at most ``max_in_flight`` holders in at once and queues up to
+    ``max_queue`` more (None for no limit) for at most ``queue_timeout``
+    seconds each (None to wait as long as it takes). A released slot goes
+    straight to the longest waiter. Beyond that, callers get Overloaded
+    with a retry hint from the recent hold times.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None, sample_size: int = 1000):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout or None
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+        self._waits: deque = deque(maxlen=sample_size)
+        self._avg_hold = 1.0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.in_flight > 0 or bool(self._waiters)
+
+    def _retry_after(self) -> int:
+        # Time for the queue ahead to drain at the current hold times.
+        return max(1, math.ceil(self._avg_hold * (len(self._waiters) + 1) / self.max_in_flight))
+
+    def _enter(self, waiter: _Waiter) -> bool:
+        """Takes a slot (False) or queues ``waiter`` (True). Call with the lock held."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return False
+        if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded("Too many requests queued", self._retry_after())
+        self._waiters.append(waiter)
+        self.queued += 1
+        return True
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """After a wait gave up: whether the slot arrived anyway. Call with the lock held."""
+        if waiter.granted:
+            return True
+        self._waiters.remove(waiter)
+        return False
+
+    def _admitted(self, waited: float):
+        with self._lock:
+            self.admitted += 1
+            self._waits.append(waited)
+
+    def _leave(self, held: float):
+        with self._lock:
+            self._avg_hold += 0.1 * (held - self._avg_hold)
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self.in_flight -= 1
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        queued_at = time.perf_counter()
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        with self._lock:
+            queued = self._enter(waiter)
+        if queued and not event.wait(self.queue_timeout):
+            with self._lock:
+                if not self._abandon(waiter):
+                    self.timed_out += 1
+                    raise Overloaded("Timed out waiting for a free slot", self._retry_after())
+        started = time.perf_counter()
+        self._admitted(started - queued_at)
+        try:
+            yield
+        finally:
+            self._leave(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def admit_async(self) -> AsyncIterator[None]:
+        queued_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(_resolve, future))
+        with self._lock:
+            queued = self._enter(waiter)
+        if queued:
+            try:
+                await asyncio.wait_for(future, self.queue_timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if not self._abandon(waiter):
+                        self.timed_out += 1
+                        raise Overloaded("Timed out waiting for a free slot", self._retry_after())
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = self._abandon(waiter)
+                if granted:
+                    self._leave(0.0)
+                raise
+        started = time.perf_counter()
+        self._admitted(started - queued_at)
+        try:
+            yield
+        finally:
+            self._leave(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_hold_ms": self._avg_hold * 1000,
+                "queue_wait_avg_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+                "queue_wait_p95_ms": waits[int(0.95 * (len(waits) - 1))] * 1000 if waits else 0.0,
+                "queue_wait_max_ms": waits[-1] * 1000 if waits else 0.0
+            }
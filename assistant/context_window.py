@@ -0,0 +1,191 @@
+"""
+Token-budgeted prompt history with a rolling summary of evicted turns.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Rough per-message framing cost (role markers, separators) in chat formats.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+Summarizer = Callable[[str, List[Dict[str, str]], int], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline token estimate: one token per word or punctuation mark, plus one
+    per further 8 characters of long words. Errs high for English prose so
+    the packed prompt stays under the real budget.
+    """
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 8 for piece in _PIECES.findall(text))
+
+
+def clip_to_tokens(text: str, max_tokens: int, marker: str = " … [truncated]") -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - estimate_tokens(marker))
+    words, used = [], 0
+    for word in text.split():
+        cost = estimate_tokens(word)
+        if used + cost > budget:
+            break
+        words.append(word)
+        used += cost
+    return " ".join(words) + marker
+
+
+def extractive_summary(previous: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+    """Append a clipped line per evicted turn and keep the newest lines that fit ``max_tokens``."""
+    lines = previous.splitlines() if previous else []
+    for message in messages:
+        content = " ".join((message.get("content") or "").split())
+        if not content:
+            continue
+        speaker = "User" if message.get("role") == "user" else "Assistant"
+        lines.append(f"- {speaker}: {clip_to_tokens(content, 40, marker=' …')}")
+
+    kept, used = [], 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+
+class ContextWindow:
+    """
+    Packs a session's history into ``budget_tokens`` for each model request.
+
+    The system prompt, the current user message and ``summary_tokens`` for
+    the summary are reserved first. Then the newest turns are added until
+    the budget runs out, each clipped to a quarter of the budget so one
+    pasted document can't crowd out the rest. Turns that no longer fit are
+    folded into a running summary, which is sent as a second system
+    message. The summary is stored in conversation_summaries and cached
+    here, so it is only regenerated when new turns are evicted.
+
+    The summary records the conversations.id of the last turn folded in
+    (as ``last_turn``). History entries loaded from the database carry
+    their ``id``; entries added since are the session's newest rows, so
+    their ids are looked up when they are first evicted.
+    """
+
+    def __init__(self, database, session_id: str, budget_tokens: int = 3000,
+                 summary_tokens: int = 300, max_messages: Optional[int] = None,
+                 summarizer: Optional[Summarizer] = None):
+        self.database = database
+        self.session_id = session_id
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.max_messages = max_messages
+        self.summarizer = summarizer or extractive_summary
+        self.last_prompt_tokens = 0
+        self._summary: Optional[Dict[str, Any]] = None
+
+    def _load_summary(self) -> Dict[str, Any]:
+        if self._summary is None:
+            stored = self.database.get_conversation_summary(self.session_id) if self.database else None
+            self._summary = stored or {"summary": "", "last_turn": None, "token_count": 0}
+        return self._summary
+
+    @property
+    def summary(self) -> str:
+        return self._load_summary()["summary"]
+
+    def build(self, system_prompt: str, history: List[Dict[str, Any]], current_text: str) -> List[Dict[str, str]]:
+        entries = [e for e in history if isinstance(e, dict) and e.get("role") in ("user", "assistant")]
+        turns = [{"role": e["role"], "content": e.get("content") or "", "id": e.get("id")} for e in entries]
+        # The current message is usually already the last history entry.
+        if turns and turns[-1]["role"] == "user" and turns[-1]["content"] == current_text:
+            turns.pop()
+
+        candidates = turns[-self.max_messages:] if self.max_messages else turns
+        available = (self.budget_tokens
+                     - estimate_tokens(system_prompt) - estimate_tokens(current_text)
+                     - self.summary_tokens - 3 * MESSAGE_OVERHEAD_TOKENS)
+        per_message = max(64, self.budget_tokens // 4)
+
+        kept = []
+        for turn in reversed(candidates):
+            content = clip_to_tokens(turn["content"], per_message)
+            cost = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if cost > available:
+                break
+            kept.append({"role": turn["role"], "content": content})
+            available -= cost
+        kept.reverse()
+
+        evicted = turns[:len(turns) - len(kept)]
+        if evicted:
+            if any(turn["id"] is None for turn in evicted):
+                self._assign_ids(entries)
+                for turn, entry in zip(evicted, entries):
+                    turn["id"] = entry.get("id")
+            self._fold(evicted)
+
+        messages = [{"role": "system", "content": system_prompt}]
+        summary = self.summary
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        messages.extend(kept)
+        messages.append({"role": "user", "content": current_text})
+        self.last_prompt_tokens = sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+        return messages
+
+    def _assign_ids(self, entries: List[Dict[str, Any]]):
+        # The entries without an id are the trailing ones, saved in order
+        # since the history was loaded.
+        missing = []
+        for entry in reversed(entries):
+            if entry.get("id") is not None:
+                break
+            missing.append(entry)
+        if not missing or not self.database:
+            return
+        ids = self.database.get_latest_conversation_ids(self.session_id, len(missing))
+        if len(ids) == len(missing):
+            for entry, row_id in zip(reversed(missing), ids):
+                entry["id"] = row_id
+
+    def _fold(self, evicted: List[Dict[str, Any]]):
+        state = self._load_summary()
+        last_turn = state["last_turn"]
+        # Row ids only grow, so turns at or below the watermark were folded
+        # already even after retention deleted older rows. Without one
+        # (nothing folded yet) or without an id, a turn counts as new.
+        new_turns = [
+            turn for turn in evicted
+            if last_turn is None or turn["id"] is None or turn["id"] > last_turn
+        ]
+        if not new_turns:
+            return
+
+        try:
+            summary = self.summarizer(state["summary"], new_turns, self.summary_tokens)
+        except Exception as e:
+            print(f"Summarizer error, using extractive summary: {e}")
+            summary = extractive_summary(state["summary"], new_turns, self.summary_tokens)
+        summary = clip_to_tokens(summary, self.summary_tokens)
+
+        self._summary = {
+            "summary": summary,
+            "last_turn": new_turns[-1]["id"],
+            "token_count": estimate_tokens(summary)
+        }
+        if self.database:
+            try:
+                self.database.save_conversation_summary(
+                    self.session_id, summary, self._summary["last_turn"], self._summary["token_count"]
+                )
+            except Exception as e:
+                print(f"Could not save conversation summary: {e}")
+
+    def reset(self):
+        self._summary = {"summary": "", "last_turn": None, "token_count": 0}
+        if self.database:
+            self.database.delete_conversation_summary(self.session_id)
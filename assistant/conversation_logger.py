@@ -0,0 +1,99 @@
+"""
+Write-behind logger that batches conversation rows.
+"""
+import atexit
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from assistant.database import Database
+
+
+class ConversationLogger:
+    """
+    Buffers ``save_conversation`` calls in memory and writes them to the
+    database in group commits. (Plugin usage is counted separately, by
+    assistant.plugin_metrics.PluginStatsAccumulator.)
+
+    A background thread flushes whenever ``batch_size`` rows are queued or
+    ``flush_interval`` seconds have passed. Pending rows are also flushed
+    before any history read on the same database file, and at interpreter
+    shutdown.
+    """
+
+    def __init__(self, database: Database, batch_size: int = 32, flush_interval: float = 1.0):
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._conversations: List[Tuple[str, str, str, Optional[str], int]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+
+        self.database.add_flush_hook(self.flush)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save_conversation(self, session_id: str, role: str, content: str,
+                          plugin_used: Optional[str] = None, tokens_used: int = 0):
+        with self._lock:
+            self._conversations.append((session_id, role, content, plugin_used, tokens_used))
+            pending = len(self._conversations)
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._conversations)
+
+    def flush(self):
+        # _flush_lock makes a read-triggered flush wait for one already in progress.
+        with self._flush_lock:
+            with self._lock:
+                conversations, self._conversations = self._conversations, []
+            if not conversations:
+                return
+            try:
+                self.database.save_conversations(conversations)
+            except Exception:
+                # Put unwritten rows back in front so ordering is preserved on retry.
+                with self._lock:
+                    self._conversations[:0] = conversations
+                raise
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Conversation logger flush error: {e}")
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Conversation logger flush error: {e}")
+        self.database.remove_flush_hook(self.flush)
+
+
+_loggers: Dict[str, ConversationLogger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_conversation_logger(database: Database, batch_size: int = 32,
+                            flush_interval: float = 1.0) -> ConversationLogger:
+    """Return the process-wide logger for ``database.db_path``, creating it on first use."""
+    with _loggers_lock:
+        logger = _loggers.get(database.db_path)
+        if logger is None or logger._stopped:
+            logger = ConversationLogger(database, batch_size=batch_size, flush_interval=flush_interval)
+            _loggers[database.db_path] = logger
+        return logger
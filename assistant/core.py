@@ -1,17 +1,57 @@
+import asyncio
+import contextvars
 import json
 import os
+import threading
 import hashlib
 import getpass
-import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from types import SimpleNamespace
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
 from config.settings import Settings
 from assistant.database import Database
+from assistant.conversation_logger import get_conversation_logger
+from assistant import intent_router
+from assistant.context_window import ContextWindow
+from assistant.intent_classifier import CLASSIFIER_SOURCE_PREFIX, NO_TOOL, load_intent_classifier
+from assistant.llm_clients import get_async_openai_client, get_openai_client
+from assistant.plugin_metrics import get_plugin_stats_accumulator
+from assistant.session_context import session_context
+from assistant.response_cache import get_response_cache, is_cacheable_prompt, ResponseCache
+from assistant.tool_selector import get_tool_selector
+
+_tool_executor = None
+_tool_executor_lock = threading.Lock()
+_environment_loaded = False
+
+
+def load_environment():
+    """Reads .env into os.environ the first time it is called in the process."""
+    global _environment_loaded
+    if not _environment_loaded:
+        load_dotenv()
+        _environment_loaded = True
+
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for plugin calls, bounded by Settings.TOOL_CALL_WORKERS."""
+    global _tool_executor
+    with _tool_executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ThreadPoolExecutor(
+                max_workers=max(1, Settings.TOOL_CALL_WORKERS),
+                thread_name_prefix="tool-call"
+            )
+        return _tool_executor
+
 
 class AICore:
-    def __init__(self, plugin_registry=None, user_identifier=None, skills=None, session_id=None):
+    def __init__(self, plugin_registry=None, user_identifier=None, skills=None, session_id=None,
+                 write_behind=None, database=None):
         if session_id:
             self.session_id = session_id
         elif user_identifier:
@@ -23,187 +63,295 @@ class AICore:
         self.conversation_history = []
         self.system_prompt = Settings.get_system_prompt()
         self._tools = []
+        self.tool_selector = None
+        self.last_tool_selection = None
+        # Plugins used by the last few replies stay selectable for follow-ups
+        self._recent_plugins = deque(maxlen=2)
         self.max_history_length = 20
         self.plugin_registry = plugin_registry
-        self.database = Database()
+        # Pass a shared Database to serve many sessions from one connection pool
+        self.database = database if database is not None else Database(settings_ttl=Settings.SETTINGS_CACHE_TTL or None)
         self.skills = skills
 
-        load_dotenv()
+        if write_behind is None:
+            write_behind = Settings.WRITE_BEHIND_LOGGING
+        if write_behind:
+            # Conversation rows and plugin stats are queued and group-committed
+            self.conversation_log = get_conversation_logger(
+                self.database,
+                batch_size=Settings.WRITE_BEHIND_BATCH_SIZE,
+                flush_interval=Settings.WRITE_BEHIND_FLUSH_INTERVAL
+            )
+        else:
+            self.conversation_log = self.database
+        self.plugin_stats = get_plugin_stats_accumulator(self.database)
+        self.response_cache = get_response_cache(self.database) if Settings.LLM_RESPONSE_CACHE else None
+        self.intent_classifier = load_intent_classifier(Settings.INTENT_MODEL_PATH) if Settings.INTENT_CLASSIFIER else None
+
+        load_environment()
 
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key or api_key == "your_gemini_api_key_here":
             self.use_gemini = False
+            self.api_key = None
             self.client = None
         else:
-            self.client = OpenAI(
-                api_key=api_key,
-                base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-            )
+            # Shared by every AICore in the process; see assistant.llm_clients
+            self.api_key = api_key
+            self.client = get_openai_client(api_key)
             self.use_gemini = True
 
+        summarizer = self._summarize_with_gemini if Settings.CONTEXT_SUMMARIZER == "gemini" and self.use_gemini else None
+        self.context_window = ContextWindow(
+            self.database,
+            self.session_id,
+            budget_tokens=Settings.CONTEXT_TOKEN_BUDGET,
+            summary_tokens=Settings.CONTEXT_SUMMARY_TOKENS,
+            max_messages=self.max_history_length,
+            summarizer=summarizer
+        )
+
         self._load_history_from_db()
 
     def _load_history_from_db(self):
         db_history = self.database.get_conversation_history(self.session_id, limit=self.max_history_length)
+        # Loaded entries keep their row id; the context window looks up the
+        # ids of newer ones when it first folds them into the summary.
         for entry in db_history:
             self.conversation_history.append({
                 "role": entry["role"],
                 "content": entry["content"],
-                "timestamp": entry["created_at"]
+                "timestamp": entry["created_at"],
+                "id": entry["id"]
             })
         if db_history:
             print(f"Loaded {len(db_history)} previous messages for session: {self.session_id}")
 
     def process_command(self, text: str) -> str:
-        self.database.save_conversation(
-            session_id=self.session_id,
-            role="user",
-            content=text
-        )
-        self.conversation_history.append({"role": "user", "content": text})
+        with session_context(self.session_id):
+            return self._process_command(text)
 
-        # Direct handling for reminders
-        reminder_response = self._process_reminder_directly(text)
-        if reminder_response:
-            self.database.save_conversation(
-                session_id=self.session_id,
-                role="assistant",
-                content=reminder_response,
-                plugin_used="reminder"
-            )
-            self._update_history(text, reminder_response)
-            return reminder_response
-
-        # Direct handling for file organization
-        text_lower = text.lower()
-        if 'organize files' in text_lower or 'organize folder' in text_lower:
-            match = re.search(r'organize (?:files|folder)(?:\s+in)?\s+(.+)', text_lower)
-            if match:
-                directory = match.group(1).strip()
-                plugin = self.plugin_registry.get_plugin('organize_files')
-                if plugin:
-                    try:
-                        response = plugin.execute(directory=directory)
-                        self.database.save_conversation(
-                            session_id=self.session_id,
-                            role="assistant",
-                            content=response,
-                            plugin_used="organize_files"
-                        )
-                        self._update_history(text, response)
-                        return response
-                    except Exception as e:
-                        error_msg = f"Error organizing files: {str(e)}"
-                        self.database.save_conversation(
-                            session_id=self.session_id,
-                            role="assistant",
-                            content=error_msg,
-                            plugin_used="error"
-                        )
-                        self._update_history(text, error_msg)
-                        return error_msg
-
-        # Direct handling for calculations
-        calc_keywords = ['calculate', 'what is', '=', 'multiplied', 'divided', 'plus', 'minus']
-        if any(keyword in text_lower for keyword in calc_keywords) or re.search(r'\d+\s*[\+\-\*\/]\s*\d+', text_lower):
-            expr = re.sub(r'(calculate|what is|equals?|=)', '', text_lower).strip()
-            plugin = self.plugin_registry.get_plugin('calculate')
-            if plugin:
-                try:
-                    response = plugin.execute(expression=expr)
-                    self.database.save_conversation(
-                        session_id=self.session_id,
-                        role="assistant",
-                        content=response,
-                        plugin_used="calculate"
-                    )
-                    self._update_history(text, response)
-                    return response
-                except Exception as e:
-                    error_msg = f"Error calculating: {str(e)}"
-                    self.database.save_conversation(
-                        session_id=self.session_id,
-                        role="assistant",
-                        content=error_msg,
-                        plugin_used="error"
-                    )
-                    self._update_history(text, error_msg)
-                    return error_msg
+    def _process_command(self, text: str) -> str:
+        self._save_user_message(text)
+        message = intent_router.analyze(text)
+        direct_response = self._process_locally(text, message)
+        if direct_response is not None:
+            return direct_response
 
         # Try Gemini if available
         try:
             if self.use_gemini and self.client:
                 return self._process_with_gemini(text)
             else:
-                return self._fallback_response(text)
+                return self._fallback_response(text, message)
         except Exception as e:
             error_msg = f"I encountered an error: {str(e)}"
-            self.database.save_conversation(
-                session_id=self.session_id,
-                role="assistant",
-                content=error_msg,
-                plugin_used="error"
-            )
-            self._update_history(text, error_msg)
+            self._save_assistant_reply(text, error_msg, "error")
             return error_msg
-    def _process_reminder_directly(self, text: str):
-        text_lower = text.lower()
-        reminder_keywords = ['remind', 'reminder', 'alarm', 'notify', 'remember']
-        if not any(word in text_lower for word in reminder_keywords):
+
+    async def process_command_async(self, text: str) -> str:
+        """
+        process_command for event-loop servers. Gemini is called through the
+        process-wide AsyncOpenAI client, so a request holds no thread while
+        it waits on the model. Database access, local handlers and plugins
+        still block, so they run on worker threads.
+        """
+        with session_context(self.session_id):
+            return await self._process_command_async(text)
+
+    async def _process_command_async(self, text: str) -> str:
+        await asyncio.to_thread(self._save_user_message, text)
+        message = intent_router.analyze(text)
+        direct_response = await asyncio.to_thread(self._process_locally, text, message)
+        if direct_response is not None:
+            return direct_response
+
+        try:
+            if self.use_gemini and self.api_key:
+                return await self._process_with_gemini_async(text)
+            return await asyncio.to_thread(self._fallback_response, text, message)
+        except Exception as e:
+            error_msg = f"I encountered an error: {str(e)}"
+            await asyncio.to_thread(self._save_assistant_reply, text, error_msg, "error")
+            return error_msg
+
+    def process_command_stream(self, text: str) -> Iterator[str]:
+        """
+        Like process_command, but yields the reply in pieces as Gemini produces
+        them. Replies that don't come from Gemini are yielded whole. The joined
+        reply is saved once the stream ends, or with the pieces produced so
+        far if the generator is closed early; ``last_ttft`` holds the seconds
+        until the first piece.
+        """
+        started = time.perf_counter()
+        self.last_ttft = None
+        with session_context(self.session_id):
+            for piece in self._stream_command(text):
+                if self.last_ttft is None:
+                    self.last_ttft = time.perf_counter() - started
+                yield piece
+
+    def _stream_command(self, text: str) -> Iterator[str]:
+        self._save_user_message(text)
+        message = intent_router.analyze(text)
+        direct_response = self._process_locally(text, message)
+        if direct_response is not None:
+            yield direct_response
+            return
+
+        try:
+            if self.use_gemini and self.client:
+                yield from self._stream_with_gemini(text)
+            else:
+                yield self._fallback_response(text, message)
+        except Exception as e:
+            error_msg = f"I encountered an error: {str(e)}"
+            self._save_assistant_reply(text, error_msg, "error")
+            yield error_msg
+
+    async def process_command_stream_async(self, text: str) -> AsyncIterator[str]:
+        """
+        process_command_stream for event-loop servers: Gemini is streamed
+        through the process-wide AsyncOpenAI client, so no thread is held
+        between pieces. Close the generator (aclose) from the task that
+        iterates it if you stop early; that saves the partial reply.
+        """
+        started = time.perf_counter()
+        self.last_ttft = None
+        with session_context(self.session_id):
+            async for piece in self._stream_command_async(text):
+                if self.last_ttft is None:
+                    self.last_ttft = time.perf_counter() - started
+                yield piece
+
+    async def _stream_command_async(self, text: str) -> AsyncIterator[str]:
+        await asyncio.to_thread(self._save_user_message, text)
+        message = intent_router.analyze(text)
+        direct_response = await asyncio.to_thread(self._process_locally, text, message)
+        if direct_response is not None:
+            yield direct_response
+            return
+
+        try:
+            if self.use_gemini and self.api_key:
+                async for piece in self._stream_with_gemini_async(text):
+                    yield piece
+            else:
+                yield await asyncio.to_thread(self._fallback_response, text, message)
+        except Exception as e:
+            error_msg = f"I encountered an error: {str(e)}"
+            await asyncio.to_thread(self._save_assistant_reply, text, error_msg, "error")
+            yield error_msg
+
+    def _save_user_message(self, text: str):
+        self.conversation_log.save_conversation(
+            session_id=self.session_id,
+            role="user",
+            content=text
+        )
+        self.conversation_history.append({"role": "user", "content": text})
+
+    def _process_locally(self, text: str, message: intent_router.Message) -> Optional[str]:
+        """Direct handlers, then the intent classifier; None if the request needs the model."""
+        response = self._process_directly(text, message)
+        if response is None:
+            response = self._process_with_classifier(text)
+        return response
+
+    def _process_directly(self, text: str, message: Optional[intent_router.Message] = None):
+        """Answer reminders, file organisation and calculations without the LLM; None if not handled."""
+        message = message or intent_router.analyze(text)
+        for intent in intent_router.direct_intents(message):
+            if intent == 'reminder':
+                handled = self._direct_reminder(message)
+            elif intent == 'organize_files':
+                handled = self._direct_organize_files(message)
+            else:
+                handled = self._direct_calculate(message)
+            if handled is not None:
+                response, plugin_used = handled
+                self._save_assistant_reply(text, response, plugin_used)
+                return response
+        return None
+
+    def _direct_reminder(self, message: intent_router.Message):
+        response = self._process_reminder_directly(message.text, message)
+        return (response, "reminder") if response else None
+
+    def _direct_organize_files(self, message: intent_router.Message):
+        match = intent_router.ORGANIZE_TARGET.search(message.lower)
+        if not match:
+            return None
+        plugin = self.plugin_registry.get_plugin('organize_files')
+        if not plugin:
+            return None
+        try:
+            return plugin.execute(directory=match.group(1).strip()), "organize_files"
+        except Exception as e:
+            return f"Error organizing files: {str(e)}", "error"
+
+    def _direct_calculate(self, message: intent_router.Message):
+        plugin = self.plugin_registry.get_plugin('calculate')
+        if not plugin:
+            return None
+        expr = intent_router.CALC_PREFIX.sub('', message.lower).strip()
+        try:
+            return plugin.execute(expression=expr), "calculate"
+        except Exception as e:
+            return f"Error calculating: {str(e)}", "error"
+
+    def _process_reminder_directly(self, text: str, message: Optional[intent_router.Message] = None):
+        message = message or intent_router.analyze(text)
+        if not message.has_any(intent_router.REMINDER_WORDS):
             return None
         if not self.skills:
             return "Reminder system not available."
 
-        patterns = [
-            # task first, then time
-            (r'remind\s+me\s+to\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
-            (r'set\s+(?:a\s+)?reminder\s+for\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
-            (r'remind\s+me\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
-            (r'reminder\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
-            # time first, then task
-            (r'(?:at|on|in)\s+(.+?)\s+remind\s+me\s+to\s+(.+)', 2, 1),
-            (r'(?:at|on|in)\s+(.+?)\s+set\s+(?:a\s+)?reminder\s+for\s+(.+)', 2, 1),
-            (r'remind\s+me\s+(?:at|on|in)\s+(.+?)\s+to\s+(.+)', 2, 1),
-            (r'remind\s+(?:at|on|in)\s+(.+?)\s+to\s+(.+)', 2, 1),
-            (r'set\s+(?:a\s+)?reminder\s+(?:at|on|in)\s+(.+?)\s+for\s+(.+)', 2, 1),
-            (r'(?:at|on|in)\s+(.+?)\s+(?:remind\s+me|reminder)\s+(.+)', 2, 1),
-            # very generic last resort
-            (r'(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
-        ]
-
-        for pattern, task_idx, time_idx in patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                groups = match.groups()
-                task = groups[task_idx-1].strip()
-                when = groups[time_idx-1].strip()
-                # Clean up task: remove leading 'to', 'a', 'the', 'my'
-                task = re.sub(r'^(?:to|a|the|my)\s+', '', task)
-                # If task is just 'remind' or 'reminder', skip this pattern
-                if task in ['remind', 'reminder']:
-                    continue
-                return self.skills.set_reminder(task, when)
-
-        # Fallback: extract any time expression
-        time_pattern = r'(?:at|on|in)\s+(\d+\s*(?:minutes?|hours?|days?|weeks?|am|pm)|tomorrow|next\s+\w+|\d{1,2}(?::\d{2})?\s*(?:am|pm)?)'
-        time_match = re.search(time_pattern, text_lower)
-        if time_match:
-            time_expr = time_match.group(0).strip()
-            task = text_lower.replace(time_expr, '').strip()
-            task = re.sub(r'^(remind\s+me|set\s+(?:a\s+)?reminder|reminder)\s+', '', task)
-            task = re.sub(r'\s+to$', '', task)
-            if task and task not in ['remind', 'reminder']:
-                return self.skills.set_reminder(task, time_expr)
+        parsed = intent_router.parse_reminder(message)
+        if parsed:
+            task, when = parsed
+            return self.skills.set_reminder(task, when)
 
         return "Please specify what to remind and when. Example: 'remind me to call mom in 2 hours' or 'set reminder for meeting tomorrow at 2pm'"
+
+    def _process_with_classifier(self, text: str) -> Optional[str]:
+        """
+        Run the plugin the local intent classifier picks with at least
+        Settings.INTENT_CONFIDENCE_THRESHOLD confidence, if the plugin can
+        extract its arguments from the text; None leaves the request to Gemini.
+        """
+        if not self.intent_classifier or not self.plugin_registry:
+            return None
+        label, confidence = self.intent_classifier.predict(text)
+        if label == NO_TOOL or confidence < Settings.INTENT_CONFIDENCE_THRESHOLD:
+            return None
+        plugin = self.plugin_registry.get_plugin(label)
+        if not plugin:
+            return None
+        arguments = plugin.extract_arguments(text)
+        if arguments is None:
+            return None
+
+        response = self.plugin_registry.execute_plugin(label, **arguments)
+        self.plugin_stats.record(label, self.session_id)
+        self._save_assistant_reply(text, response, label, routed_by_classifier=True)
+        return response
+
     def _process_with_gemini(self, text: str) -> str:
         try:
             if not self._tools and self.plugin_registry:
                 self._load_tools()
             
             messages = self._build_message_list(text)
+            cache_key = self._response_cache_key(messages, text)
+            if cache_key:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self._save_assistant_reply(text, cached)
+                    return cached
             
-            if not self._tools:
+            tools = self._select_tools(text)
+            if not tools:
                 response = self.client.chat.completions.create(
                     model="gemini-2.5-flash",
                     messages=messages,
@@ -215,7 +363,7 @@ class AICore:
                 response = self.client.chat.completions.create(
                     model="gemini-2.5-flash",
                     messages=messages,
-                    tools=[{"type": "function", "function": tool} for tool in self._tools],
+                    tools=[{"type": "function", "function": tool} for tool in tools],
                     tool_choice="auto"
                 )
                 
@@ -224,73 +372,429 @@ class AICore:
                 if hasattr(message, 'tool_calls') and message.tool_calls:
                     plugin_used = message.tool_calls[0].function.name if message.tool_calls else None
                     tool_messages = self._handle_tool_calls(messages, message)
-                    final_response = self._get_final_response(tool_messages)
+                    final_response = self._user_ready_tool_reply(message.tool_calls, tool_messages)
+                    if final_response is not None:
+                        if message.content and message.content.strip():
+                            final_response = f"{message.content.strip()}\n\n{final_response}"
+                    else:
+                        final_response = self._get_final_response(tool_messages)
                     
                     if plugin_used:
-                        self.database.update_plugin_stats(plugin_used, self.session_id)
+                        self.plugin_stats.record(plugin_used, self.session_id)
                 else:
                     final_response = message.content
                     plugin_used = None
             
-            self.database.save_conversation(
-                session_id=self.session_id,
-                role="assistant",
-                content=final_response,
-                plugin_used=plugin_used
-            )
+            # Replies built from tool output reflect live data; don't reuse them.
+            if cache_key and plugin_used is None:
+                self.response_cache.put(cache_key, final_response)
             
-            self._update_history(text, final_response)
+            self._save_assistant_reply(text, final_response, plugin_used)
             return final_response
                 
         except Exception as e:
             print(f"Gemini API error: {e}")
             return self._fallback_response(text)
     
+    async def _process_with_gemini_async(self, text: str) -> str:
+        client = get_async_openai_client(self.api_key)
+        try:
+            if not self._tools and self.plugin_registry:
+                await asyncio.to_thread(self._load_tools)
+
+            messages = await asyncio.to_thread(self._build_message_list, text)
+            cache_key = self._response_cache_key(messages, text)
+            if cache_key:
+                cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+                if cached is not None:
+                    await asyncio.to_thread(self._save_assistant_reply, text, cached)
+                    return cached
+
+            request = {"model": "gemini-2.5-flash", "messages": messages}
+            tools = self._select_tools(text)
+            if tools:
+                request["tools"] = [{"type": "function", "function": tool} for tool in tools]
+                request["tool_choice"] = "auto"
+            else:
+                request["max_tokens"] = 500
+            response = await client.chat.completions.create(**request)
+            message = response.choices[0].message
+
+            plugin_used = None
+            if tools and getattr(message, 'tool_calls', None):
+                plugin_used = message.tool_calls[0].function.name
+                tool_messages = await self._handle_tool_calls_async(messages, message)
+                final_response = self._user_ready_tool_reply(message.tool_calls, tool_messages)
+                if final_response is not None:
+                    if message.content and message.content.strip():
+                        final_response = f"{message.content.strip()}\n\n{final_response}"
+                else:
+                    second_response = await client.chat.completions.create(
+                        model="gemini-2.5-flash",
+                        messages=tool_messages
+                    )
+                    final_response = second_response.choices[0].message.content
+                self.plugin_stats.record(plugin_used, self.session_id)
+            else:
+                final_response = message.content
+
+            if cache_key and plugin_used is None:
+                await asyncio.to_thread(self.response_cache.put, cache_key, final_response)
+
+            await asyncio.to_thread(self._save_assistant_reply, text, final_response, plugin_used)
+            return final_response
+
+        except Exception as e:
+            print(f"Gemini API error: {e}")
+            return await asyncio.to_thread(self._fallback_response, text)
+
+    def _stream_with_gemini(self, text: str) -> Iterator[str]:
+        pieces = []
+        plugin_used = None
+        cache_key = None
+        complete = False
+        try:
+            try:
+                if not self._tools and self.plugin_registry:
+                    self._load_tools()
+
+                messages = self._build_message_list(text)
+                cache_key = self._response_cache_key(messages, text)
+                if cache_key:
+                    cached = self.response_cache.get(cache_key)
+                    if cached is not None:
+                        self._save_assistant_reply(text, cached)
+                        yield cached
+                        return
+
+                tool_calls = {}
+                stream = self.client.chat.completions.create(**self._stream_request(messages, text))
+                try:
+                    for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            pieces.append(delta.content)
+                            yield delta.content
+                        self._merge_tool_call_deltas(tool_calls, delta.tool_calls)
+                finally:
+                    # Releases the connection if the caller stopped reading early.
+                    stream.close()
+
+                if tool_calls:
+                    calls = self._streamed_tool_calls(tool_calls)
+                    plugin_used = calls[0].function.name
+                    message = SimpleNamespace(content="".join(pieces), tool_calls=calls)
+                    tool_messages = self._handle_tool_calls(messages, message)
+                    reply = self._user_ready_tool_reply(calls, tool_messages)
+                    if reply is not None:
+                        reply = f"\n\n{reply}" if pieces else reply
+                        pieces.append(reply)
+                        yield reply
+                    else:
+                        stream = self.client.chat.completions.create(
+                            model="gemini-2.5-flash",
+                            messages=tool_messages,
+                            stream=True
+                        )
+                        try:
+                            for chunk in stream:
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    pieces.append(chunk.choices[0].delta.content)
+                                    yield chunk.choices[0].delta.content
+                        finally:
+                            stream.close()
+                    self.plugin_stats.record(plugin_used, self.session_id)
+                complete = True
+            except Exception as e:
+                print(f"Gemini API error: {e}")
+                if not pieces:
+                    yield self._fallback_response(text)
+        finally:
+            # Also runs when the caller stops reading early (GeneratorExit), so
+            # the user's turn keeps whatever part of the reply was produced.
+            if pieces:
+                final_response = "".join(pieces)
+                # Never reuse a truncated reply
+                if complete and cache_key and plugin_used is None:
+                    self.response_cache.put(cache_key, final_response)
+                self._save_assistant_reply(text, final_response, plugin_used)
+
+    async def _stream_with_gemini_async(self, text: str) -> AsyncIterator[str]:
+        """_stream_with_gemini on the AsyncOpenAI client; blocking steps run on worker threads."""
+        client = get_async_openai_client(self.api_key)
+        pieces = []
+        plugin_used = None
+        cache_key = None
+        complete = False
+        try:
+            try:
+                if not self._tools and self.plugin_registry:
+                    await asyncio.to_thread(self._load_tools)
+
+                messages = await asyncio.to_thread(self._build_message_list, text)
+                cache_key = self._response_cache_key(messages, text)
+                if cache_key:
+                    cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+                    if cached is not None:
+                        await asyncio.to_thread(self._save_assistant_reply, text, cached)
+                        yield cached
+                        return
+
+                tool_calls = {}
+                stream = await client.chat.completions.create(**self._stream_request(messages, text))
+                try:
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            pieces.append(delta.content)
+                            yield delta.content
+                        self._merge_tool_call_deltas(tool_calls, delta.tool_calls)
+                finally:
+                    # Releases the connection if the caller stopped reading early.
+                    await stream.close()
+
+                if tool_calls:
+                    calls = self._streamed_tool_calls(tool_calls)
+                    plugin_used = calls[0].function.name
+                    message = SimpleNamespace(content="".join(pieces), tool_calls=calls)
+                    tool_messages = await self._handle_tool_calls_async(messages, message)
+                    reply = self._user_ready_tool_reply(calls, tool_messages)
+                    if reply is not None:
+                        reply = f"\n\n{reply}" if pieces else reply
+                        pieces.append(reply)
+                        yield reply
+                    else:
+                        stream = await client.chat.completions.create(
+                            model="gemini-2.5-flash",
+                            messages=tool_messages,
+                            stream=True
+                        )
+                        try:
+                            async for chunk in stream:
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    pieces.append(chunk.choices[0].delta.content)
+                                    yield chunk.choices[0].delta.content
+                        finally:
+                            await stream.close()
+                    self.plugin_stats.record(plugin_used, self.session_id)
+                complete = True
+            except Exception as e:
+                print(f"Gemini API error: {e}")
+                if not pieces:
+                    yield await asyncio.to_thread(self._fallback_response, text)
+        finally:
+            # As in _stream_with_gemini: aclose() after a disconnect lands here
+            # and the partial reply is saved.
+            if pieces:
+                final_response = "".join(pieces)
+                if complete and cache_key and plugin_used is None:
+                    await asyncio.to_thread(self.response_cache.put, cache_key, final_response)
+                await asyncio.to_thread(self._save_assistant_reply, text, final_response, plugin_used)
+
+    def _stream_request(self, messages: List[Dict[str, Any]], text: str) -> Dict[str, Any]:
+        request = {"model": "gemini-2.5-flash", "messages": messages, "stream": True}
+        tools = self._select_tools(text)
+        if tools:
+            request["tools"] = [{"type": "function", "function": tool} for tool in tools]
+            request["tool_choice"] = "auto"
+        else:
+            request["max_tokens"] = 500
+        return request
+
+    @staticmethod
+    def _merge_tool_call_deltas(tool_calls: Dict[int, Dict[str, Any]], deltas: Optional[List[Any]]):
+        # Tool calls arrive as fragments keyed by index; arguments are
+        # concatenated until the stream ends.
+        for call in deltas or []:
+            index = call.index if call.index is not None else len(tool_calls)
+            entry = tool_calls.setdefault(index, {"id": None, "name": "", "arguments": ""})
+            if call.id:
+                entry["id"] = call.id
+            if call.function:
+                if call.function.name:
+                    entry["name"] = call.function.name
+                if call.function.arguments:
+                    entry["arguments"] += call.function.arguments
+
+    @staticmethod
+    def _streamed_tool_calls(tool_calls: Dict[int, Dict[str, Any]]) -> List[Any]:
+        return [
+            SimpleNamespace(
+                id=entry["id"] or f"call_{index}",
+                function=SimpleNamespace(name=entry["name"], arguments=entry["arguments"] or "{}")
+            )
+            for index, entry in sorted(tool_calls.items())
+        ]
+
+    def _select_tools(self, text: str) -> List[Dict[str, Any]]:
+        """The schemas to send with this request; see ToolSelector."""
+        if not self.tool_selector:
+            return self._tools
+        tools, self.last_tool_selection = self.tool_selector.select(text, recent=self._recent_plugins)
+        return tools
+
+    def _response_cache_key(self, messages: List[Dict[str, Any]], text: str):
+        """Key for the response cache, or None when caching is off or the prompt is time-sensitive."""
+        if not self.response_cache or not is_cacheable_prompt(text):
+            return None
+        # messages[1:-1] is the rolling summary plus packed history.
+        history = messages[1:-1]
+        # The formatted system prompt embeds the current time, so the template
+        # and location stand in for it.
+        return ResponseCache.make_key(
+            "gemini-2.5-flash",
+            Settings.SYSTEM_PROMPT + Settings.DEFAULT_CITY,
+            history,
+            self._tools,
+            text
+        )
+
+    def _save_assistant_reply(self, text: str, response: str, plugin_used: str = None,
+                              routed_by_classifier: bool = False):
+        self.conversation_log.save_conversation(
+            session_id=self.session_id,
+            role="assistant",
+            content=response,
+            plugin_used=CLASSIFIER_SOURCE_PREFIX + plugin_used if routed_by_classifier else plugin_used
+        )
+        if plugin_used and plugin_used != "error":
+            self._recent_plugins.append(plugin_used)
+        self._update_history(text, response)
+
     def _build_message_list(self, current_text: str) -> List[Dict[str, Any]]:
-        from config.settings import Settings
-        
-        messages = []
-        fresh_system_prompt = Settings.get_system_prompt()
-        messages.append({"role": "system", "content": fresh_system_prompt})
-        
-        for entry in self.conversation_history[-self.max_history_length:]:
-            if isinstance(entry, dict):
-                if entry.get("role") == "user":
-                    messages.append({"role": "user", "content": entry.get("content", "")})
-                elif entry.get("role") == "assistant":
-                    messages.append({"role": "assistant", "content": entry.get("content", "")})
-        
-        messages.append({"role": "user", "content": current_text})
-        return messages
+        # History is packed into Settings.CONTEXT_TOKEN_BUDGET; older turns
+        # reach the model through the context window's rolling summary.
+        return self.context_window.build(Settings.get_system_prompt(), self.conversation_history, current_text)
+
+    def _summarize_with_gemini(self, previous: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        transcript = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
+        response = self.client.chat.completions.create(
+            model="gemini-2.5-flash",
+            messages=[
+                {"role": "system", "content": (
+                    "Update the running summary of a conversation with the new turns. Keep names, "
+                    "preferences, decisions and open questions; drop greetings and filler. "
+                    f"Reply with the summary only, at most {max_tokens * 3 // 4} words."
+                )},
+                {"role": "user", "content": f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"}
+            ],
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content or previous
     
-    def _handle_tool_calls(self, messages: List[Dict[str, Any]], message: Any) -> List[Dict[str, Any]]:
-        messages.append({
+    @staticmethod
+    def _tool_call_message(message: Any) -> Dict[str, Any]:
+        return {
             "role": "assistant",
             "content": message.content if message.content else "",
-            "tool_calls": message.tool_calls
-        })
+            "tool_calls": [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments}
+                }
+                for tool_call in message.tool_calls
+            ]
+        }
+
+    def _handle_tool_calls(self, messages: List[Dict[str, Any]], message: Any) -> List[Dict[str, Any]]:
+        messages.append(self._tool_call_message(message))
         
-        for tool_call in message.tool_calls:
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-            
-            result = self.plugin_registry.execute_plugin(function_name, **function_args) if self.plugin_registry else f"Plugin '{function_name}' not available"
-            
+        # All calls of one turn run concurrently; each gets TOOL_CALL_TIMEOUT
+        # seconds from submission, so the turn waits for the slowest tool only.
+        # Results are appended in tool_call order regardless of finish order.
+        executor = _get_tool_executor()
+        timeout = Settings.TOOL_CALL_TIMEOUT
+        deadline = time.monotonic() + timeout
+        futures = [
+            executor.submit(contextvars.copy_context().run, self._run_tool_call, tool_call)
+            for tool_call in message.tool_calls
+        ]
+
+        for tool_call, future in zip(message.tool_calls, futures):
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                result = self._tool_call_timed_out(tool_call, future, timeout)
+            except Exception as e:
+                result = f"Error executing plugin '{tool_call.function.name}': {str(e)}"
+
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": str(result)
+            })
+
+        return messages
+
+    async def _handle_tool_calls_async(self, messages: List[Dict[str, Any]], message: Any) -> List[Dict[str, Any]]:
+        """_handle_tool_calls for the async path: same pool, timeout and result order, awaited instead of blocking."""
+        messages.append(self._tool_call_message(message))
+        executor = _get_tool_executor()
+        timeout = Settings.TOOL_CALL_TIMEOUT
+
+        async def run(tool_call):
+            future = executor.submit(contextvars.copy_context().run, self._run_tool_call, tool_call)
+            done, _ = await asyncio.wait([asyncio.wrap_future(future)], timeout=timeout)
+            if not done:
+                return self._tool_call_timed_out(tool_call, future, timeout)
+            try:
+                return future.result()
+            except Exception as e:
+                return f"Error executing plugin '{tool_call.function.name}': {str(e)}"
+
+        results = await asyncio.gather(*(run(tool_call) for tool_call in message.tool_calls))
+        for tool_call, result in zip(message.tool_calls, results):
             messages.append({
                 "role": "tool",
                 "tool_call_id": tool_call.id,
                 "content": str(result)
             })
-        
         return messages
+
+    @staticmethod
+    def _tool_call_timed_out(tool_call: Any, future: Future, timeout: float) -> str:
+        # A call still queued for a worker is dropped; one already running
+        # cannot be interrupted, so the model must not assume it failed.
+        name = tool_call.function.name
+        if future.cancel():
+            return f"Plugin '{name}' timed out after {timeout:g} seconds waiting for a free worker and was not run"
+        return f"Plugin '{name}' timed out after {timeout:g} seconds but is still running and may yet finish"
+
+    def _run_tool_call(self, tool_call: Any) -> str:
+        function_name = tool_call.function.name
+        function_args = json.loads(tool_call.function.arguments or "{}")
+        if not self.plugin_registry:
+            return f"Plugin '{function_name}' not available"
+        return self.plugin_registry.execute_plugin(function_name, **function_args)
     
+    def _user_ready_tool_reply(self, tool_calls: List[Any], messages: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        The tool results themselves, joined, when every call of the turn went
+        to a plugin whose output is user-ready; None when the model has to
+        synthesise the reply from them.
+        """
+        if not Settings.DIRECT_TOOL_REPLIES or not self.plugin_registry:
+            return None
+        for tool_call in tool_calls:
+            plugin = self.plugin_registry.get_plugin(tool_call.function.name)
+            if not plugin or not plugin.has_user_ready_output():
+                return None
+        # _handle_tool_calls appends one tool message per call, in call order.
+        results = [m["content"].strip() for m in messages[-len(tool_calls):]]
+        return "\n\n".join(r for r in results if r) or None
+
     def _get_final_response(self, messages: List[Dict[str, Any]]) -> str:
         second_response = self.client.chat.completions.create(
             model="gemini-2.5-flash",
             messages=messages
         )
         return second_response.choices[0].message.content
-    
+
     def _update_history(self, user_message: str, assistant_response: str):
         self.conversation_history.append({
             "role": "assistant",
@@ -315,43 +819,53 @@ class AICore:
             })
         
         print(f"Loaded {len(self._tools)} tools for AI")
+
+        if Settings.TOOL_SELECTION:
+            self.tool_selector = get_tool_selector(
+                self.plugin_registry, self._tools, self.database, top_k=Settings.TOOL_SELECTION_TOP_K
+            )
     
-    def _fallback_response(self, text: str) -> str:
-        text_lower = text.lower()
-
-        if any(word in text_lower for word in ['time', 'clock']):
-            return self.skills.get_time_date()
-        if 'date' in text_lower:
-            return self.skills.get_time_date()
-
-        if 'weather' in text_lower:
-            city = None
-            city_match = re.search(r'weather\s+(?:in\s+)?([a-zA-Z\s]+)', text_lower)
-            if city_match:
-                city = city_match.group(1).strip()
-            return self.skills.get_weather(city)
-
-        if 'news' in text_lower:
-            category = 'general'
-            category_match = re.search(r'news\s+(?:about\s+)?([a-zA-Z]+)', text_lower)
-            if category_match:
-                cat = category_match.group(1).strip().lower()
-                valid = ['technology', 'business', 'sports', 'entertainment', 'health', 'science']
-                if cat in valid:
-                    category = cat
-            return self.skills.get_news(category)
-
-        if any(word in text_lower for word in ['calendar', 'events', 'schedule']):
-            return self.skills.get_calendar_events()
-
-        if any(word in text_lower for word in ['calculate', 'what is', '=']):
-            expr = re.sub(r'(calculate|what is|equals?|=)', '', text_lower).strip()
-            if expr:
-                return self.skills.calculate(expr)
+    def _fallback_response(self, text: str, message: Optional[intent_router.Message] = None) -> str:
+        message = message or intent_router.analyze(text)
+        text_lower = message.lower
+
+        for intent in intent_router.fallback_intents(message):
+            if intent == 'time_date':
+                return self.skills.get_time_date()
+
+            if intent == 'weather':
+                city = None
+                city_match = intent_router.WEATHER_CITY.search(text_lower)
+                if city_match:
+                    city = city_match.group(1).strip()
+                return self.skills.get_weather(city)
+
+            if intent == 'news':
+                category = 'general'
+                category_match = intent_router.NEWS_CATEGORY.search(text_lower)
+                if category_match:
+                    cat = category_match.group(1).strip().lower()
+                    valid = ['technology', 'business', 'sports', 'entertainment', 'health', 'science']
+                    if cat in valid:
+                        category = cat
+                return self.skills.get_news(category)
+
+            if intent == 'calendar':
+                return self.skills.get_calendar_events()
+
+            if intent == 'calculate':
+                expr = intent_router.CALC_PREFIX.sub('', text_lower).strip()
+                if expr:
+                    return self.skills.calculate(expr)
 
         from assistant.local_ai import LocalAI
         local = LocalAI()
-        return local.process(text)
+        return local.process(text, message)
     
     def clear_history(self):
-        self.conversation_history = []
\ No newline at end of file
+        self.conversation_history = []
+        self.context_window.reset()
+
+    def flush(self):
+        if self.conversation_log is not self.database:
+            self.conversation_log.flush()
\ No newline at end of file
@@ -3,130 +3,297 @@ Database module for persistent conversation history and user data.
 """
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import queue
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Callable, Iterable, Set, Tuple
+import re
 import threading
+import time
+from collections import OrderedDict
 
-class Database:
-    def __init__(self, db_path: str = "assistant.db"):
+from assistant.migrations import migrate
+
+
+def build_fts_query(text: str, column: Optional[str] = None, prefix: bool = True) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so FTS operators in user input are literal) and all
+    words must match; with ``prefix`` the last one is a prefix match to suit
+    as-you-type searches. Returns an empty string when the text has no
+    searchable words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    if prefix:
+        terms[-1] += "*"
+    query = " ".join(terms)
+    return f"{column} : ({query})" if column else query
+
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections to a single database file.
+
+    Connections are opened lazily (up to ``max_size``) and reused across
+    threads, so callers no longer pay for a connect/close on every query.
+    Every connection starts in WAL mode, which lets readers run while a
+    writer holds the write lock.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",
+    )
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 30.0):
         self.db_path = db_path
+        # Every connection to ":memory:" is a separate database, so share one.
+        self.max_size = 1 if db_path == ":memory:" else max(1, max_size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
         self._lock = threading.Lock()
-        self._init_notes_table()
-        self._init_db()
-    
-    def _init_db(self):
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # Only a new, empty file takes auto_vacuum without a VACUUM (see
+        # Database.enable_incremental_vacuum). It must be set before
+        # journal_mode, and only there: on an existing file the pragma waits
+        # for the write lock, which would stall every new reader behind a writer.
+        if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    role TEXT NOT NULL CHECK(role IN ('user', 'assistant', 'system')),
-                    content TEXT NOT NULL,
-                    plugin_used TEXT,
-                    tokens_used INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_id ON conversations(session_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON conversations(created_at)')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_settings (
-                    user_id TEXT PRIMARY KEY DEFAULT 'default',
-                    default_city TEXT,
-                    preferred_news_category TEXT DEFAULT 'general',
-                    timezone TEXT DEFAULT 'UTC',
-                    assistant_name TEXT DEFAULT 'Jarvis',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS plugin_stats (
-                    plugin_name TEXT NOT NULL,
-                    session_id TEXT NOT NULL,
-                    execution_count INTEGER DEFAULT 0,
-                    last_used TIMESTAMP,
-                    PRIMARY KEY (plugin_name, session_id)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    reminder_text TEXT NOT NULL,
-                    due_time TIMESTAMP NOT NULL,
-                    completed BOOLEAN DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-    def _init_notes_table(self):
+            if len(self._all) < self.max_size:
+                conn = self._create_connection()
+                self._all.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Timed out waiting for a database connection ({self.max_size} in use)"
+            )
+
+    def release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            for conn in self._all:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all = []
+            self._idle = queue.LifoQueue()
+
+
+class Database:
+    # Callbacks run before history/stat reads so buffered writes (see
+    # ConversationLogger) are visible; keyed by db_path because several
+    # Database instances may point at the same file.
+    _flush_hooks: Dict[str, List[Callable[[], None]]] = {}
+    _hooks_lock = threading.Lock()
+    # Callbacks told about reminder changes as (event, reminder) with event
+    # "added" or "completed"; used by ReminderScheduler to avoid polling.
+    _reminder_listeners: Dict[str, List[Callable[[str, Dict[str, Any]], None]]] = {}
+    # db_paths whose schema has been brought up to date in this process
+    _schema_checked: Set[str] = set()
+    _schema_lock = threading.Lock()
+    # get_user_settings results keyed by (db_path, user_id) as (loaded_at, settings);
+    # dropped by update_user_settings. Other processes' writes are only seen once
+    # an entry is older than settings_ttl, so set one when several processes
+    # share the file. Least recently used entries beyond _settings_cache_size
+    # are dropped, since a server sees a new user_id for every session.
+    _settings_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _settings_cache_size = 1024
+    # Bumped on every invalidation, keyed like the cache; (db_path, None) counts
+    # whole-database invalidations. A load only caches its row if neither
+    # moved while it ran, so it can't put back a row an update just replaced.
+    _settings_generations: Dict[Tuple[str, Optional[str]], int] = {}
+    _settings_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "assistant.db", pool_size: int = 8,
+                 settings_ttl: Optional[float] = None):
+        self.db_path = db_path
+        self.settings_ttl = settings_ttl
+        # Serialises writers only; readers take a pooled connection directly.
+        self._lock = threading.Lock()
+        self._pool = ConnectionPool(db_path, max_size=pool_size)
+        self._closed = False
+        self._ensure_schema()
+
+    @contextmanager
+    def _read(self):
+        with self._pool.connection() as conn:
+            yield conn.cursor()
+
+    @contextmanager
+    def _write(self):
+        with self._lock, self._pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    title TEXT,
-                    content TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            conn.commit()
-            conn.close()    
-    def save_conversation(self, session_id: str, role: str, content: str, 
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close(self):
+        self._closed = True
+        self._pool.close()
+
+    def add_flush_hook(self, hook: Callable[[], None]):
+        with Database._hooks_lock:
+            hooks = Database._flush_hooks.setdefault(self.db_path, [])
+            if hook not in hooks:
+                hooks.append(hook)
+
+    def remove_flush_hook(self, hook: Callable[[], None]):
+        with Database._hooks_lock:
+            hooks = Database._flush_hooks.get(self.db_path, [])
+            if hook in hooks:
+                hooks.remove(hook)
+
+    def _run_flush_hooks(self):
+        with Database._hooks_lock:
+            hooks = list(Database._flush_hooks.get(self.db_path, []))
+        for hook in hooks:
+            # A failed flush keeps its rows queued for the next one; the read
+            # goes ahead without them rather than failing too.
+            try:
+                hook()
+            except Exception as e:
+                print(f"Flush hook error: {e}")
+
+    def add_reminder_listener(self, listener: Callable[[str, Dict[str, Any]], None]):
+        with Database._hooks_lock:
+            listeners = Database._reminder_listeners.setdefault(self.db_path, [])
+            if listener not in listeners:
+                listeners.append(listener)
+
+    def remove_reminder_listener(self, listener: Callable[[str, Dict[str, Any]], None]):
+        with Database._hooks_lock:
+            listeners = Database._reminder_listeners.get(self.db_path, [])
+            if listener in listeners:
+                listeners.remove(listener)
+
+    def _notify_reminder_listeners(self, event: str, reminder: Dict[str, Any]):
+        with Database._hooks_lock:
+            listeners = list(Database._reminder_listeners.get(self.db_path, []))
+        for listener in listeners:
+            try:
+                listener(event, reminder)
+            except Exception as e:
+                print(f"Reminder listener error: {e}")
+
+    def _ensure_schema(self):
+        # Only the first Database on a given file per process checks the version.
+        # ":memory:" is a fresh database every time, so it is always migrated.
+        with Database._schema_lock:
+            if self.db_path in Database._schema_checked:
+                return
+            with self._lock, self._pool.connection() as conn:
+                migrate(conn)
+            if self.db_path != ":memory:":
+                Database._schema_checked.add(self.db_path)
+            if self.search_index_backlog():
+                threading.Thread(target=self._run_search_index_backfill, daemon=True).start()
+
+    def save_conversation(self, session_id: str, role: str, content: str,
                          plugin_used: Optional[str] = None, tokens_used: int = 0):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+        with self._write() as cursor:
             cursor.execute('''
                 INSERT INTO conversations (session_id, role, content, plugin_used, tokens_used)
                 VALUES (?, ?, ?, ?, ?)
             ''', (session_id, role, content, plugin_used, tokens_used))
-            
-            conn.commit()
-            conn.close()
-    
+
+    def save_conversations(self, rows: Iterable[Tuple[str, str, str, Optional[str], int]]):
+        """Insert many (session_id, role, content, plugin_used, tokens_used) rows in one commit."""
+        with self._write() as cursor:
+            cursor.executemany('''
+                INSERT INTO conversations (session_id, role, content, plugin_used, tokens_used)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+
     def get_conversation_history(self, session_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
+        self._run_flush_hooks()
+        with self._read() as cursor:
             cursor.execute('''
-                SELECT role, content, plugin_used, created_at
+                SELECT id, role, content, plugin_used, created_at
                 FROM conversations
                 WHERE session_id = ?
-                ORDER BY created_at DESC
+                ORDER BY created_at DESC, id DESC
                 LIMIT ?
             ''', (session_id, limit))
-            
+
+            rows = cursor.fetchall()
+
+        history = [dict(row) for row in rows]
+        return list(reversed(history))
+
+    def get_latest_conversation_ids(self, session_id: str, limit: int) -> List[int]:
+        """Ids of the session's newest ``limit`` conversation rows, oldest first."""
+        self._run_flush_hooks()
+        with self._read() as cursor:
+            cursor.execute(
+                'SELECT id FROM conversations WHERE session_id = ? ORDER BY id DESC LIMIT ?',
+                (session_id, limit)
+            )
+            return [row[0] for row in reversed(cursor.fetchall())]
+
+    def get_plugin_training_pairs(self, limit: int = 5000) -> List[Tuple[str, Optional[str]]]:
+        """(user message, plugin_used of the reply to it) for the most recent replies across sessions."""
+        self._run_flush_hooks()
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT u.content, a.plugin_used
+                FROM conversations a
+                JOIN conversations u ON u.id = (
+                    SELECT MAX(id) FROM conversations
+                    WHERE session_id = a.session_id AND role = 'user' AND id < a.id
+                )
+                WHERE a.role = 'assistant'
+                ORDER BY a.id DESC
+                LIMIT ?
+            ''', (limit,))
             rows = cursor.fetchall()
-            conn.close()
-            
-            history = [dict(row) for row in rows]
-            return list(reversed(history))
-    
+        return [(row[0], row[1]) for row in rows]
+
     def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
+        self._run_flush_hooks()
+        with self._read() as cursor:
             cursor.execute('''
-                SELECT 
+                SELECT
                     session_id,
                     COUNT(*) as message_count,
                     MAX(created_at) as last_activity,
@@ -136,35 +303,62 @@ class Database:
                 ORDER BY MAX(created_at) DESC
                 LIMIT ?
             ''', (limit,))
-            
+
             rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
-    
+        return [dict(row) for row in rows]
+
     def update_plugin_stats(self, plugin_name: str, session_id: str):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+        """Record one use right away; AICore counts through PluginStatsAccumulator instead."""
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        self.add_plugin_stats([(plugin_name, session_id, 1, now)])
+
+    def add_plugin_stats(self, deltas: Iterable[Tuple[str, str, int, str]]):
+        """
+        Add aggregated (plugin_name, session_id, count, last_used) deltas in one commit.
+
+        last_used is a UTC 'YYYY-MM-DD HH:MM:SS' string, matching CURRENT_TIMESTAMP.
+        """
+        with self._write() as cursor:
+            cursor.executemany('''
+                INSERT INTO plugin_stats (plugin_name, session_id, execution_count, last_used)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(plugin_name, session_id) DO UPDATE SET
+                    execution_count = execution_count + excluded.execution_count,
+                    last_used = MAX(COALESCE(last_used, ''), excluded.last_used)
+            ''', deltas)
+
+    def get_conversation_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT summary, last_turn, token_count, updated_at
+                FROM conversation_summaries
+                WHERE session_id = ?
+            ''', (session_id,))
+            row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def save_conversation_summary(self, session_id: str, summary: str,
+                                  last_turn: Optional[int], token_count: int):
+        with self._write() as cursor:
             cursor.execute('''
-                INSERT OR REPLACE INTO plugin_stats (plugin_name, session_id, execution_count, last_used)
-                VALUES (?, ?, 
-                    COALESCE((SELECT execution_count + 1 FROM plugin_stats 
-                              WHERE plugin_name = ? AND session_id = ?), 1),
-                    CURRENT_TIMESTAMP)
-            ''', (plugin_name, session_id, plugin_name, session_id))
-            
-            conn.commit()
-            conn.close()
-    
+                INSERT INTO conversation_summaries (session_id, summary, last_turn, token_count, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    last_turn = excluded.last_turn,
+                    token_count = excluded.token_count,
+                    updated_at = excluded.updated_at
+            ''', (session_id, summary, last_turn, token_count))
+
+    def delete_conversation_summary(self, session_id: str):
+        with self._write() as cursor:
+            cursor.execute('DELETE FROM conversation_summaries WHERE session_id = ?', (session_id,))
+
     def get_plugin_stats(self) -> Dict[str, Any]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
+        self._run_flush_hooks()
+        with self._read() as cursor:
             cursor.execute('''
-                SELECT 
+                SELECT
                     plugin_name,
                     SUM(execution_count) as total_executions,
                     COUNT(DISTINCT session_id) as unique_sessions,
@@ -174,102 +368,124 @@ class Database:
                 GROUP BY plugin_name
                 ORDER BY total_executions DESC
             ''')
-            
+
             rows = cursor.fetchall()
-            conn.close()
-            
-            stats = {
-                "total_plugins": len(rows),
-                "plugins": [dict(row) for row in rows],
-                "total_executions": sum(row['total_executions'] for row in rows)
-            }
-            return stats
-    
+
+        stats = {
+            "total_plugins": len(rows),
+            "plugins": [dict(row) for row in rows],
+            "total_executions": sum(row['total_executions'] for row in rows)
+        }
+        return stats
+
     def save_reminder(self, session_id: str, reminder_text: str, due_time: datetime):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Store in SQLite-compatible format (space instead of 'T', no microseconds)
-            due_time_str = due_time.strftime('%Y-%m-%d %H:%M:%S')
-            
+        # Store in SQLite-compatible format (space instead of 'T', no microseconds)
+        due_time_str = due_time.strftime('%Y-%m-%d %H:%M:%S')
+        due_at = int(due_time.timestamp())
+
+        with self._write() as cursor:
             cursor.execute('''
-                INSERT INTO reminders (session_id, reminder_text, due_time)
-                VALUES (?, ?, ?)
-            ''', (session_id, reminder_text, due_time_str))
-            
-            conn.commit()
-            conn.close()
-    
+                INSERT INTO reminders (session_id, reminder_text, due_time, due_at)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, reminder_text, due_time_str, due_at))
+            reminder_id = cursor.lastrowid
+
+        self._notify_reminder_listeners("added", {
+            "id": reminder_id,
+            "session_id": session_id,
+            "reminder_text": reminder_text,
+            "due_time": due_time_str,
+            "due_at": due_at
+        })
+        return reminder_id
+
     def get_due_reminders(self, session_id: str) -> List[Dict[str, Any]]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Use datetime() function on due_time to ensure consistent comparison
+        with self._read() as cursor:
             cursor.execute('''
                 SELECT id, reminder_text, due_time
                 FROM reminders
-                WHERE session_id = ? 
-                  AND completed = 0 
-                  AND datetime(due_time) <= datetime('now', 'localtime')
-                ORDER BY due_time ASC
-            ''', (session_id,))
-            
+                WHERE session_id = ?
+                  AND completed = 0
+                  AND due_at <= ?
+                ORDER BY due_at ASC
+            ''', (session_id, int(time.time())))
+
             rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
-    
+        return [dict(row) for row in rows]
+
     def mark_reminder_completed(self, reminder_id: int):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+        with self._write() as cursor:
             cursor.execute('''
                 UPDATE reminders
                 SET completed = 1
                 WHERE id = ?
             ''', (reminder_id,))
-            
-            conn.commit()
-            conn.close()
-    
+
+        self._notify_reminder_listeners("completed", {"id": reminder_id})
+
     def get_user_settings(self, user_id: str = "default") -> Dict[str, Any]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
+        key = (self.db_path, user_id)
+        with Database._settings_lock:
+            cached = Database._settings_cache.get(key)
+            if cached:
+                Database._settings_cache.move_to_end(key)
+            generation = self._settings_generation(key)
+        if cached and (self.settings_ttl is None or time.monotonic() - cached[0] < self.settings_ttl):
+            return dict(cached[1])
+
+        loaded_at = time.monotonic()
+        settings = self._load_user_settings(user_id)
+        with Database._settings_lock:
+            if self._settings_generation(key) == generation:
+                Database._settings_cache[key] = (loaded_at, settings)
+                Database._settings_cache.move_to_end(key)
+                while len(Database._settings_cache) > Database._settings_cache_size:
+                    Database._settings_cache.popitem(last=False)
+        return dict(settings)
+
+    def _settings_generation(self, key: Tuple[str, str]) -> Tuple[int, int]:
+        # Call with _settings_lock held.
+        generations = Database._settings_generations
+        return generations.get(key, 0), generations.get((self.db_path, None), 0)
+
+    def invalidate_user_settings(self, user_id: Optional[str] = None):
+        """Drop cached settings for ``user_id``, or for every user of this database."""
+        with Database._settings_lock:
+            key = (self.db_path, user_id)
+            Database._settings_generations[key] = Database._settings_generations.get(key, 0) + 1
+            if user_id is not None:
+                Database._settings_cache.pop(key, None)
+                return
+            for key in [k for k in Database._settings_cache if k[0] == self.db_path]:
+                del Database._settings_cache[key]
+
+    def _load_user_settings(self, user_id: str) -> Dict[str, Any]:
+        with self._read() as cursor:
             cursor.execute('''
                 SELECT * FROM user_settings
                 WHERE user_id = ?
             ''', (user_id,))
-            
+
             row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                return dict(row)
-            else:
-                return {
-                    "user_id": user_id,
-                    "default_city": "London",
-                    "preferred_news_category": "general",
-                    "timezone": "UTC",
-                    "assistant_name": "Jarvis"
-                }
-    
+
+        if row:
+            return dict(row)
+        else:
+            return {
+                "user_id": user_id,
+                "default_city": "London",
+                "preferred_news_category": "general",
+                "timezone": "UTC",
+                "assistant_name": "Jarvis"
+            }
+
     def update_user_settings(self, user_id: str, settings: Dict[str, Any]):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            existing = self.get_user_settings(user_id)
-            updated_settings = {**existing, **settings}
-            
+        existing = self.get_user_settings(user_id)
+        updated_settings = {**existing, **settings}
+
+        with self._write() as cursor:
             cursor.execute('''
-                INSERT OR REPLACE INTO user_settings 
+                INSERT OR REPLACE INTO user_settings
                 (user_id, default_city, preferred_news_category, timezone, assistant_name, updated_at)
                 VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
             ''', (
@@ -279,127 +495,328 @@ class Database:
                 updated_settings.get("timezone"),
                 updated_settings.get("assistant_name")
             ))
-            
-            conn.commit()
-            conn.close()
-    
+
+        self.invalidate_user_settings(user_id)
+
     def cleanup_old_conversations(self, days_to_keep: int = 30):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+        from assistant.retention import RetentionWorker
+        worker = RetentionWorker(self, days_to_keep=days_to_keep)
+        return worker.run_once()["deleted"]
+
+    def delete_conversations_before(self, cutoff: str, limit: int) -> int:
+        """Delete at most ``limit`` conversations created before ``cutoff`` (UTC 'YYYY-MM-DD HH:MM:SS')."""
+        with self._write() as cursor:
             cursor.execute('''
                 DELETE FROM conversations
-                WHERE created_at < datetime('now', ?)
-            ''', (f'-{days_to_keep} days',))
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            
-            cursor.execute('VACUUM')
-            conn.close()
-            
-            return deleted_count
-    
+                WHERE id IN (
+                    SELECT id FROM conversations
+                    WHERE created_at < ?
+                    LIMIT ?
+                )
+            ''', (cutoff, limit))
+            return cursor.rowcount
+
+    def get_auto_vacuum_mode(self) -> int:
+        """Return SQLite's auto_vacuum mode: 0 none, 1 full, 2 incremental."""
+        with self._read() as cursor:
+            return cursor.execute('PRAGMA auto_vacuum').fetchone()[0]
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to ``pages`` free pages to the OS and report how many are still free."""
+        with self._lock, self._pool.connection() as conn:
+            conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+            return conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    def enable_incremental_vacuum(self):
+        """
+        Switch an existing database to incremental auto-vacuum.
+
+        This needs one full VACUUM to rewrite the file, so run it during a
+        maintenance window; databases created by this version already use it.
+        """
+        if self.get_auto_vacuum_mode() == 2:
+            return
+        with self._lock, self._pool.connection() as conn:
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
+
+    def get_cached_plugin_result(self, cache_key: str) -> Optional[Tuple[str, float]]:
+        """Return (result, expires_at) for an unexpired cached plugin result, or None."""
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT result, expires_at FROM plugin_result_cache
+                WHERE cache_key = ? AND expires_at > ?
+            ''', (cache_key, time.time()))
+            row = cursor.fetchone()
+        return (row['result'], row['expires_at']) if row else None
+
+    def save_cached_plugin_result(self, cache_key: str, plugin_name: str, result: str, expires_at: float):
+        with self._write() as cursor:
+            cursor.execute('''
+                INSERT INTO plugin_result_cache (cache_key, plugin_name, result, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    result = excluded.result,
+                    expires_at = excluded.expires_at
+            ''', (cache_key, plugin_name, result, expires_at))
+
+    def prune_plugin_result_cache(self, max_rows: int) -> int:
+        """Delete expired cached results, then the soonest-expiring ones beyond ``max_rows``."""
+        with self._write() as cursor:
+            cursor.execute('DELETE FROM plugin_result_cache WHERE expires_at <= ?', (time.time(),))
+            deleted = cursor.rowcount
+            cursor.execute('''
+                DELETE FROM plugin_result_cache WHERE cache_key IN (
+                    SELECT cache_key FROM plugin_result_cache
+                    ORDER BY expires_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (max_rows,))
+            return deleted + cursor.rowcount
+
+    def get_cached_response(self, cache_key: str) -> Optional[str]:
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT response FROM llm_response_cache
+                WHERE cache_key = ? AND expires_at > ?
+            ''', (cache_key, time.time()))
+            row = cursor.fetchone()
+        return row['response'] if row else None
+
+    def save_cached_response(self, cache_key: str, response: str, ttl: float):
+        now = time.time()
+        with self._write() as cursor:
+            cursor.execute('''
+                INSERT INTO llm_response_cache (cache_key, response, created_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    response = excluded.response,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+            ''', (cache_key, response, now, now + ttl))
+
+    def prune_response_cache(self, max_rows: int) -> int:
+        """Delete expired cached replies, then the oldest ones beyond ``max_rows``."""
+        with self._write() as cursor:
+            cursor.execute('DELETE FROM llm_response_cache WHERE expires_at <= ?', (time.time(),))
+            deleted = cursor.rowcount
+            cursor.execute('''
+                DELETE FROM llm_response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_response_cache
+                    ORDER BY created_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (max_rows,))
+            return deleted + cursor.rowcount
+
     def get_pending_reminders(self, session_id: str) -> List[Dict[str, Any]]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
+        with self._read() as cursor:
             cursor.execute('''
                 SELECT id, reminder_text, due_time, created_at
                 FROM reminders
-                WHERE session_id = ? 
-                AND completed = 0 
-                AND datetime(due_time) > datetime('now', 'localtime')
-                ORDER BY due_time ASC
+                WHERE session_id = ?
+                AND completed = 0
+                AND due_at > ?
+                ORDER BY due_at ASC
+            ''', (session_id, int(time.time())))
+
+            rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    def get_open_reminders(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return every uncompleted reminder for the session, overdue or not."""
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT id, session_id, reminder_text, due_time, due_at
+                FROM reminders
+                WHERE session_id = ?
+                AND completed = 0
+                ORDER BY due_at ASC
             ''', (session_id,))
-            
+
             rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
     def get_all_reminders(self, session_id: str) -> List[Dict[str, Any]]:
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
+        with self._read() as cursor:
             cursor.execute('''
                 SELECT id, reminder_text, due_time, completed, created_at
                 FROM reminders
                 WHERE session_id = ?
-                ORDER BY due_time ASC
+                ORDER BY due_at ASC
             ''', (session_id,))
-            
+
             rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
-    def init_notes_table(self):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    title TEXT,
-                    content TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            conn.commit()
-            conn.close()
+        return [dict(row) for row in rows]
 
     def save_note(self, session_id: str, content: str, title: str = None):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        with self._write() as cursor:
             cursor.execute('''
                 INSERT INTO notes (session_id, title, content)
                 VALUES (?, ?, ?)
             ''', (session_id, title, content))
             note_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return note_id
+        return note_id
 
     def get_notes(self, session_id: str, limit: int = 10):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        with self._read() as cursor:
             cursor.execute('''
                 SELECT id, title, content, created_at FROM notes
                 WHERE session_id = ?
-                ORDER BY created_at DESC
+                ORDER BY created_at DESC, id DESC
                 LIMIT ?
             ''', (session_id, limit))
             rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
+        return [dict(row) for row in rows]
 
     def get_note(self, note_id: int):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        with self._read() as cursor:
             cursor.execute('''
                 SELECT id, title, content, created_at FROM notes
                 WHERE id = ?
             ''', (note_id,))
             row = cursor.fetchone()
-            conn.close()
-            return dict(row) if row else None
+        return dict(row) if row else None
+
+    def _has_table(self, cursor: sqlite3.Cursor, name: str) -> bool:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+        return cursor.fetchone() is not None
+
+    def search_index_backlog(self) -> int:
+        """Ids that predate full-text search and are still to be indexed (0 when done)."""
+        with self._read() as cursor:
+            if not self._has_table(cursor, 'search_index_backfill'):
+                return 0
+            cursor.execute('SELECT COALESCE(SUM(target - indexed_through), 0) FROM search_index_backfill')
+            return cursor.fetchone()[0]
+
+    def backfill_search_index(self, batch_size: int = 1000) -> int:
+        """
+        Index the next ``batch_size`` ids of pre-existing notes and
+        conversations (see migrations._add_full_text_search) in one short
+        write transaction, and return the backlog left.
+        """
+        left = 0
+        with self._write() as cursor:
+            # Take the write lock before reading progress so processes sharing
+            # the file never index the same rows twice.
+            cursor.execute('BEGIN IMMEDIATE')
+            if not self._has_table(cursor, 'search_index_backfill'):
+                return 0
+            cursor.execute('''
+                SELECT table_name, indexed_through, target
+                FROM search_index_backfill
+                WHERE indexed_through < target
+            ''')
+            for table, indexed_through, target in cursor.fetchall():
+                columns = 'session_id, title, content' if table == 'notes' else 'session_id, content'
+                upper = min(indexed_through + batch_size, target)
+                cursor.execute(f'''
+                    INSERT INTO {table}_fts(rowid, {columns})
+                    SELECT id, {columns} FROM {table} WHERE id > ? AND id <= ?
+                ''', (indexed_through, upper))
+                cursor.execute(
+                    'UPDATE search_index_backfill SET indexed_through = ? WHERE table_name = ?',
+                    (upper, table)
+                )
+                left += target - upper
+        return left
+
+    def _run_search_index_backfill(self, batch_size: int = 1000, pause: float = 0.05):
+        # Started after migrating a database that had rows before search was
+        # added; the pause between batches lets chat writes through.
+        started = time.perf_counter()
+        try:
+            while not self._closed and self.backfill_search_index(batch_size):
+                time.sleep(pause)
+        except sqlite3.Error as e:
+            print(f"Search index backfill stopped: {e}")
+            return
+        if not self._closed:
+            print(f"Search index backfill finished in {time.perf_counter() - started:.1f}s")
+
+    def search_notes(self, session_id: Optional[str], query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over notes, best matches first.
+
+        Each result has id, title, snippet (matched terms in [brackets]),
+        created_at and rank (lower is better). Pass session_id=None to
+        search every session.
+        """
+        match = build_fts_query(query)
+        if not match:
+            return []
+
+        with self._read() as cursor:
+            if not self._has_table(cursor, 'notes_fts'):
+                return self._like_search(cursor, 'notes', 'id, title, content AS snippet, created_at',
+                                         session_id, query, limit)
+            sql = '''
+                SELECT n.id, n.title,
+                       snippet(notes_fts, 2, '[', ']', '...', 12) AS snippet,
+                       n.created_at,
+                       bm25(notes_fts, 0.0, 5.0, 1.0) AS rank
+                FROM notes_fts
+                JOIN notes n ON n.id = notes_fts.rowid
+                WHERE notes_fts MATCH ?
+            '''
+            params: List[Any] = [match]
+            if session_id is not None:
+                sql += " AND n.session_id = ?"
+                params.append(session_id)
+            cursor.execute(sql + " ORDER BY rank LIMIT ?", params + [limit])
+            rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    def search_conversations(self, session_id: Optional[str], query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over conversation turns, best matches first.
+
+        Each result has id, session_id, role, snippet, created_at and rank.
+        Pass session_id=None to search every session.
+        """
+        self._run_flush_hooks()
+        match = build_fts_query(query)
+        if not match:
+            return []
+
+        with self._read() as cursor:
+            if not self._has_table(cursor, 'conversations_fts'):
+                return self._like_search(cursor, 'conversations',
+                                         'id, session_id, role, content AS snippet, created_at',
+                                         session_id, query, limit)
+            sql = '''
+                SELECT c.id, c.session_id, c.role,
+                       snippet(conversations_fts, 1, '[', ']', '...', 12) AS snippet,
+                       c.created_at,
+                       bm25(conversations_fts, 0.0, 1.0) AS rank
+                FROM conversations_fts
+                JOIN conversations c ON c.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ?
+            '''
+            params: List[Any] = [match]
+            if session_id is not None:
+                sql += " AND c.session_id = ?"
+                params.append(session_id)
+            cursor.execute(sql + " ORDER BY rank LIMIT ?", params + [limit])
+            rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    def _like_search(self, cursor: sqlite3.Cursor, table: str, columns: str,
+                     session_id: Optional[str], query: str, limit: int) -> List[Dict[str, Any]]:
+        # Used only when SQLite lacks FTS5; scans the table, newest first.
+        sql = f"SELECT {columns} FROM {table} WHERE content LIKE ?"
+        params: List[Any] = [f"%{query}%"]
+        if session_id is not None:
+            sql += " AND session_id = ?"
+            params.append(session_id)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
 
     def delete_note(self, note_id: int):
-        with self._lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        with self._write() as cursor:
             cursor.execute('DELETE FROM notes WHERE id = ?', (note_id,))
             deleted = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
-            return deleted
\ No newline at end of file
+        return deleted
@@ -0,0 +1,253 @@
+"""
+Offline intent classifier that picks a plugin for simple requests without an LLM call.
+
+Requests are turned into hashed word, word-pair and character n-gram
+features and scored by a multinomial logistic regression. Training data
+comes from the plugins' own metadata and examples plus logged
+conversations whose reply used a plugin. NumPy is used when installed;
+otherwise the same model runs on plain Python lists.
+"""
+import json
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Label for requests that need the model rather than a plugin.
+NO_TOOL = "__none__"
+MODEL_VERSION = 1
+N_FEATURES = 2 ** 16
+
+# Values of conversations.plugin_used written by the direct handlers, mapped to plugin names.
+PLUGIN_ALIASES = {"reminder": "set_reminder"}
+
+# Replies this classifier routed are logged with plugin_used "classifier:<plugin>"
+# so training never learns from the model's own guesses.
+CLASSIFIER_SOURCE_PREFIX = "classifier:"
+
+# Requests that should reach the model, so NO_TOOL is learnt even before anything is logged.
+NO_TOOL_EXAMPLES = [
+    "hello", "hi there", "thanks a lot", "who are you", "how are you doing today",
+    "tell me a joke", "write a poem about the sea", "explain how photosynthesis works",
+    "what is the capital of australia", "translate good morning into spanish",
+    "summarize the plot of hamlet", "give me tips for a job interview",
+    "what should I cook for dinner tonight", "recommend a good book",
+    "why is the sky blue", "help me write an email to my boss",
+    "what's the difference between tcp and udp", "can you help me plan a trip to japan",
+    "I'm feeling a bit stressed", "what do you think about that",
+    "tell me more", "why", "ok", "what was my name again"
+]
+
+_TOKENS = re.compile(r"[a-z]+|\d+(?:\.\d+)?|[^\w\s]")
+_DIGITS = re.compile(r"\d")
+
+
+def _hash(feature: str) -> int:
+    # crc32 rather than hash(): str hashes are salted per process.
+    return zlib.crc32(feature.encode("utf-8")) % N_FEATURES
+
+
+def featurize(text: str) -> Dict[int, float]:
+    """
+    Hashed word unigrams and bigrams plus character 3-grams of each word,
+    with digits collapsed to 0, log-scaled and L2-normalised.
+    """
+    tokens = [_DIGITS.sub("0", t) for t in _TOKENS.findall(text.lower())]
+    features = ["w:" + t for t in tokens]
+    features += ["b:" + a + " " + b for a, b in zip(["^"] + tokens, tokens + ["$"])]
+    for token in tokens:
+        if token.isalpha() and len(token) > 2:
+            padded = f"<{token}>"
+            features += ["c:" + padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    counts: Dict[int, float] = {}
+    for feature in features:
+        index = _hash(feature)
+        counts[index] = counts.get(index, 0.0) + 1.0
+    for index, count in counts.items():
+        counts[index] = 1.0 + math.log(count)
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {index: v / norm for index, v in counts.items()}
+
+
+def _softmax(scores: Sequence[float]) -> List[float]:
+    top = max(scores)
+    exps = [math.exp(s - top) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class IntentClassifier:
+    """Linear softmax classifier over hashed n-gram features."""
+
+    def __init__(self, labels: Sequence[str]):
+        self.labels = list(labels)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        n_labels = len(self.labels)
+        if np is not None:
+            self._weights = np.zeros((N_FEATURES, n_labels), dtype=np.float32)
+            self._bias = np.zeros(n_labels, dtype=np.float32)
+        else:
+            self._weights: Dict[int, List[float]] = {}
+            self._bias = [0.0] * n_labels
+
+    def _scores(self, features: Dict[int, float]) -> List[float]:
+        if np is not None:
+            if not features:
+                return self._bias.tolist()
+            indices = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+            values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+            return (self._bias + values @ self._weights[indices]).tolist()
+        scores = list(self._bias)
+        for index, value in features.items():
+            row = self._weights.get(index)
+            if row is not None:
+                for c, w in enumerate(row):
+                    scores[c] += w * value
+        return scores
+
+    def _update(self, features: Dict[int, float], gradient: List[float], lr: float, l2: float):
+        if np is not None:
+            indices = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+            values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+            grad = np.asarray(gradient, dtype=np.float32)
+            rows = self._weights[indices]
+            self._weights[indices] = rows - lr * (np.outer(values, grad) + l2 * rows)
+            self._bias -= lr * grad
+            return
+        n_labels = len(self.labels)
+        for index, value in features.items():
+            row = self._weights.setdefault(index, [0.0] * n_labels)
+            for c in range(n_labels):
+                row[c] -= lr * (gradient[c] * value + l2 * row[c])
+        for c in range(n_labels):
+            self._bias[c] -= lr * gradient[c]
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 30,
+            learning_rate: float = 0.5, l2: float = 1e-5, seed: int = 13) -> "IntentClassifier":
+        """Plain SGD on the cross-entropy loss with a decaying learning rate."""
+        samples = [(featurize(text), self._index[label]) for text, label in zip(texts, labels)]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(samples)
+            lr = learning_rate / (1.0 + 0.2 * epoch)
+            for features, target in samples:
+                gradient = _softmax(self._scores(features))
+                gradient[target] -= 1.0
+                self._update(features, gradient, lr, l2)
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        return dict(zip(self.labels, _softmax(self._scores(featurize(text)))))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """The most likely label and its probability."""
+        probabilities = _softmax(self._scores(featurize(text)))
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+        return self.labels[best], probabilities[best]
+
+    def _rows(self) -> Iterable[Tuple[int, List[float]]]:
+        if np is not None:
+            for index in np.flatnonzero(np.any(self._weights != 0, axis=1)):
+                yield int(index), self._weights[index].tolist()
+        else:
+            yield from self._weights.items()
+
+    def save(self, path: str):
+        model = {
+            "version": MODEL_VERSION,
+            "n_features": N_FEATURES,
+            "labels": self.labels,
+            "bias": [round(float(b), 6) for b in self._bias],
+            "weights": {str(index): [round(w, 6) for w in row] for index, row in self._rows()}
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(model, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            model = json.load(f)
+        if model.get("version") != MODEL_VERSION or model.get("n_features") != N_FEATURES:
+            raise ValueError(f"{path} was trained by an incompatible classifier version; retrain it")
+        classifier = cls(model["labels"])
+        for index, row in model["weights"].items():
+            if np is not None:
+                classifier._weights[int(index)] = row
+            else:
+                classifier._weights[int(index)] = list(row)
+        if np is not None:
+            classifier._bias = np.asarray(model["bias"], dtype=np.float32)
+        else:
+            classifier._bias = list(model["bias"])
+        return classifier
+
+
+def examples_from_plugins(plugins: Iterable[Any]) -> List[Tuple[str, str]]:
+    """(text, plugin name) pairs from each plugin's name, description and examples."""
+    examples = []
+    for plugin in plugins:
+        name = plugin.get_name()
+        examples.append((name.replace("_", " "), name))
+        examples.append((plugin.get_description(), name))
+        examples.extend((example, name) for example in plugin.get_examples())
+    return examples
+
+
+def examples_from_conversations(database, plugin_names: Iterable[str], limit: int = 5000) -> List[Tuple[str, str]]:
+    """
+    (user message, label) pairs from logged replies: the plugin the reply
+    used (the first one, for replies that called several), or NO_TOOL when
+    it used none. Errors, replies the classifier itself routed and plugins
+    that are no longer registered are skipped.
+    """
+    known = set(plugin_names)
+    examples = []
+    for text, plugin_used in database.get_plugin_training_pairs(limit):
+        if not text or not text.strip():
+            continue
+        if plugin_used is None:
+            examples.append((text, NO_TOOL))
+            continue
+        if plugin_used.startswith(CLASSIFIER_SOURCE_PREFIX):
+            continue
+        plugin_used = PLUGIN_ALIASES.get(plugin_used, plugin_used)
+        if plugin_used in known:
+            examples.append((text, plugin_used))
+    return examples
+
+
+def train(examples: Sequence[Tuple[str, str]], **fit_options) -> IntentClassifier:
+    labels = sorted({label for _, label in examples} | {NO_TOOL})
+    texts = [text for text, _ in examples]
+    targets = [label for _, label in examples]
+    return IntentClassifier(labels).fit(texts, targets, **fit_options)
+
+
+_models: Dict[str, Optional[IntentClassifier]] = {}
+_models_lock = threading.Lock()
+
+
+def load_intent_classifier(path: str) -> Optional[IntentClassifier]:
+    """
+    Return the process-wide classifier stored at ``path``, or None if it has
+    not been trained (see train_intent_classifier.py) or cannot be read.
+    """
+    with _models_lock:
+        if path not in _models:
+            classifier = None
+            if os.path.exists(path):
+                try:
+                    classifier = IntentClassifier.load(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Could not load intent classifier from {path}: {e}")
+            _models[path] = classifier
+        return _models[path]
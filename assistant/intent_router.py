@@ -0,0 +1,218 @@
+"""
+Single-pass intent routing for the assistant's local (non-LLM) handlers.
+
+Every keyword any handler checks is compiled into one regex that reports
+which of them occur in a message in a single left-to-right scan, so a
+message is lowercased and scanned once instead of once per ``in`` test.
+The routing functions then work on set intersections, in the same
+priority order and with the same substring semantics as the checks they
+replace. The regexes the handlers use are precompiled here too.
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+# Direct handlers tried before the LLM, in priority order (AICore._process_directly)
+REMINDER_WORDS = frozenset(['remind', 'reminder', 'alarm', 'notify', 'remember'])
+ORGANIZE_WORDS = frozenset(['organize files', 'organize folder'])
+CALC_WORDS = frozenset(['calculate', 'what is', '=', 'multiplied', 'divided', 'plus', 'minus'])
+
+# Offline fallback (AICore._fallback_response)
+FALLBACK_TIME_WORDS = frozenset(['time', 'clock'])
+FALLBACK_CALENDAR_WORDS = frozenset(['calendar', 'events', 'schedule'])
+FALLBACK_CALC_WORDS = frozenset(['calculate', 'what is', '='])
+
+# Canned local replies (LocalAI.process)
+GREETING_WORDS = frozenset(['hello', 'hi', 'hey', 'greetings'])
+FAREWELL_WORDS = frozenset(['bye', 'goodbye', 'exit', 'quit', 'see you'])
+HELP_WORDS = frozenset(['help', 'what can you do', 'capabilities'])
+THANKS_WORDS = frozenset(['thanks', 'thank you', 'appreciate'])
+IDENTITY_WORDS = frozenset(['who are you', 'your name', 'what are you'])
+
+KEYWORDS = (REMINDER_WORDS | ORGANIZE_WORDS | CALC_WORDS | FALLBACK_TIME_WORDS | FALLBACK_CALENDAR_WORDS
+            | FALLBACK_CALC_WORDS | GREETING_WORDS | FAREWELL_WORDS | HELP_WORDS | THANKS_WORDS
+            | IDENTITY_WORDS | {'date', 'weather', 'news', 'how are you'})
+
+CALC_EXPRESSION = re.compile(r'\d+\s*[\+\-\*\/]\s*\d+')
+CALC_PREFIX = re.compile(r'(calculate|what is|equals?|=)')
+WHAT_IS_NUMBER = re.compile(r'what is \d+')
+ORGANIZE_TARGET = re.compile(r'organize (?:files|folder)(?:\s+in)?\s+(.+)')
+WEATHER_CITY = re.compile(r'weather\s+(?:in\s+)?([a-zA-Z\s]+)')
+NEWS_CATEGORY = re.compile(r'news\s+(?:about\s+)?([a-zA-Z]+)')
+
+# (pattern, task group, time group) tried in order by parse_reminder
+REMINDER_PATTERNS = [(re.compile(pattern), task_idx, time_idx) for pattern, task_idx, time_idx in [
+    # task first, then time
+    (r'remind\s+me\s+to\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+    (r'set\s+(?:a\s+)?reminder\s+for\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+    (r'remind\s+me\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+    (r'reminder\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+    # time first, then task
+    (r'(?:at|on|in)\s+(.+?)\s+remind\s+me\s+to\s+(.+)', 2, 1),
+    (r'(?:at|on|in)\s+(.+?)\s+set\s+(?:a\s+)?reminder\s+for\s+(.+)', 2, 1),
+    (r'remind\s+me\s+(?:at|on|in)\s+(.+?)\s+to\s+(.+)', 2, 1),
+    (r'remind\s+(?:at|on|in)\s+(.+?)\s+to\s+(.+)', 2, 1),
+    (r'set\s+(?:a\s+)?reminder\s+(?:at|on|in)\s+(.+?)\s+for\s+(.+)', 2, 1),
+    (r'(?:at|on|in)\s+(.+?)\s+(?:remind\s+me|reminder)\s+(.+)', 2, 1),
+    # very generic last resort
+    (r'(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+]]
+REMINDER_TIME = re.compile(
+    r'(?:at|on|in)\s+(\d+\s*(?:minutes?|hours?|days?|weeks?|am|pm)|tomorrow|next\s+\w+|\d{1,2}(?::\d{2})?\s*(?:am|pm)?)'
+)
+REMINDER_TASK_PREFIX = re.compile(r'^(?:to|a|the|my)\s+')
+REMINDER_COMMAND_PREFIX = re.compile(r'^(remind\s+me|set\s+(?:a\s+)?reminder|reminder)\s+')
+TRAILING_TO = re.compile(r'\s+to$')
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Compile words into a regex shaped like their prefix trie, e.g. remind(?:er)?|remember -> rem(?:ind(?:er)?|ember)."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordScanner:
+    """
+    Finds every keyword occurring anywhere in a text in one regex scan.
+
+    The keywords are compiled into a prefix-trie regex, so at each offset a
+    mismatch is rejected after one character instead of after trying every
+    keyword. The regex sits inside a lookahead, so it is tried at every
+    offset without consuming input. Greedy optional suffixes make each
+    offset report the longest keyword starting there. Any shorter keyword
+    starting at the same offset is a prefix of that one, so each match also
+    yields every keyword it contains. The result is exactly the set of k
+    for which ``k in text`` holds.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        words = sorted(set(keywords))
+        self._pattern = re.compile('(?=(' + _trie_pattern(words) + '))')
+        self._contained: Dict[str, FrozenSet[str]] = {
+            k: frozenset(other for other in words if other in k) for k in words
+        }
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        found = set()
+        contained = self._contained
+        for match in self._pattern.finditer(text):
+            found |= contained[match.group(1)]
+        return frozenset(found)
+
+
+_scanner = KeywordScanner(KEYWORDS)
+
+
+class Message:
+    """A user message lowercased and scanned once, shared by every handler that inspects it."""
+    __slots__ = ('text', 'lower', 'keywords')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.keywords = _scanner.scan(self.lower)
+
+    def has_any(self, words: FrozenSet[str]) -> bool:
+        return not self.keywords.isdisjoint(words)
+
+    def has(self, word: str) -> bool:
+        return word in self.keywords
+
+
+def analyze(text: str) -> Message:
+    return Message(text)
+
+
+def direct_intents(message: Message) -> Tuple[str, ...]:
+    """Local handlers to try before the LLM, in order; each may decline and fall through."""
+    intents = []
+    if message.has_any(REMINDER_WORDS):
+        intents.append('reminder')
+    if message.has_any(ORGANIZE_WORDS):
+        intents.append('organize_files')
+    if message.has_any(CALC_WORDS) or CALC_EXPRESSION.search(message.lower):
+        intents.append('calculate')
+    return tuple(intents)
+
+
+def parse_reminder(message: Message) -> Optional[Tuple[str, str]]:
+    """Extract (task, when) from a reminder request, or None if no time expression is found."""
+    text_lower = message.lower
+    for pattern, task_idx, time_idx in REMINDER_PATTERNS:
+        match = pattern.search(text_lower)
+        if match:
+            groups = match.groups()
+            task = groups[task_idx-1].strip()
+            when = groups[time_idx-1].strip()
+            # Clean up task: remove leading 'to', 'a', 'the', 'my'
+            task = REMINDER_TASK_PREFIX.sub('', task)
+            # If task is just 'remind' or 'reminder', skip this pattern
+            if task in ['remind', 'reminder']:
+                continue
+            return task, when
+
+    # Fallback: extract any time expression
+    time_match = REMINDER_TIME.search(text_lower)
+    if time_match:
+        time_expr = time_match.group(0).strip()
+        task = text_lower.replace(time_expr, '').strip()
+        task = REMINDER_COMMAND_PREFIX.sub('', task)
+        task = TRAILING_TO.sub('', task)
+        if task and task not in ['remind', 'reminder']:
+            return task, time_expr
+    return None
+
+
+def fallback_intents(message: Message) -> Tuple[str, ...]:
+    """Offline skill handlers for when Gemini is unavailable, in order."""
+    intents = []
+    if message.has_any(FALLBACK_TIME_WORDS) or message.has('date'):
+        intents.append('time_date')
+    if message.has('weather'):
+        intents.append('weather')
+    if message.has('news'):
+        intents.append('news')
+    if message.has_any(FALLBACK_CALENDAR_WORDS):
+        intents.append('calendar')
+    if message.has_any(FALLBACK_CALC_WORDS):
+        intents.append('calculate')
+    return tuple(intents)
+
+
+def local_intent(message: Message) -> str:
+    """The LocalAI reply category for a message."""
+    if message.has_any(GREETING_WORDS):
+        return 'greeting'
+    if message.has_any(FAREWELL_WORDS):
+        return 'farewell'
+    if message.has_any(HELP_WORDS):
+        return 'help'
+    if message.has_any(THANKS_WORDS):
+        return 'thanks'
+    if message.has('time') and not message.has('date'):
+        return 'time'
+    if message.has('date'):
+        return 'date'
+    if message.has('weather'):
+        return 'weather'
+    if message.has('news'):
+        return 'news'
+    if message.has('calculate') or WHAT_IS_NUMBER.search(message.lower):
+        return 'calculate'
+    if message.has_any(IDENTITY_WORDS):
+        return 'identity'
+    if message.has('how are you'):
+        return 'how_are_you'
+    return 'unknown'
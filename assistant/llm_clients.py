@@ -0,0 +1,61 @@
+"""
+Process-wide OpenAI-compatible clients for Gemini.
+
+Every AICore shares these instead of building its own client, so HTTP
+connections are kept alive and reused across sessions.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Dict
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from config.settings import Settings
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+_clients: Dict[str, OpenAI] = {}
+# httpx async connections belong to the loop that opened them, so the async
+# client is shared per event loop (one per process under an ASGI server).
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=Settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=Settings.LLM_MAX_CONNECTIONS
+    )
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=GEMINI_BASE_URL,
+                timeout=Settings.LLM_TIMEOUT,
+                http_client=httpx.Client(limits=_limits(), timeout=Settings.LLM_TIMEOUT)
+            )
+            _clients[api_key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """The AsyncOpenAI client for ``api_key`` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=GEMINI_BASE_URL,
+                timeout=Settings.LLM_TIMEOUT,
+                http_client=httpx.AsyncClient(limits=_limits(), timeout=Settings.LLM_TIMEOUT)
+            )
+            clients[api_key] = client
+        return client
@@ -1,6 +1,8 @@
 import random
-import re
 from datetime import datetime
+from typing import Optional
+
+from assistant import intent_router
 
 class LocalAI:
     def __init__(self):
@@ -32,49 +34,41 @@ class LocalAI:
             ]
         }
 
-    def process(self, text: str) -> str:
-        text_lower = text.lower()
-
-        if any(word in text_lower for word in ['hello', 'hi', 'hey', 'greetings']):
-            return random.choice(self.responses["greeting"])
-
-        if any(word in text_lower for word in ['bye', 'goodbye', 'exit', 'quit', 'see you']):
-            return random.choice(self.responses["farewell"])
-
-        if any(word in text_lower for word in ['help', 'what can you do', 'capabilities']):
-            return random.choice(self.responses["help"])
+    def process(self, text: str, message: Optional[intent_router.Message] = None) -> str:
+        message = message or intent_router.analyze(text)
+        intent = intent_router.local_intent(message)
 
-        if any(word in text_lower for word in ['thanks', 'thank you', 'appreciate']):
-            return random.choice(self.responses["thanks"])
+        if intent in ("greeting", "farewell", "help", "thanks"):
+            return random.choice(self.responses[intent])
 
-        if 'time' in text_lower and 'date' not in text_lower:
+        if intent == "time":
             now = datetime.now()
             return f"The current time is {now.strftime('%I:%M %p')}."
 
-        if 'date' in text_lower:
+        if intent == "date":
             now = datetime.now()
             return f"Today is {now.strftime('%A, %B %d, %Y')}."
 
-        if 'weather' in text_lower:
-            city_match = re.search(r'weather\s+(?:in\s+)?([a-zA-Z\s]+)', text_lower)
+        if intent == "weather":
+            city_match = intent_router.WEATHER_CITY.search(message.lower)
             city = city_match.group(1).strip() if city_match else None
             city_msg = f" in {city}" if city else ""
             return f"I can check weather{city_msg} if you add a Weather API key to the .env file."
 
-        if 'news' in text_lower:
+        if intent == "news":
             return "I can fetch news if you add a NewsAPI key to the .env file."
 
-        if 'calculate' in text_lower or re.search(r'what is \d+', text_lower):
+        if intent == "calculate":
             return "I can perform calculations if you add a WolframAlpha API key to the .env file."
 
-        if any(word in text_lower for word in ['who are you', 'your name', 'what are you']):
+        if intent == "identity":
             return "I'm Jarvis, your AI personal assistant. I'm here to help with various tasks and answer questions."
 
-        if 'how are you' in text_lower:
+        if intent == "how_are_you":
             return random.choice([
                 "I'm functioning optimally, thank you for asking!",
                 "I'm doing well, ready to assist you!",
                 "All systems operational! How can I help you today?"
             ])
 
-        return random.choice(self.responses["unknown"])
\ No newline at end of file
+        return random.choice(self.responses["unknown"])
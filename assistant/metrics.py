@@ -0,0 +1,19 @@
+"""
+The counters /api/metrics reports, gathered in one place for every HTTP entry point.
+"""
+from typing import Any, Dict
+
+from assistant.response_cache import get_all_response_cache_stats
+from assistant.result_cache import get_all_result_cache_stats
+from assistant.session_manager import get_session_manager
+from assistant.tool_selector import get_tool_selection_stats
+
+
+def collect_metrics() -> Dict[str, Any]:
+    return {
+        "plugin_result_cache": get_all_result_cache_stats(),
+        "llm_response_cache": get_all_response_cache_stats(),
+        "tool_selection": get_tool_selection_stats().stats(),
+        "sessions": get_session_manager().stats(),
+        "admission": get_session_manager().admission.stats()
+    }
@@ -0,0 +1,313 @@
+"""
+Versioned schema migrations for the assistant database.
+
+Each migration is a (version, description, function) entry in MIGRATIONS.
+``migrate`` applies every step newer than the version recorded in the
+``schema_version`` table, all in one transaction, so a database file is
+either fully upgraded or left untouched. New schema changes are shipped by
+appending a step; existing steps must never be edited once released.
+"""
+import sqlite3
+from typing import Callable, List, Tuple
+
+
+def _create_base_tables(cursor: sqlite3.Cursor):
+    # IF NOT EXISTS so databases created before versioning adopt version 1 as-is.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL CHECK(role IN ('user', 'assistant', 'system')),
+            content TEXT NOT NULL,
+            plugin_used TEXT,
+            tokens_used INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_id ON conversations(session_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON conversations(created_at)')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_settings (
+            user_id TEXT PRIMARY KEY DEFAULT 'default',
+            default_city TEXT,
+            preferred_news_category TEXT DEFAULT 'general',
+            timezone TEXT DEFAULT 'UTC',
+            assistant_name TEXT DEFAULT 'Jarvis',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS plugin_stats (
+            plugin_name TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            execution_count INTEGER DEFAULT 0,
+            last_used TIMESTAMP,
+            PRIMARY KEY (plugin_name, session_id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            reminder_text TEXT NOT NULL,
+            due_time TIMESTAMP NOT NULL,
+            completed BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            title TEXT,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _add_composite_indexes(cursor: sqlite3.Cursor):
+    # History reads filter on session_id and order by created_at; the
+    # composite index serves both, so the single-column one is dropped.
+    cursor.execute('DROP INDEX IF EXISTS idx_session_id')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_session_created ON conversations(session_id, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_notes_session_created ON notes(session_id, created_at)')
+
+    # due_at holds due_time as epoch seconds so due/pending lookups are plain
+    # range scans. The column may already exist on databases that added it
+    # before migrations were versioned.
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(reminders)')]
+    if 'due_at' not in columns:
+        cursor.execute('ALTER TABLE reminders ADD COLUMN due_at INTEGER')
+    cursor.execute('''
+        UPDATE reminders
+        SET due_at = CAST(strftime('%s', due_time, 'utc') AS INTEGER)
+        WHERE due_at IS NULL
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_session_due ON reminders(session_id, completed, due_at)')
+
+
+def _add_full_text_search(cursor: sqlite3.Cursor):
+    # External-content FTS5 tables: the text lives only in notes/conversations,
+    # the index is kept in sync by triggers. session_id is stored UNINDEXED:
+    # tokenizing it would let "work" match "alice-work", so searches filter
+    # on the base table's session_id instead.
+    #
+    # Rows that already exist are not indexed here: on a large database that
+    # would hold the startup transaction for the whole rebuild. Instead
+    # search_index_backfill records, per table, the highest existing id
+    # ("target") and how far the index has got ("indexed_through");
+    # Database.backfill_search_index walks that range in small batches after
+    # startup. Rows above the target are indexed by the insert triggers. The
+    # delete/update triggers only touch rows already in the index, and leave
+    # rows still waiting for the backfill to pick up as they are then.
+    try:
+        cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+        cursor.execute('DROP TABLE temp.fts5_probe')
+    except sqlite3.OperationalError:
+        print("SQLite was built without FTS5; full-text search will fall back to LIKE")
+        return
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_index_backfill (
+            table_name TEXT PRIMARY KEY,
+            indexed_through INTEGER NOT NULL,
+            target INTEGER NOT NULL
+        )
+    ''')
+    for table in ('notes', 'conversations'):
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO search_index_backfill (table_name, indexed_through, target)
+            SELECT ?, 0, COALESCE(MAX(id), 0) FROM {table}
+        ''', (table,))
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+            session_id UNINDEXED, title, content,
+            content='notes', content_rowid='id', tokenize='porter unicode61'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts(rowid, session_id, title, content)
+            VALUES (new.id, new.session_id, new.title, new.content);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes
+        WHEN old.id > (SELECT target FROM search_index_backfill WHERE table_name = 'notes')
+          OR old.id <= (SELECT indexed_through FROM search_index_backfill WHERE table_name = 'notes')
+        BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, session_id, title, content)
+            VALUES ('delete', old.id, old.session_id, old.title, old.content);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes
+        WHEN old.id > (SELECT target FROM search_index_backfill WHERE table_name = 'notes')
+          OR old.id <= (SELECT indexed_through FROM search_index_backfill WHERE table_name = 'notes')
+        BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, session_id, title, content)
+            VALUES ('delete', old.id, old.session_id, old.title, old.content);
+            INSERT INTO notes_fts(rowid, session_id, title, content)
+            VALUES (new.id, new.session_id, new.title, new.content);
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+            session_id UNINDEXED, content,
+            content='conversations', content_rowid='id', tokenize='porter unicode61'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+            INSERT INTO conversations_fts(rowid, session_id, content)
+            VALUES (new.id, new.session_id, new.content);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations
+        WHEN old.id > (SELECT target FROM search_index_backfill WHERE table_name = 'conversations')
+          OR old.id <= (SELECT indexed_through FROM search_index_backfill WHERE table_name = 'conversations')
+        BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, session_id, content)
+            VALUES ('delete', old.id, old.session_id, old.content);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE ON conversations
+        WHEN old.id > (SELECT target FROM search_index_backfill WHERE table_name = 'conversations')
+          OR old.id <= (SELECT indexed_through FROM search_index_backfill WHERE table_name = 'conversations')
+        BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, session_id, content)
+            VALUES ('delete', old.id, old.session_id, old.content);
+            INSERT INTO conversations_fts(rowid, session_id, content)
+            VALUES (new.id, new.session_id, new.content);
+        END
+    ''')
+
+
+def _add_plugin_result_cache(cursor: sqlite3.Cursor):
+    # Optional on-disk tier of PluginRegistry's result cache; expires_at is
+    # epoch seconds so expiry and eviction are range scans.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS plugin_result_cache (
+            cache_key TEXT PRIMARY KEY,
+            plugin_name TEXT NOT NULL,
+            result TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_plugin_result_cache_expires ON plugin_result_cache(expires_at)')
+
+
+def _add_llm_response_cache(cursor: sqlite3.Cursor):
+    # Opt-in exact-match cache of model replies, keyed by a hash of the full
+    # prompt context; times are epoch seconds.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            cache_key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires ON llm_response_cache(expires_at)')
+
+
+def _add_conversation_summaries(cursor: sqlite3.Cursor):
+    # One rolling summary per session of the turns evicted from the prompt;
+    # last_message_hash marks the newest turn already folded in.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conversation_summaries (
+            session_id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            last_message_hash TEXT,
+            token_count INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _add_summary_last_turn(cursor: sqlite3.Cursor):
+    # last_turn is the conversations.id of the newest folded turn, which
+    # stays unique when the same text is repeated and keeps growing after
+    # retention deletes old rows; last_message_hash is no longer written.
+    # Summaries saved before this have last_turn NULL.
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(conversation_summaries)')]
+    if 'last_turn' not in columns:
+        cursor.execute('ALTER TABLE conversation_summaries ADD COLUMN last_turn INTEGER')
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "base tables", _create_base_tables),
+    (2, "composite indexes and reminders.due_at", _add_composite_indexes),
+    (3, "full-text search over notes and conversations", _add_full_text_search),
+    (4, "plugin result cache", _add_plugin_result_cache),
+    (5, "LLM response cache", _add_llm_response_cache),
+    (6, "rolling conversation summaries", _add_conversation_summaries),
+    (7, "conversation summaries track the last folded turn", _add_summary_last_turn),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not row:
+        return 0
+    version = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()[0]
+    return version or 0
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Bring the database up to LATEST_VERSION and return the versions applied.
+
+    Runs under BEGIN IMMEDIATE so concurrent processes upgrading the same
+    file serialise, and re-reads the version inside the transaction so only
+    one of them applies each step.
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        current = get_schema_version(conn)
+        applied = []
+        for version, description, step in MIGRATIONS:
+            if version <= current:
+                continue
+            step(cursor)
+            cursor.execute(
+                'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                (version, description)
+            )
+            applied.append(version)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if applied:
+        print(f"Database migrated to schema version {applied[-1]}")
+    return applied
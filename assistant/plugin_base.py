@@ -4,7 +4,24 @@ Base plugin interface for all assistant tools/plugins.
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 
+from assistant.session_context import current_session_id
+
 class AssistantPlugin(ABC):
+    _session_id: Optional[str] = None
+
+    @property
+    def session_id(self) -> Optional[str]:
+        """
+        The session of the command being served (see assistant.session_context),
+        else the one the plugin was constructed with, so one instance can serve
+        every session.
+        """
+        return current_session_id.get() or self._session_id
+
+    @session_id.setter
+    def session_id(self, value: Optional[str]):
+        self._session_id = value
+
     @abstractmethod
     def get_name(self) -> str:
         """Return the plugin's unique name."""
@@ -33,5 +50,41 @@ class AssistantPlugin(ABC):
         return {
             "name": self.get_name(),
             "description": self.get_description(),
-            "parameters": self.get_parameters()
-        }
\ No newline at end of file
+            "parameters": self.get_parameters(),
+            "user_ready_output": self.has_user_ready_output()
+        }
+
+    def has_user_ready_output(self) -> bool:
+        """
+        True if results already read as a complete answer ("It's 03:15 PM on
+        ...", "15 * 27 = 405"), so AICore can return them without a second
+        model call to rephrase them. Leave False for raw data that needs
+        synthesis, such as search results.
+        """
+        return False
+
+    def get_cache_ttl(self) -> int:
+        """
+        Seconds a result may be reused for the same arguments. 0 (the default)
+        disables caching; only plugins whose output depends solely on their
+        arguments, not on session state or side effects, should opt in.
+        """
+        return 0
+
+    def should_cache_result(self, result: str) -> bool:
+        """Return False for results that must not be reused, such as errors."""
+        return True
+
+    def get_examples(self) -> List[str]:
+        """Typical requests this plugin answers, used to train the local intent classifier."""
+        return []
+
+    def extract_arguments(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Arguments for a request the local intent classifier routed here, or
+        None to leave the call to the LLM. The default only handles plugins
+        without required parameters.
+        """
+        if self.get_parameters().get("required"):
+            return None
+        return {}
@@ -0,0 +1,98 @@
+"""
+In-memory plugin usage counters flushed to plugin_stats in aggregated batches.
+"""
+import atexit
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from assistant.database import Database
+
+
+class PluginStatsAccumulator:
+    """
+    Counts plugin executions in memory and periodically UPSERTs the deltas.
+
+    ``record`` only bumps a counter, so tool calls no longer wait on a
+    database write. Every ``flush_interval`` seconds the accumulated
+    (plugin, session) counts are written with one ON CONFLICT DO UPDATE
+    statement per key. Pending counts are also flushed before
+    ``get_plugin_stats`` reads on the same database file and at exit.
+    """
+
+    def __init__(self, database: Database, flush_interval: float = 5.0):
+        self.database = database
+        self.flush_interval = flush_interval
+        self._counts: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.database.add_flush_hook(self.flush)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, plugin_name: str, session_id: str):
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            entry = self._counts.get((plugin_name, session_id))
+            if entry is None:
+                self._counts[(plugin_name, session_id)] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+
+    def pending(self) -> Dict[Tuple[str, str], int]:
+        with self._lock:
+            return {key: entry[0] for key, entry in self._counts.items()}
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, {}
+            if not counts:
+                return
+            try:
+                self.database.add_plugin_stats(
+                    [(name, sid, count, last_used) for (name, sid), (count, last_used) in counts.items()]
+                )
+            except Exception:
+                # Merge the unwritten deltas back so they are retried next flush.
+                with self._lock:
+                    for key, (count, last_used) in counts.items():
+                        entry = self._counts.setdefault(key, [0, last_used])
+                        entry[0] += count
+                        entry[1] = max(entry[1], last_used)
+                raise
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Plugin stats flush error: {e}")
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Plugin stats flush error: {e}")
+        self.database.remove_flush_hook(self.flush)
+
+
+_accumulators: Dict[str, PluginStatsAccumulator] = {}
+_accumulators_lock = threading.Lock()
+
+
+def get_plugin_stats_accumulator(database: Database, flush_interval: float = 5.0) -> PluginStatsAccumulator:
+    """Return the process-wide accumulator for ``database.db_path``, creating it on first use."""
+    with _accumulators_lock:
+        accumulator = _accumulators.get(database.db_path)
+        if accumulator is None or accumulator._stop.is_set():
+            accumulator = PluginStatsAccumulator(database, flush_interval=flush_interval)
+            _accumulators[database.db_path] = accumulator
+        return accumulator
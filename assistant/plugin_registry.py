@@ -8,13 +8,19 @@ try:
     from assistant.plugin_base import AssistantPlugin
 except ImportError:
     from plugin_base import AssistantPlugin
+from assistant.plugin_metrics import get_plugin_stats_accumulator
+from assistant.result_cache import get_result_cache, make_cache_key
 
 class PluginRegistry:
-    def __init__(self, database=None):
+    def __init__(self, database=None, result_cache=None):
         self._plugins: Dict[str, AssistantPlugin] = {}
         self._initialized = False
         self.database = database
         self._plugin_classes = {}  # Store plugin classes for later instantiation
+        # Usage is counted in memory and flushed to plugin_stats periodically
+        self.plugin_stats = get_plugin_stats_accumulator(database) if database else None
+        # Shared by every registry on the same database; see AssistantPlugin.get_cache_ttl
+        self.result_cache = result_cache if result_cache is not None else get_result_cache(database)
     
     def register(self, plugin: AssistantPlugin) -> None:
         plugin_name = plugin.get_name()
@@ -87,11 +93,21 @@ class PluginRegistry:
         plugin = self.get_plugin(name)
         if not plugin:
             return f"Plugin '{name}' not found"
+        ttl = plugin.get_cache_ttl()
+        cache_key = make_cache_key(name, kwargs) if ttl > 0 else None
+        if cache_key:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                if self.plugin_stats:
+                    self.plugin_stats.record(name, "global_session")
+                return cached
         try:
             result = plugin.execute(**kwargs)
             
-            if self.database:
-                self.database.update_plugin_stats(name, "global_session")
+            if self.plugin_stats:
+                self.plugin_stats.record(name, "global_session")
+            if cache_key and isinstance(result, str) and plugin.should_cache_result(result):
+                self.result_cache.put(cache_key, result, ttl, plugin_name=name)
             
             return result
         except Exception as e:
@@ -0,0 +1,32 @@
+def create_default_plugins(database=None, skills=None, session_id=None):
+    """
+    The built-in plugins, in registration order. With ``session_id`` left
+    as None the session-bound ones (reminders, notes) follow the command
+    being served, so one set can be shared by every session.
+    """
+    from assistant.plugins.web_search_plugin import WebSearchPlugin
+    from assistant.plugins.reminder_plugin import ReminderPlugin, CheckRemindersPlugin
+    from assistant.plugins.time_plugin import TimePlugin
+    from assistant.plugins.news_plugin import NewsPlugin
+    from assistant.plugins.weather_plugin import WeatherPlugin
+    from assistant.plugins.file_organizer import FileOrganizerPlugin
+    from assistant.plugins.calculator import CalculatorPlugin
+    from assistant.plugins.system_info_plugin import SystemInfoPlugin
+    from assistant.plugins.notes_plugin import SaveNotePlugin, ListNotesPlugin, SearchNotesPlugin, GetNotePlugin, DeleteNotePlugin
+
+    return [
+        WebSearchPlugin(),
+        ReminderPlugin(database=database, session_id=session_id),
+        CheckRemindersPlugin(database=database, session_id=session_id),
+        TimePlugin(),
+        NewsPlugin(skills=skills),
+        WeatherPlugin(),
+        FileOrganizerPlugin(),
+        CalculatorPlugin(skills=skills),
+        SystemInfoPlugin(),
+        SaveNotePlugin(database=database, session_id=session_id),
+        ListNotesPlugin(database=database, session_id=session_id),
+        SearchNotesPlugin(database=database, session_id=session_id),
+        GetNotePlugin(database=database, session_id=session_id),
+        DeleteNotePlugin(database=database, session_id=session_id)
+    ]
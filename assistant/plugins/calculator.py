@@ -1,3 +1,4 @@
+from assistant import intent_router
 from assistant.plugin_base import AssistantPlugin
 
 class CalculatorPlugin(AssistantPlugin):
@@ -10,6 +11,9 @@ class CalculatorPlugin(AssistantPlugin):
     def get_description(self):
         return "Perform basic arithmetic calculations"
 
+    def has_user_ready_output(self):
+        return True
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -22,6 +26,18 @@ class CalculatorPlugin(AssistantPlugin):
             "required": ["expression"]
         }
 
+    def get_examples(self):
+        return [
+            "calculate 15 * 27 + 42", "what is 12 times 8", "how much is 250 divided by 5",
+            "what's 17 plus 25", "compute 3.5 * 4", "100 minus 37"
+        ]
+
+    def extract_arguments(self, text):
+        text_lower = text.lower()
+        if not intent_router.CALC_EXPRESSION.search(text_lower):
+            return None
+        return {"expression": intent_router.CALC_PREFIX.sub('', text_lower).strip()}
+
     def execute(self, expression: str):
         if self.skills:
             return self.skills.calculate(expression)
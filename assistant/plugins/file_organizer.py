@@ -11,6 +11,9 @@ class FileOrganizerPlugin(AssistantPlugin):
     
     def get_description(self):
         return "Organize files in a directory by their file type"
+
+    def has_user_ready_output(self):
+        return True
     
     def get_parameters(self):
         return {
@@ -28,6 +31,12 @@ class FileOrganizerPlugin(AssistantPlugin):
             },
             "required": ["directory"]
         }
+
+    def get_examples(self):
+        return [
+            "organize files in my downloads folder", "sort the files in ~/Desktop by type",
+            "clean up my downloads directory", "organize folder documents"
+        ]
     
     def execute(self, directory: str, organize_by: str = "type"):
         try:
@@ -1,5 +1,8 @@
+import re
 from assistant.plugin_base import AssistantPlugin
 
+CATEGORIES = ["general", "technology", "business", "sports", "entertainment", "health", "science"]
+
 class NewsPlugin(AssistantPlugin):
     def __init__(self, skills=None):
         self.skills = skills
@@ -10,6 +13,9 @@ class NewsPlugin(AssistantPlugin):
     def get_description(self):
         return "Get latest news headlines for a category"
 
+    def has_user_ready_output(self):
+        return True
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -17,12 +23,32 @@ class NewsPlugin(AssistantPlugin):
                 "category": {
                     "type": "string",
                     "description": "News category (general, technology, business, sports, entertainment, health, science)",
-                    "enum": ["general", "technology", "business", "sports", "entertainment", "health", "science"]
+                    "enum": CATEGORIES
                 }
             },
             "required": []
         }
 
+    def get_cache_ttl(self):
+        return 300
+
+    def get_examples(self):
+        return [
+            "show me the news", "latest news", "what's in the news today", "technology news",
+            "news about sports", "any business headlines", "give me the top headlines",
+            "what's happening in science"
+        ]
+
+    def extract_arguments(self, text):
+        words = set(re.findall(r"[a-z]+", text.lower()))
+        for category in CATEGORIES:
+            if category in words or (category == "technology" and "tech" in words):
+                return {"category": category}
+        return {}
+
+    def should_cache_result(self, result):
+        return result.startswith("Top ")
+
     def execute(self, category="general"):
         if self.skills:
             return self.skills.get_news(category)
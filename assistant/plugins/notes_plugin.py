@@ -1,5 +1,10 @@
+import re
 from assistant.plugin_base import AssistantPlugin
 
+NOTE_CONTENT = re.compile(r"^(?:please\s+)?(?:save|take|make|write|add|create)\s+(?:a\s+|this\s+)?note(?:\s+(?:that|saying|about))?[:,]?\s+(.+)$", re.IGNORECASE | re.DOTALL)
+NOTE_QUERY = re.compile(r"(?:search|find|look\s+for)\s+(?:in\s+)?(?:my\s+)?notes?\s+(?:for|about|on|mentioning)\s+(.+)$", re.IGNORECASE)
+NOTE_ID = re.compile(r"\bnote\s*(?:#|id|number)?\s*(\d+)\b", re.IGNORECASE)
+
 class SaveNotePlugin(AssistantPlugin):
     def __init__(self, database=None, session_id=None):
         self.database = database
@@ -11,6 +16,9 @@ class SaveNotePlugin(AssistantPlugin):
     def get_description(self):
         return "Save a note with optional title"
 
+    def has_user_ready_output(self):
+        return True
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -27,6 +35,17 @@ class SaveNotePlugin(AssistantPlugin):
             "required": ["content"]
         }
 
+    def get_examples(self):
+        return [
+            "save a note: buy milk and eggs", "take a note that the wifi password is on the router",
+            "make a note to water the plants", "note this down: dentist on friday",
+            "write a note about the project kickoff", "save note call the plumber"
+        ]
+
+    def extract_arguments(self, text):
+        match = NOTE_CONTENT.match(text.strip())
+        return {"content": match.group(1).strip()} if match else None
+
     def execute(self, content: str, title: str = None):
         if not self.database:
             return "Notes system not available."
@@ -45,6 +64,15 @@ class ListNotesPlugin(AssistantPlugin):
     def get_description(self):
         return "List saved notes"
 
+    def has_user_ready_output(self):
+        return True
+
+    def get_examples(self):
+        return [
+            "list my notes", "show my notes", "what notes do I have", "read my notes",
+            "show all saved notes", "display my notes"
+        ]
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -71,6 +99,59 @@ class ListNotesPlugin(AssistantPlugin):
         return "\n".join(lines)
 
 
+class SearchNotesPlugin(AssistantPlugin):
+    def __init__(self, database=None, session_id=None):
+        self.database = database
+        self.session_id = session_id
+
+    def get_name(self):
+        return "search_notes"
+
+    def get_description(self):
+        return "Search saved notes by keywords, best matches first"
+
+    def has_user_ready_output(self):
+        return True
+
+    def get_parameters(self):
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Words to look for in note titles and content"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of notes to return"
+                }
+            },
+            "required": ["query"]
+        }
+
+    def get_examples(self):
+        return [
+            "search my notes for wifi", "find notes about the project", "look for notes mentioning groceries",
+            "search notes for password", "which note mentions the dentist"
+        ]
+
+    def extract_arguments(self, text):
+        match = NOTE_QUERY.search(text.strip().rstrip("?!."))
+        return {"query": match.group(1).strip()} if match else None
+
+    def execute(self, query: str, limit: int = 5):
+        if not self.database:
+            return "Notes system not available."
+        notes = self.database.search_notes(self.session_id, query, limit)
+        if not notes:
+            return f"No notes matching '{query}'."
+        lines = [f"Notes matching '{query}':"]
+        for n in notes:
+            title = n.get('title') or "Untitled"
+            lines.append(f"{n['id']}: {title} - {n.get('snippet', '')}")
+        return "\n".join(lines)
+
+
 class GetNotePlugin(AssistantPlugin):
     def __init__(self, database=None, session_id=None):
         self.database = database
@@ -82,6 +163,16 @@ class GetNotePlugin(AssistantPlugin):
     def get_description(self):
         return "Retrieve a specific note by ID"
 
+    def has_user_ready_output(self):
+        return True
+
+    def get_examples(self):
+        return ["show note 3", "open note number 12", "read note #5", "what does note 7 say"]
+
+    def extract_arguments(self, text):
+        match = NOTE_ID.search(text)
+        return {"note_id": int(match.group(1))} if match else None
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -114,6 +205,12 @@ class DeleteNotePlugin(AssistantPlugin):
     def get_description(self):
         return "Delete a note by ID"
 
+    def has_user_ready_output(self):
+        return True
+
+    def get_examples(self):
+        return ["delete note 3", "remove note number 12", "erase note #5", "get rid of note 7"]
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -1,3 +1,4 @@
+from assistant import intent_router
 from assistant.plugin_base import AssistantPlugin
 from datetime import datetime
 import re
@@ -13,6 +14,9 @@ class ReminderPlugin(AssistantPlugin):
     def get_description(self):
         return "Set a reminder for a specific time"
 
+    def has_user_ready_output(self):
+        return True
+
     def get_parameters(self):
         return {
             "type": "object",
@@ -29,6 +33,20 @@ class ReminderPlugin(AssistantPlugin):
             "required": ["reminder_text", "when"]
         }
 
+    def get_examples(self):
+        return [
+            "remind me to call mom in 2 hours", "set a reminder for the meeting tomorrow at 3pm",
+            "remind me to take out the trash at 8pm", "in 30 minutes remind me to check the oven",
+            "set an alarm for 7am", "don't let me forget to pay rent on friday"
+        ]
+
+    def extract_arguments(self, text):
+        parsed = intent_router.parse_reminder(intent_router.analyze(text))
+        if not parsed:
+            return None
+        task, when = parsed
+        return {"reminder_text": task, "when": when}
+
     def execute(self, reminder_text: str, when: str):
         if not self.database:
             return "Reminder system not available."
@@ -154,6 +172,15 @@ class CheckRemindersPlugin(AssistantPlugin):
     def get_description(self):
         return "Check all pending and overdue reminders"
 
+    def has_user_ready_output(self):
+        return True
+
+    def get_examples(self):
+        return [
+            "what are my reminders", "check my reminders", "do I have any reminders",
+            "show upcoming reminders", "list my reminders", "any overdue reminders"
+        ]
+
     def get_parameters(self):
         return {"type": "object", "properties": {}}
 
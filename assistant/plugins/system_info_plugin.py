@@ -9,12 +9,21 @@ class SystemInfoPlugin(AssistantPlugin):
     def get_description(self):
         return "Get information about the system (OS, processor, memory, etc.)"
 
+    def has_user_ready_output(self):
+        return True
+
     def get_parameters(self):
         return {
             "type": "object",
             "properties": {}
         }
 
+    def get_examples(self):
+        return [
+            "system info", "show system information", "how much memory do I have",
+            "what os am I running", "what processor does this computer have", "check cpu usage"
+        ]
+
     def execute(self):
         info = []
         info.append(f"System: {platform.system()} {platform.release()}")
@@ -6,6 +6,9 @@ class TimePlugin(AssistantPlugin):
     
     def get_description(self):
         return "Get the current time and date"
+
+    def has_user_ready_output(self):
+        return True
     
     def get_parameters(self):
         return {
@@ -13,6 +16,12 @@ class TimePlugin(AssistantPlugin):
             "properties": {},
             "required": []
         }
+
+    def get_examples(self):
+        return [
+            "what time is it", "what's the time", "tell me the time", "current time please",
+            "what's the date today", "what day is it", "what is today's date", "time now"
+        ]
     
     def execute(self):
         from datetime import datetime
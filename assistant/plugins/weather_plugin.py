@@ -2,19 +2,28 @@
 Weather plugin implementation.
 """
 import os
+import re
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 from assistant.plugin_base import AssistantPlugin
 
 load_dotenv()
 
+CITY = re.compile(r"(?:weather|temperature|forecast|raining|rain|sunny|cold|hot|warm)\s+(?:like\s+)?(?:in|for|at)\s+([a-z][a-z .'-]*)")
+CITY_SUFFIX = re.compile(r"\s+(?:right now|now|today|currently|please|outside)$")
+# Current conditions only; forecasts are left to the model.
+FORECAST = re.compile(r"\b(?:tomorrow|tonight|week|weekend|forecast|later)\b")
+
 class WeatherPlugin(AssistantPlugin):
     def get_name(self) -> str:
         return "get_weather"
     
     def get_description(self) -> str:
         return "Get current weather information for a specified city."
+
+    def has_user_ready_output(self) -> bool:
+        return True
     
     def get_parameters(self) -> Dict[str, Any]:
         return {
@@ -27,6 +36,29 @@ class WeatherPlugin(AssistantPlugin):
             },
             "required": ["city"]
         }
+
+    def get_cache_ttl(self) -> int:
+        return 600
+
+    def should_cache_result(self, result: str) -> bool:
+        return result.startswith("Weather in ")
+
+    def get_examples(self):
+        return [
+            "what's the weather in Paris", "weather in London", "how is the weather in New York",
+            "weather for Tokyo", "what's the temperature in Berlin", "is it raining in Seattle",
+            "is it cold in Moscow right now", "current weather in Madrid"
+        ]
+
+    def extract_arguments(self, text: str) -> Optional[Dict[str, Any]]:
+        text_lower = " ".join(text.lower().split()).rstrip("?!. ")
+        if FORECAST.search(text_lower):
+            return None
+        match = CITY.search(text_lower)
+        if not match:
+            return None
+        city = CITY_SUFFIX.sub("", match.group(1)).strip(" .'-")
+        return {"city": city.title()} if city else None
     
     def execute(self, **kwargs) -> str:
         city = kwargs.get("city")
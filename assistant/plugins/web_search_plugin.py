@@ -1,6 +1,9 @@
+import re
 import requests
 from assistant.plugin_base import AssistantPlugin
 
+QUERY = re.compile(r"^(?:please\s+)?(?:search|look\s+up|google|find)\s+(?:the\s+web\s+|online\s+|the\s+internet\s+)?(?:for\s+)?(.+)$", re.IGNORECASE)
+
 class WebSearchPlugin(AssistantPlugin):
     def get_name(self):
         return "web_search"
@@ -20,6 +23,25 @@ class WebSearchPlugin(AssistantPlugin):
             "required": ["query"]
         }
 
+    def get_cache_ttl(self):
+        return 3600
+
+    def get_examples(self):
+        return [
+            "search the web for python asyncio tutorials", "look up the history of the eiffel tower",
+            "google best hiking trails near denver", "search online for cheap flights to rome",
+            "find information about black holes"
+        ]
+
+    def extract_arguments(self, text):
+        match = QUERY.match(" ".join(text.split()).rstrip("?!."))
+        if not match:
+            return None
+        return {"query": match.group(1)}
+
+    def should_cache_result(self, result):
+        return not result.startswith(("Search request failed", "Error processing search"))
+
     def execute(self, query: str):
         try:
             url = "https://api.duckduckgo.com/"
@@ -0,0 +1,174 @@
+"""
+In-process reminder scheduler backed by a min-heap of due times.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Upper bound on a single sleep so wall-clock jumps (suspend, NTP) are noticed.
+MAX_SLEEP_SECONDS = 60.0
+
+
+def due_timestamp(due_time: Any) -> Optional[float]:
+    """Convert a stored due_time (local 'YYYY-MM-DD HH:MM:SS' or ISO string) to epoch seconds."""
+    if isinstance(due_time, datetime):
+        return due_time.timestamp()
+    if not due_time:
+        return None
+    try:
+        if ' ' in due_time and 'T' not in due_time:
+            return datetime.strptime(due_time, "%Y-%m-%d %H:%M:%S").timestamp()
+        return datetime.fromisoformat(due_time.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class ReminderScheduler:
+    """
+    Fires reminders for every subscribed session from one worker thread.
+
+    A session's uncompleted reminders are loaded from the database once, when
+    the session subscribes; after that the scheduler learns about new and
+    completed reminders from the database's reminder listeners, so there is no
+    periodic polling. The worker sleeps until the earliest due time across all
+    sessions and is woken early when an earlier reminder is added. Fired
+    reminders are routed to the callbacks subscribed for their session.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._scheduled: Set[int] = set()
+        self._cancelled: Set[int] = set()
+        self._subscribers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+        self.database.add_reminder_listener(self._on_reminder_event)
+        self._thread.start()
+
+    def stop(self):
+        self.database.remove_reminder_listener(self._on_reminder_event)
+        with self._cond:
+            self._stopped = True
+            self._thread = None
+            self._cond.notify_all()
+
+    def subscribe(self, session_id: str, callback: Callable[[Dict[str, Any]], None]):
+        """Route ``session_id``'s reminders to ``callback``, loading them on first subscription."""
+        with self._cond:
+            callbacks = self._subscribers.setdefault(session_id, [])
+            first = not callbacks
+            if callback not in callbacks:
+                callbacks.append(callback)
+        if first:
+            self._load_session(session_id)
+
+    def unsubscribe(self, session_id: str, callback: Callable[[Dict[str, Any]], None]):
+        with self._cond:
+            callbacks = self._subscribers.get(session_id, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._subscribers.pop(session_id, None)
+
+    def session_count(self) -> int:
+        with self._cond:
+            return len(self._subscribers)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._scheduled) - len(self._cancelled)
+
+    def _load_session(self, session_id: str):
+        reminders = self.database.get_open_reminders(session_id)
+        with self._cond:
+            for reminder in reminders:
+                self._push(reminder)
+            self._cond.notify_all()
+
+    def _push(self, reminder: Dict[str, Any]):
+        due = reminder.get('due_at') or due_timestamp(reminder.get('due_time'))
+        if due is None or reminder.get('id') in self._scheduled:
+            return
+        heapq.heappush(self._heap, (due, reminder['id'], reminder))
+        self._scheduled.add(reminder['id'])
+
+    def _on_reminder_event(self, event: str, reminder: Dict[str, Any]):
+        with self._cond:
+            if event == "added":
+                if reminder.get('session_id') not in self._subscribers:
+                    return
+                was_next = self._heap[0][0] if self._heap else None
+                self._push(reminder)
+                # Only wake the worker if the new reminder is now the earliest.
+                if was_next is None or self._heap[0][0] < was_next:
+                    self._cond.notify_all()
+            elif event == "completed":
+                if reminder.get('id') in self._scheduled:
+                    self._cancelled.add(reminder['id'])
+
+    def _next_due(self) -> Optional[Tuple[Dict[str, Any], List[Callable[[Dict[str, Any]], None]]]]:
+        """Block until a subscribed reminder is due; return it with its callbacks, or None once stopped."""
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, reminder_id, reminder = self._heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._cond.wait(min(delay, MAX_SLEEP_SECONDS))
+                    continue
+                heapq.heappop(self._heap)
+                self._scheduled.discard(reminder_id)
+                if reminder_id in self._cancelled:
+                    self._cancelled.discard(reminder_id)
+                    continue
+                callbacks = list(self._subscribers.get(reminder.get('session_id'), []))
+                if not callbacks:
+                    # Session went away; leave it uncompleted so it is reloaded
+                    # (and fires) when the session subscribes again.
+                    continue
+                return reminder, callbacks
+        return None
+
+    def _run(self):
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            reminder, callbacks = due
+            for callback in callbacks:
+                try:
+                    callback(reminder)
+                except Exception as e:
+                    print(f"Reminder callback error: {e}")
+            try:
+                self.database.mark_reminder_completed(reminder['id'])
+            except Exception as e:
+                print(f"Reminder scheduler error: {e}")
+
+
+_schedulers: Dict[str, ReminderScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_reminder_scheduler(database) -> ReminderScheduler:
+    """Return the process-wide, already started scheduler for ``database.db_path``."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(database.db_path)
+        if scheduler is None:
+            scheduler = ReminderScheduler(database)
+            scheduler.start()
+            _schedulers[database.db_path] = scheduler
+        return scheduler
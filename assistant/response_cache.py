@@ -0,0 +1,121 @@
+"""
+Exact-match cache of Gemini replies for repeated prompts in identical context.
+"""
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from config.settings import Settings
+
+# Prompts whose correct answer depends on when they are asked or on live data.
+TIME_SENSITIVE = re.compile(
+    r'\b(?:time|date|day|today|tonight|tomorrow|yesterday|now|current(?:ly)?|latest|recent(?:ly)?|'
+    r'news|weather|forecast|remind(?:er)?s?|schedule|calendar|week|month|year|'
+    r'morning|afternoon|evening|\d{1,2}(?::\d{2})?\s*(?:am|pm))\b',
+    re.IGNORECASE
+)
+
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(text.split()).casefold().rstrip("?!. ")
+
+
+def is_cacheable_prompt(text: str) -> bool:
+    return bool(text.strip()) and not TIME_SENSITIVE.search(text)
+
+
+class ResponseCache:
+    """
+    Stores replies in the llm_response_cache table under a SHA-256 of the
+    model, system prompt template, trimmed history, tool schema and the
+    normalised user text, so a hit means the model saw the same context.
+
+    Entries expire after ``ttl`` seconds. Once more than ``max_entries``
+    rows exist, the oldest are evicted (checked every ``prune_every`` puts).
+    """
+
+    def __init__(self, database, ttl: float = 86400, max_entries: int = 5000, prune_every: int = 100):
+        self.database = database
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.prune_every = max(1, prune_every)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, history: List[Dict[str, Any]],
+                 tools: List[Dict[str, Any]], text: str) -> str:
+        payload = {
+            "model": model,
+            "system": system_prompt,
+            "history": [[m.get("role"), m.get("content")] for m in history],
+            "tools": tools,
+            "text": normalize_prompt(text)
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            response = self.database.get_cached_response(key)
+        except Exception as e:
+            print(f"Response cache read error: {e}")
+            response = None
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def put(self, key: str, response: str):
+        if not response:
+            return
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % self.prune_every == 0
+        try:
+            self.database.save_cached_response(key, response, self.ttl)
+            if prune:
+                self.database.prune_response_cache(self.max_entries)
+        except Exception as e:
+            print(f"Response cache write error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "ttl": self.ttl,
+                "max_entries": self.max_entries
+            }
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(database) -> ResponseCache:
+    """Return the process-wide response cache for ``database.db_path``, configured from Settings."""
+    with _caches_lock:
+        cache = _caches.get(database.db_path)
+        if cache is None:
+            cache = ResponseCache(
+                database,
+                ttl=Settings.LLM_RESPONSE_CACHE_TTL,
+                max_entries=Settings.LLM_RESPONSE_CACHE_SIZE
+            )
+            _caches[database.db_path] = cache
+        return cache
+
+
+def get_all_response_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {db_path: cache.stats() for db_path, cache in caches.items()}
@@ -0,0 +1,154 @@
+"""
+TTL result cache for plugins whose output only depends on their arguments.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from config.settings import Settings
+except ImportError:
+    # Keeps the plugin system importable without python-dotenv installed.
+    Settings = None
+
+
+def _normalize(value: Any) -> Any:
+    # "London", " london " and "LONDON" are the same weather lookup.
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(plugin_name: str, arguments: Dict[str, Any]) -> str:
+    """Key on the plugin name plus its arguments with strings trimmed and case-folded."""
+    normalized = {k: _normalize(v) for k, v in arguments.items() if v is not None}
+    return f"{plugin_name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+class ResultCache:
+    """
+    LRU of plugin results, each kept for the TTL its plugin declares.
+
+    At most ``max_entries`` results are held in memory; the least recently
+    used is evicted first. With ``database`` set, results are also written to
+    the plugin_result_cache table so they survive restarts; a memory miss
+    then checks the table before counting as a miss.
+    """
+
+    def __init__(self, max_entries: int = 512, database=None, prune_every: int = 100):
+        self.max_entries = max(1, max_entries)
+        self.database = database
+        self.prune_every = max(1, prune_every)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.database is not None:
+            try:
+                stored = self.database.get_cached_plugin_result(key)
+            except Exception as e:
+                print(f"Result cache read error: {e}")
+                stored = None
+            if stored is not None:
+                result, expires_at = stored
+                with self._lock:
+                    self._store(key, result, expires_at)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: str, ttl: float, plugin_name: str = ""):
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, result, expires_at)
+            self._puts += 1
+            prune = self._puts % self.prune_every == 0
+
+        if self.database is not None:
+            try:
+                self.database.save_cached_plugin_result(key, plugin_name, result, expires_at)
+                if prune:
+                    self.database.prune_plugin_result_cache(self.max_entries)
+            except Exception as e:
+                print(f"Result cache write error: {e}")
+
+    def _store(self, key: str, result: str, expires_at: float):
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persistent": self.database is not None
+            }
+
+
+_caches: Dict[Optional[str], ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(database=None) -> ResultCache:
+    """
+    Return the process-wide result cache for ``database.db_path`` (or the
+    database-less one), sized by Settings.PLUGIN_CACHE_SIZE and persisted to
+    the database when Settings.PLUGIN_CACHE_PERSIST is set.
+    """
+    db_path = getattr(database, "db_path", None)
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            persist = getattr(Settings, "PLUGIN_CACHE_PERSIST", False)
+            cache = ResultCache(
+                max_entries=getattr(Settings, "PLUGIN_CACHE_SIZE", 512),
+                database=database if db_path and persist else None
+            )
+            _caches[db_path] = cache
+        return cache
+
+
+def get_all_result_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {db_path or "memory": cache.stats() for db_path, cache in caches.items()}
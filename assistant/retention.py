@@ -0,0 +1,121 @@
+"""
+Background retention job that expires old conversations in small batches.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+
+class RetentionWorker:
+    """
+    Deletes conversations older than ``days_to_keep`` without stalling chat turns.
+
+    Rows are removed ``batch_size`` at a time, each batch in its own short
+    write transaction, with a ``pause`` between batches so other writers can
+    get the lock. Freed pages are then returned with ``PRAGMA
+    incremental_vacuum`` in chunks of ``vacuum_pages`` rather than a full
+    VACUUM. Progress is reported after every batch through
+    ``progress_callback`` and kept in ``last_run``.
+    """
+
+    def __init__(self, database, days_to_keep: int = 30, batch_size: int = 1000,
+                 pause: float = 0.05, vacuum_pages: int = 512,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.database = database
+        self.days_to_keep = days_to_keep
+        self.batch_size = max(1, batch_size)
+        self.pause = pause
+        self.vacuum_pages = max(1, vacuum_pages)
+        self.progress_callback = progress_callback
+        self.last_run: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _report(self, progress: Dict[str, Any]):
+        self.last_run = progress
+        if self.progress_callback:
+            try:
+                self.progress_callback(dict(progress))
+            except Exception as e:
+                print(f"Retention progress callback error: {e}")
+
+    def run_once(self) -> Dict[str, Any]:
+        # created_at is stored as UTC by CURRENT_TIMESTAMP
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.days_to_keep)).strftime('%Y-%m-%d %H:%M:%S')
+        started = time.perf_counter()
+        progress = {
+            "cutoff": cutoff,
+            "deleted": 0,
+            "batches": 0,
+            "elapsed": 0.0,
+            "rows_per_second": 0.0,
+            "free_pages": None,
+            "done": False
+        }
+
+        while not self._stop.is_set():
+            deleted = self.database.delete_conversations_before(cutoff, self.batch_size)
+            if deleted:
+                progress["deleted"] += deleted
+                progress["batches"] += 1
+                progress["elapsed"] = time.perf_counter() - started
+                progress["rows_per_second"] = progress["deleted"] / progress["elapsed"] if progress["elapsed"] else 0.0
+                self._report(progress)
+            if deleted < self.batch_size:
+                break
+            self._stop.wait(self.pause)
+
+        if progress["deleted"] and self.database.get_auto_vacuum_mode() == 2:
+            free_pages = self.database.incremental_vacuum(self.vacuum_pages)
+            while free_pages and not self._stop.is_set():
+                self._stop.wait(self.pause)
+                remaining = self.database.incremental_vacuum(self.vacuum_pages)
+                if remaining >= free_pages:
+                    break
+                free_pages = remaining
+            progress["free_pages"] = free_pages
+
+        progress["elapsed"] = time.perf_counter() - started
+        progress["rows_per_second"] = progress["deleted"] / progress["elapsed"] if progress["elapsed"] else 0.0
+        progress["done"] = not self._stop.is_set()
+        self._report(progress)
+        return progress
+
+    def start(self, interval: float = 24 * 3600):
+        """Run the job now and then every ``interval`` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    result = self.run_once()
+                    if result["deleted"]:
+                        print(f"Retention: deleted {result['deleted']} conversations "
+                              f"({result['rows_per_second']:.0f} rows/s)")
+                except Exception as e:
+                    print(f"Retention worker error: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+
+def start_retention_worker() -> Optional[RetentionWorker]:
+    """Starts the nightly job on the default database, unless CONVERSATION_RETENTION_DAYS is 0."""
+    from assistant.database import Database
+    from config.settings import Settings
+    if Settings.CONVERSATION_RETENTION_DAYS <= 0:
+        return None
+    worker = RetentionWorker(
+        Database(),
+        days_to_keep=Settings.CONVERSATION_RETENTION_DAYS,
+        batch_size=Settings.RETENTION_BATCH_SIZE
+    )
+    worker.start()
+    return worker
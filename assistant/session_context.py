@@ -0,0 +1,27 @@
+"""
+The session a request is being served for.
+
+Plugins and Skills can be shared by every session in the process; they
+read the session id from here instead of having one baked in. AICore sets
+it for the duration of each command. Worker threads that plugin calls run
+on see it too, because they are started with a copy of the context.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+
+
+@contextmanager
+def session_context(session_id: str) -> Iterator[None]:
+    token = current_session_id.set(session_id)
+    try:
+        yield
+    finally:
+        try:
+            current_session_id.reset(token)
+        except ValueError:
+            # A generator finished in a different context than it started in;
+            # that context never saw the value being set.
+            pass
@@ -0,0 +1,245 @@
+"""
+Many chat sessions served from one set of heavy components.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from config.settings import Settings
+from assistant.admission import AdmissionController
+from assistant.core import AICore, load_environment
+from assistant.database import Database
+from assistant.plugin_registry import PluginRegistry
+from assistant.plugins import create_default_plugins
+from assistant.reminder_scheduler import get_reminder_scheduler
+from assistant.skills import Skills
+
+
+class Session:
+    """
+    Per-session state: an AICore holding the history, reminders waiting to
+    be fetched, and the gate that runs the session's commands one at a time.
+    ``pins`` counts the commands holding the session (see SessionManager.get).
+    """
+    __slots__ = ('session_id', 'ai_core', 'reminders', 'gate', 'created_at', 'last_used', 'pins')
+
+    def __init__(self, session_id: str, ai_core: AICore):
+        self.session_id = session_id
+        self.ai_core = ai_core
+        self.reminders = deque()
+        self.gate = AdmissionController(1, max_queue=Settings.SESSION_QUEUE_DEPTH or None)
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.pins = 0
+
+    @property
+    def in_use(self) -> bool:
+        return self.pins > 0 or self.gate.busy
+
+    def deliver_reminder(self, reminder: Dict[str, Any]):
+        self.reminders.append(reminder.get('reminder_text', 'Unknown reminder'))
+
+
+class SessionManager:
+    """
+    Builds the database, plugin registry, plugins and skills once and shares
+    them across sessions. The LLM clients, response and result caches,
+    intent classifier, tool selector and reminder scheduler are already
+    process-wide. Plugins and skills are built without a session and follow
+    the command being served (assistant.session_context). A session only adds
+    an AICore with its history and context window, and a reminder queue.
+
+    At most ``max_sessions`` sessions are kept, least recently used evicted
+    first, and sessions idle for ``idle_timeout`` seconds are dropped (0
+    keeps them). Nothing is lost by evicting: a returning session is rebuilt
+    from its stored conversations and summary, and reminders falling due
+    meanwhile stay open until it subscribes again. Reminders that fired but
+    were not fetched yet are held for it, up to ``max_sessions`` of them.
+    Sessions with a command running or waiting are never evicted: serve()
+    pins the session inside get(), under the same lock eviction takes, and
+    unpins it once the command is done.
+
+    Commands go through serve() or serve_async(): a session's commands run
+    one at a time in arrival order, and ``admission`` caps how many run
+    across all sessions. Both raise assistant.admission.Overloaded when
+    their queue is full.
+    """
+
+    def __init__(self, database: Optional[Database] = None, plugin_registry: Optional[PluginRegistry] = None,
+                 skills: Optional[Skills] = None, max_sessions: Optional[int] = None,
+                 idle_timeout: Optional[float] = None):
+        # Reads .env once; the AICores built per session find it loaded
+        load_environment()
+        self.database = database or Database(settings_ttl=Settings.SETTINGS_CACHE_TTL or None)
+        self.skills = skills or Skills(database=self.database)
+        if plugin_registry is None:
+            plugin_registry = PluginRegistry(database=self.database)
+            for plugin in create_default_plugins(database=self.database, skills=self.skills):
+                plugin_registry.register(plugin)
+        self.plugin_registry = plugin_registry
+        self.reminder_scheduler = get_reminder_scheduler(self.database)
+        self.max_sessions = max(1, max_sessions if max_sessions is not None else Settings.SESSION_CACHE_SIZE)
+        self.idle_timeout = idle_timeout if idle_timeout is not None else Settings.SESSION_IDLE_TIMEOUT
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._undelivered: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.rehydrated = 0
+        self.lru_evictions = 0
+        self.idle_evictions = 0
+        self.admission = AdmissionController(
+            Settings.MAX_IN_FLIGHT_REQUESTS,
+            max_queue=Settings.ADMISSION_QUEUE_DEPTH or None,
+            queue_timeout=Settings.ADMISSION_QUEUE_TIMEOUT
+        )
+
+    def get(self, session_id: str, pin: bool = False) -> Session:
+        """
+        The session, built (or rebuilt from the database) on a miss. With
+        ``pin`` it is not evicted until a matching unpin().
+        """
+        with self._lock:
+            self._sweep_idle(time.time())
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self.hits += 1
+                return self._touch(session, pin)
+            self.misses += 1
+
+        # Loading the history takes a while; other sessions are served meanwhile.
+        ai_core = self._create_core(session_id)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._add(session_id, ai_core)
+            # else a concurrent miss added it first and this AICore is dropped
+            return self._touch(session, pin)
+
+    def unpin(self, session: Session):
+        with self._lock:
+            session.pins -= 1
+            session.last_used = time.time()
+
+    def _touch(self, session: Session, pin: bool) -> Session:
+        self._sessions.move_to_end(session.session_id)
+        session.last_used = time.time()
+        if pin:
+            session.pins += 1
+        return session
+
+    @contextmanager
+    def serve(self, session_id: str) -> Iterator[Session]:
+        """The session, once it is this command's turn and a slot is free."""
+        session = self.get(session_id, pin=True)
+        try:
+            with session.gate.admit(), self.admission.admit():
+                yield session
+        finally:
+            self.unpin(session)
+
+    @asynccontextmanager
+    async def serve_async(self, session_id: str) -> AsyncIterator[Session]:
+        session = await asyncio.to_thread(self.get, session_id, True)
+        try:
+            async with session.gate.admit_async(), self.admission.admit_async():
+                yield session
+        finally:
+            self.unpin(session)
+
+    def _sweep_idle(self, now: float):
+        # At most once every tenth of the timeout; the oldest sessions come first.
+        if self.idle_timeout <= 0 or now - self._last_sweep < self.idle_timeout / 10:
+            return
+        self._last_sweep = now
+        cutoff = now - self.idle_timeout
+        idle = []
+        for session_id, session in self._sessions.items():
+            if session.last_used > cutoff:
+                break
+            if not session.in_use:
+                idle.append(session_id)
+        for session_id in idle:
+            self._evict(session_id)
+            self.idle_evictions += 1
+
+    def _evict(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self.reminder_scheduler.unsubscribe(session_id, session.deliver_reminder)
+        if session.reminders:
+            self._undelivered[session_id] = session.reminders
+            self._undelivered.move_to_end(session_id)
+            while len(self._undelivered) > self.max_sessions:
+                self._undelivered.popitem(last=False)
+
+    def _create_core(self, session_id: str) -> AICore:
+        return AICore(
+            plugin_registry=self.plugin_registry,
+            skills=self.skills,
+            session_id=session_id,
+            database=self.database
+        )
+
+    def _add(self, session_id: str, ai_core: AICore) -> Session:
+        """Registers a newly built session and evicts beyond max_sessions. Call with the lock held."""
+        session = Session(session_id, ai_core)
+        session.reminders.extend(self._undelivered.pop(session_id, ()))
+        self.reminder_scheduler.subscribe(session_id, session.deliver_reminder)
+        if ai_core.conversation_history:
+            self.rehydrated += 1
+        self._sessions[session_id] = session
+
+        excess = len(self._sessions) - self.max_sessions
+        if excess > 0:
+            idle = [sid for sid, s in self._sessions.items() if sid != session_id and not s.in_use]
+            for evicted in idle[:excess]:
+                self._evict(evicted)
+                self.lru_evictions += 1
+        return session
+
+    def drain_reminders(self, session_id: str) -> List[str]:
+        """Reminders that fired for ``session_id`` since the last call."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            queue = session.reminders if session is not None else self._undelivered.pop(session_id, deque())
+        fired = []
+        while queue:
+            fired.append(queue.popleft())
+        return fired
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_timeout": self.idle_timeout,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "rehydrated": self.rehydrated,
+                "lru_evictions": self.lru_evictions,
+                "idle_evictions": self.idle_evictions,
+                "undelivered_reminder_sessions": len(self._undelivered)
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+_session_manager: Optional[SessionManager] = None
+_session_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> SessionManager:
+    """The process-wide SessionManager the HTTP entry points serve from, built on first use."""
+    global _session_manager
+    with _session_manager_lock:
+        if _session_manager is None:
+            _session_manager = SessionManager()
+        return _session_manager
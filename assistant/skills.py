@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from config.settings import Settings
 from assistant.calendar import CalendarService
+from assistant.session_context import current_session_id
 
 class Skills:
     def __init__(self, database=None, session_id="default_session"):
@@ -20,6 +21,15 @@ class Skills:
             except Exception as e:
                 self.database = None
 
+    @property
+    def session_id(self) -> str:
+        """The session of the command being served, else the one given at construction."""
+        return current_session_id.get() or self._session_id
+
+    @session_id.setter
+    def session_id(self, value: str):
+        self._session_id = value
+
     def _load_dotenv(self):
         try:
             from dotenv import load_dotenv
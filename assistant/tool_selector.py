@@ -0,0 +1,193 @@
+"""
+Per-request selection of the tool schemas sent to the model.
+"""
+import json
+import math
+import re
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from assistant.context_window import estimate_tokens
+
+_WORDS = re.compile(r"[a-z]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from get give how i in is it its me my of on or
+please show tell that the this to up what whats when where which who will with you your
+""".split())
+
+
+def _stem(word: str) -> str:
+    # Just enough to match "notes"/"note", "reminders"/"remind", "searching"/"search".
+    for suffix in ("ers", "ing", "er", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def terms(text: str) -> List[str]:
+    return [_stem(w) for w in _WORDS.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+def _schema_text(tool: Dict[str, Any]) -> str:
+    parts = [tool["name"].replace("_", " "), tool.get("description", "")]
+    for name, spec in (tool.get("parameters") or {}).get("properties", {}).items():
+        parts.append(name.replace("_", " "))
+        parts.append(spec.get("description", ""))
+        parts.extend(str(v) for v in spec.get("enum", []))
+    return " ".join(parts)
+
+
+class ToolSelectionStats:
+    """Process-wide counters of how many schema tokens selection kept out of prompts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fallbacks = 0
+        self.tools_sent = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+
+    def record(self, tools_sent: int, tokens_sent: int, tokens_saved: int, fallback: bool):
+        with self._lock:
+            self.requests += 1
+            self.fallbacks += fallback
+            self.tools_sent += tools_sent
+            self.tokens_sent += tokens_sent
+            self.tokens_saved += tokens_saved
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.requests or 1
+            return {
+                "requests": self.requests,
+                "fallbacks": self.fallbacks,
+                "fallback_rate": self.fallbacks / requests if self.requests else 0.0,
+                "avg_tools_sent": self.tools_sent / requests if self.requests else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "avg_tokens_saved": self.tokens_saved / requests if self.requests else 0.0,
+                "avg_tokens_sent": self.tokens_sent / requests if self.requests else 0.0
+            }
+
+
+_stats = ToolSelectionStats()
+
+
+def get_tool_selection_stats() -> ToolSelectionStats:
+    return _stats
+
+
+class ToolSelector:
+    """
+    Ranks tool schemas against a user message and keeps the ``top_k`` best.
+
+    Each tool is indexed by the words of its name, description, parameter
+    descriptions and enum values, plus any example requests. A tool scores
+    the IDF of every message term it contains, so words shared by many tools
+    ("get", "list") count for little. Usage counts from plugin_stats break
+    ties between matching tools but never select a tool on their own. Tools
+    used in the last few replies are always kept so follow-ups ("and in
+    Berlin?") still see them. When no tool matches, every schema is sent:
+    a miss costs tokens, never a capability.
+    """
+
+    def __init__(self, tools: List[Dict[str, Any]], examples: Optional[Dict[str, List[str]]] = None,
+                 usage: Optional[Dict[str, int]] = None, top_k: int = 5, usage_weight: float = 0.5,
+                 stats: Optional[ToolSelectionStats] = None):
+        self.tools = list(tools)
+        self.top_k = max(1, top_k)
+        self.usage_weight = usage_weight
+        self.stats = stats if stats is not None else _stats
+        examples = examples or {}
+
+        self._terms: Dict[str, set] = {}
+        for tool in self.tools:
+            text = " ".join([_schema_text(tool)] + list(examples.get(tool["name"], [])))
+            self._terms[tool["name"]] = set(terms(text))
+        document_frequency = Counter(t for tool_terms in self._terms.values() for t in tool_terms)
+        n_tools = len(self.tools)
+        self._idf = {t: math.log(1 + n_tools / df) for t, df in document_frequency.items()}
+
+        usage = usage or {}
+        top_usage = max(usage.values(), default=0)
+        self._prior = {
+            name: math.log1p(count) / math.log1p(top_usage) if top_usage else 0.0
+            for name, count in usage.items()
+        }
+        self._tokens = {tool["name"]: estimate_tokens(json.dumps(tool)) for tool in self.tools}
+        self.total_tokens = sum(self._tokens.values())
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Lexical score of every tool that shares at least one term with ``text``."""
+        query = set(terms(text))
+        scores = {}
+        for name, tool_terms in self._terms.items():
+            score = sum(self._idf[t] for t in query & tool_terms)
+            if score > 0:
+                scores[name] = score
+        return scores
+
+    def select(self, text: str, recent: Iterable[str] = ()) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """The schemas to send, and a report of the tools picked and the schema tokens saved."""
+        scores = self.scores(text) if len(self.tools) > self.top_k else {}
+        # No match (or nothing to trim): send everything.
+        fallback = not scores
+        if fallback:
+            selected = self.tools
+        else:
+            keep = [name for name in dict.fromkeys(recent) if name in self._terms]
+            ranked = sorted(
+                scores,
+                key=lambda name: scores[name] + self.usage_weight * self._prior.get(name, 0.0),
+                reverse=True
+            )
+            for name in ranked:
+                if len(keep) >= self.top_k:
+                    break
+                if name not in keep:
+                    keep.append(name)
+            selected = [tool for tool in self.tools if tool["name"] in keep]
+
+        tokens_sent = sum(self._tokens[tool["name"]] for tool in selected)
+        report = {
+            "tools": [tool["name"] for tool in selected],
+            "fallback": fallback and len(self.tools) > self.top_k,
+            "tokens_sent": tokens_sent,
+            "tokens_saved": self.total_tokens - tokens_sent
+        }
+        self.stats.record(len(selected), tokens_sent, report["tokens_saved"], report["fallback"])
+        return selected, report
+
+
+_selectors: "weakref.WeakKeyDictionary[Any, ToolSelector]" = weakref.WeakKeyDictionary()
+_selectors_lock = threading.Lock()
+
+
+def get_tool_selector(plugin_registry, tools: List[Dict[str, Any]], database=None, top_k: int = 5) -> ToolSelector:
+    """
+    The selector shared by every AICore on ``plugin_registry``, rebuilt when
+    its tool set changes. Usage counts are read from ``database`` when built.
+    """
+    names = [tool["name"] for tool in tools]
+    with _selectors_lock:
+        selector = _selectors.get(plugin_registry)
+        if selector is not None and [tool["name"] for tool in selector.tools] == names and selector.top_k == top_k:
+            return selector
+
+        usage = {}
+        if database is not None:
+            try:
+                usage = {row["plugin_name"]: row["total_executions"] for row in database.get_plugin_stats()["plugins"]}
+            except Exception as e:
+                print(f"Could not load plugin usage for tool selection: {e}")
+        selector = ToolSelector(
+            tools,
+            examples={p.get_name(): p.get_examples() for p in plugin_registry.get_all_plugins()},
+            usage=usage,
+            top_k=top_k
+        )
+        _selectors[plugin_registry] = selector
+        return selector
@@ -0,0 +1,151 @@
+"""
+Benchmark: concurrent /api/command requests through the ASGI app vs. a threaded server.
+
+Drives asgi.app with an in-process ASGI client, one event loop and every
+request in flight at once, and compares it with the synchronous path on a
+fixed pool of worker threads, which is how a threaded WSGI server such as
+Flask's serves api.py. The model is replaced by a client that sleeps for
+the given latency, so only the waiting is measured and nothing leaves the
+machine. Each request has its own session, since a session's commands
+run one at a time. Runs against a temporary database. Also checks every
+route answers as api.py does.
+
+Usage:
+    python benchmarks/bench_asgi.py [requests] [latency_s] [threads]
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+
+def completion(text):
+    message = SimpleNamespace(content=text, tool_calls=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def fake_clients(latency):
+    async def create_async(**request):
+        await asyncio.sleep(latency)
+        return completion("ok")
+
+    def create(**request):
+        time.sleep(latency)
+        return completion("ok")
+
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create_async)))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, async_client
+
+
+async def call(app, method, path, payload=None):
+    """Sends one request through ``app`` in-process; returns (status, parsed JSON body)."""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    scope = {"type": "http", "method": method, "path": path, "headers": [(b"content-type", b"application/json")]}
+    sent = False
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], json.loads(response["body"]) if response["body"] else None
+
+
+async def check_routes(app):
+    checks = [
+        ("GET", "/api/health", None, 200),
+        ("POST", "/api/command", {"command": "tell me something", "session_id": "check"}, 200),
+        ("POST", "/api/command", {"command": "no session"}, 400),
+        ("GET", "/api/history/check", None, 200),
+        ("GET", "/api/reminders/check", None, 200),
+        ("GET", "/api/plugins", None, 200),
+        ("GET", "/api/metrics", None, 200),
+        ("GET", "/api/command", None, 405),
+        ("GET", "/api/missing", None, 404)
+    ]
+    for method, path, payload, expected in checks:
+        status, _ = await call(app, method, path, payload)
+        assert status == expected, f"{method} {path}: {status} != {expected}"
+    _, history = await call(app, "GET", "/api/history/check")
+    assert [m["content"] for m in history] == ["tell me something", "ok"], history
+
+
+async def run_asgi(app, requests):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        call(app, "POST", "/api/command", {"command": f"tell me fact number {i}", "session_id": f"asgi-{i}"})
+        for i in range(requests)
+    ))
+    elapsed = time.perf_counter() - start
+    assert all(status == 200 and body["response"] == "ok" for status, body in results)
+    return elapsed
+
+
+def run_threaded(manager, requests, threads):
+    def handle(i):
+        return manager.get(f"threaded-{i}").ai_core.process_command(f"tell me fact number {i}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        replies = list(pool.map(handle, range(requests)))
+    elapsed = time.perf_counter() - start
+    assert all(reply == "ok" for reply in replies)
+    return elapsed
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    os.environ["GEMINI_API_KEY"] = "bench"
+    os.environ["LLM_RESPONSE_CACHE"] = "false"
+    # Admit every request at once; the point is how many waits one loop can hold
+    os.environ["MAX_IN_FLIGHT_REQUESTS"] = str(requests)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import assistant.core
+        client, async_client = fake_clients(latency)
+        assistant.core.get_openai_client = lambda api_key: client
+        assistant.core.get_async_openai_client = lambda api_key: async_client
+
+        from asgi import app
+        from assistant.session_manager import get_session_manager
+        manager = get_session_manager()
+        asyncio.run(check_routes(app))
+
+        asgi_elapsed = asyncio.run(run_asgi(app, requests))
+        threaded_elapsed = run_threaded(manager, requests, threads)
+
+    print(f"{requests} requests, {latency * 1000:.0f} ms model latency each; all routes answered as expected")
+    print(f"{'server':<26}{'wall time (s)':>14}{'requests/s':>12}")
+    print(f"{'ASGI, one event loop':<26}{asgi_elapsed:>14.2f}{requests / asgi_elapsed:>12.0f}")
+    print(f"{f'threaded, {threads} workers':<26}{threaded_elapsed:>14.2f}{requests / threaded_elapsed:>12.0f}")
+    print(f"ASGI overhead over one model round trip: {(asgi_elapsed - latency) * 1000:.0f} ms")
+    print(f"Speedup: {threaded_elapsed / asgi_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
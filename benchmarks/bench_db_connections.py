@@ -0,0 +1,135 @@
+"""
+Benchmark: pooled WAL connections vs. the old open-per-call Database.
+
+Runs a mixed workload (one writer thread saving conversation turns, several
+reader threads loading history and due reminders) against both connection
+strategies and reports operations per second.
+
+Usage:
+    python benchmarks/bench_db_connections.py [seconds] [readers]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant.database import Database
+from assistant.migrations import migrate
+
+
+class OpenPerCallDatabase(Database):
+    """
+    The previous behaviour: a fresh connection per call behind one global
+    lock, on a rollback-journal file with SQLite's default pragmas. No
+    ConnectionPool is built, so nothing can switch the file to WAL.
+    """
+
+    def __init__(self, db_path: str = "assistant.db"):
+        self.db_path = db_path
+        self.settings_ttl = None
+        self._lock = threading.Lock()
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        migrate(conn)
+        conn.close()
+
+    def close(self):
+        pass
+
+    def _read(self):
+        return self._legacy_cursor(commit=False)
+
+    def _write(self):
+        return self._legacy_cursor(commit=True)
+
+    def _legacy_cursor(self, commit):
+        db = self
+
+        class _Ctx:
+            def __enter__(self):
+                db._lock.acquire()
+                self.conn = sqlite3.connect(db.db_path)
+                self.conn.row_factory = sqlite3.Row
+                return self.conn.cursor()
+
+            def __exit__(self, exc_type, exc, tb):
+                try:
+                    if commit and exc_type is None:
+                        self.conn.commit()
+                    self.conn.close()
+                finally:
+                    db._lock.release()
+
+        return _Ctx()
+
+
+def run_workload(db, seconds, readers):
+    counts = {"writes": 0, "reads": 0}
+    counts_lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+    session_ids = [f"bench_{i}" for i in range(readers)]
+
+    def writer():
+        n = 0
+        while time.perf_counter() < stop:
+            db.save_conversation(session_ids[n % len(session_ids)], "user", f"message {n}")
+            n += 1
+        with counts_lock:
+            counts["writes"] += n
+
+    def reader(session_id):
+        n = 0
+        while time.perf_counter() < stop:
+            db.get_conversation_history(session_id, limit=20)
+            db.get_due_reminders(session_id)
+            n += 2
+        with counts_lock:
+            counts["reads"] += n
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(sid,)) for sid in session_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return counts
+
+
+def bench(label, db_class, seconds, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = db_class(os.path.join(tmp, "bench.db"))
+        for i in range(readers):
+            db.save_reminder(f"bench_{i}", "stretch", datetime.now() - timedelta(minutes=1))
+        counts = run_workload(db, seconds, readers)
+        db.close()
+        # The mode the file was in throughout; WAL persists once set
+        conn = sqlite3.connect(db.db_path)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+
+    total = counts["writes"] + counts["reads"]
+    print(f"{label:<16} journal={journal_mode:<7} writes/s={counts['writes'] / seconds:>9.0f}  "
+          f"reads/s={counts['reads'] / seconds:>9.0f}  total ops/s={total / seconds:>9.0f}")
+    return total / seconds
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print(f"Mixed workload: 1 writer, {readers} readers, {seconds:.0f}s per run")
+    legacy = bench("open-per-call", OpenPerCallDatabase, seconds, readers)
+    pooled = bench("pooled WAL", Database, seconds, readers)
+    print(f"Speedup: {pooled / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
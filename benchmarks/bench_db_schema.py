@@ -0,0 +1,143 @@
+"""
+Benchmark: legacy schema vs. composite indexes and sargable reminder queries.
+
+Builds two databases with the same synthetic data (conversations and
+reminders spread across many sessions), one with the original indexes and
+datetime()-wrapped reminder predicates, one with the current Database
+schema, and times the hot per-session queries on each.
+
+Usage:
+    python benchmarks/bench_db_schema.py [rows] [sessions] [queries]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant.database import Database
+
+LEGACY_SCHEMA = [
+    '''CREATE TABLE conversations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        plugin_used TEXT,
+        tokens_used INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+    'CREATE INDEX idx_session_id ON conversations(session_id)',
+    'CREATE INDEX idx_created_at ON conversations(created_at)',
+    '''CREATE TABLE reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        reminder_text TEXT NOT NULL,
+        due_time TIMESTAMP NOT NULL,
+        completed BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+]
+
+LEGACY_QUERIES = {
+    "history": '''
+        SELECT role, content, plugin_used, created_at FROM conversations
+        WHERE session_id = ? ORDER BY created_at DESC LIMIT 20''',
+    "due reminders": '''
+        SELECT id, reminder_text, due_time FROM reminders
+        WHERE session_id = ? AND completed = 0
+          AND datetime(due_time) <= datetime('now', 'localtime')
+        ORDER BY due_time ASC''',
+}
+
+CURRENT_QUERIES = {
+    "history": '''
+        SELECT role, content, plugin_used, created_at FROM conversations
+        WHERE session_id = ? ORDER BY created_at DESC, id DESC LIMIT 20''',
+    "due reminders": '''
+        SELECT id, reminder_text, due_time FROM reminders
+        WHERE session_id = ? AND completed = 0 AND due_at <= ?
+        ORDER BY due_at ASC''',
+}
+
+
+def generate_rows(rows, sessions):
+    rng = random.Random(42)
+    now = int(time.time())
+    conversations = []
+    reminders = []
+    for i in range(rows):
+        session = f"session_{rng.randrange(sessions)}"
+        created = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(now - rng.randrange(90 * 86400)))
+        conversations.append((session, "user" if i % 2 else "assistant", f"message {i}", None, 0, created))
+        due = now + rng.randrange(-7 * 86400, 7 * 86400)
+        due_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(due))
+        reminders.append((session, f"reminder {i}", due_str, rng.random() < 0.5, due))
+    return conversations, reminders
+
+
+def load(conn, conversations, reminders, with_due_at):
+    conn.executemany('''
+        INSERT INTO conversations (session_id, role, content, plugin_used, tokens_used, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)''', conversations)
+    if with_due_at:
+        conn.executemany('''
+            INSERT INTO reminders (session_id, reminder_text, due_time, completed, due_at)
+            VALUES (?, ?, ?, ?, ?)''', reminders)
+    else:
+        conn.executemany('''
+            INSERT INTO reminders (session_id, reminder_text, due_time, completed)
+            VALUES (?, ?, ?, ?)''', [r[:4] for r in reminders])
+    conn.commit()
+    conn.execute('ANALYZE')
+
+
+def time_queries(conn, queries, session_ids):
+    results = {}
+    now = int(time.time())
+    for name, sql in queries.items():
+        start = time.perf_counter()
+        for session_id in session_ids:
+            params = (session_id, now) if sql.count('?') == 2 else (session_id,)
+            conn.execute(sql, params).fetchall()
+        results[name] = (time.perf_counter() - start) / len(session_ids) * 1000
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    print(f"Generating {rows:,} conversations and {rows:,} reminders across {sessions:,} sessions...")
+    conversations, reminders = generate_rows(rows, sessions)
+    rng = random.Random(7)
+    session_ids = [f"session_{rng.randrange(sessions)}" for _ in range(queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = sqlite3.connect(os.path.join(tmp, "legacy.db"))
+        for statement in LEGACY_SCHEMA:
+            legacy.execute(statement)
+        load(legacy, conversations, reminders, with_due_at=False)
+
+        current_path = os.path.join(tmp, "current.db")
+        Database(current_path).close()
+        current = sqlite3.connect(current_path)
+        load(current, conversations, reminders, with_due_at=True)
+
+        legacy_times = time_queries(legacy, LEGACY_QUERIES, session_ids)
+        current_times = time_queries(current, CURRENT_QUERIES, session_ids)
+        legacy.close()
+        current.close()
+
+    print(f"{'query':<16}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for name in LEGACY_QUERIES:
+        before, after = legacy_times[name], current_times[name]
+        print(f"{name:<16}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark: sequential keyword/regex checks vs. the single-pass intent router.
+
+Routes a corpus of assistant commands through a copy of the original
+checks in AICore._process_directly, _process_reminder_directly,
+_fallback_response and LocalAI.process, and through assistant.intent_router.
+Before timing anything it verifies that both produce identical decisions
+(direct handlers, parsed reminder, offline fallback, local reply) for every
+command.
+
+Usage:
+    python benchmarks/bench_intent_router.py [iterations]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant import intent_router
+
+COMMANDS = [
+    "What's the weather in Paris?",
+    "weather london",
+    "Is it going to rain in New York tomorrow",
+    "Show me the latest technology news",
+    "news about sports",
+    "Any business headlines this morning?",
+    "Remind me to call mom in 2 hours",
+    "remind me to take out the trash at 8pm",
+    "Set a reminder for the dentist appointment tomorrow at 3pm",
+    "at 5pm remind me to feed the cat",
+    "remind me in 30 minutes to check the oven",
+    "Can you remind me about the meeting",
+    "set an alarm for 7am",
+    "Remember that my wife's birthday is on June 3",
+    "calculate 15 * 27 + 42",
+    "what is 2+2",
+    "What is the capital of Australia?",
+    "12 divided by 4",
+    "100 minus 37 plus 5",
+    "sqrt of 144 = ?",
+    "organize files in ~/Downloads",
+    "organize folder in C:\\Users\\me\\Desktop",
+    "What time is it?",
+    "what's the date today",
+    "Do I have any events on my calendar this week?",
+    "show my schedule",
+    "Hello!",
+    "hi there, how are you doing",
+    "Hey Jarvis",
+    "Thanks a lot, that was helpful",
+    "thank you!",
+    "Goodbye",
+    "see you later",
+    "What can you do?",
+    "help",
+    "Who are you?",
+    "what's your name",
+    "Tell me a joke about programmers",
+    "Write a haiku about autumn leaves falling on a quiet lake",
+    "Explain the difference between TCP and UDP in simple terms",
+    "Translate 'good morning' into Japanese",
+    "Summarize the plot of Hamlet in three sentences",
+    "I need to prepare for a job interview next Monday, any tips?",
+    "Search the web for Python asyncio tutorials",
+    "save note buy milk and eggs",
+    "show my notes",
+    "system info please",
+    "How far is the moon from the earth in kilometers",
+    "Recommend a good sci-fi book similar to Dune",
+    "What should I cook tonight with chicken, rice and spinach?",
+]
+
+
+# ---- Copy of the original checks, kept verbatim apart from returning decisions ----
+
+def legacy_parse_reminder(text_lower):
+    patterns = [
+        (r'remind\s+me\s+to\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+        (r'set\s+(?:a\s+)?reminder\s+for\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+        (r'remind\s+me\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+        (r'reminder\s+(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+        (r'(?:at|on|in)\s+(.+?)\s+remind\s+me\s+to\s+(.+)', 2, 1),
+        (r'(?:at|on|in)\s+(.+?)\s+set\s+(?:a\s+)?reminder\s+for\s+(.+)', 2, 1),
+        (r'remind\s+me\s+(?:at|on|in)\s+(.+?)\s+to\s+(.+)', 2, 1),
+        (r'remind\s+(?:at|on|in)\s+(.+?)\s+to\s+(.+)', 2, 1),
+        (r'set\s+(?:a\s+)?reminder\s+(?:at|on|in)\s+(.+?)\s+for\s+(.+)', 2, 1),
+        (r'(?:at|on|in)\s+(.+?)\s+(?:remind\s+me|reminder)\s+(.+)', 2, 1),
+        (r'(.+?)\s+(?:at|on|in)\s+(.+)', 1, 2),
+    ]
+    for pattern, task_idx, time_idx in patterns:
+        match = re.search(pattern, text_lower)
+        if match:
+            groups = match.groups()
+            task = groups[task_idx-1].strip()
+            when = groups[time_idx-1].strip()
+            task = re.sub(r'^(?:to|a|the|my)\s+', '', task)
+            if task in ['remind', 'reminder']:
+                continue
+            return task, when
+    time_pattern = r'(?:at|on|in)\s+(\d+\s*(?:minutes?|hours?|days?|weeks?|am|pm)|tomorrow|next\s+\w+|\d{1,2}(?::\d{2})?\s*(?:am|pm)?)'
+    time_match = re.search(time_pattern, text_lower)
+    if time_match:
+        time_expr = time_match.group(0).strip()
+        task = text_lower.replace(time_expr, '').strip()
+        task = re.sub(r'^(remind\s+me|set\s+(?:a\s+)?reminder|reminder)\s+', '', task)
+        task = re.sub(r'\s+to$', '', task)
+        if task and task not in ['remind', 'reminder']:
+            return task, time_expr
+    return None
+
+
+def legacy_route(text):
+    text_lower = text.lower()
+    direct = []
+    reminder = None
+    if any(word in text_lower for word in ['remind', 'reminder', 'alarm', 'notify', 'remember']):
+        direct.append('reminder')
+        reminder = legacy_parse_reminder(text_lower)
+    text_lower = text.lower()
+    if 'organize files' in text_lower or 'organize folder' in text_lower:
+        direct.append('organize_files')
+    calc_keywords = ['calculate', 'what is', '=', 'multiplied', 'divided', 'plus', 'minus']
+    if any(keyword in text_lower for keyword in calc_keywords) or re.search(r'\d+\s*[\+\-\*\/]\s*\d+', text_lower):
+        direct.append('calculate')
+
+    text_lower = text.lower()
+    fallback = []
+    if any(word in text_lower for word in ['time', 'clock']) or 'date' in text_lower:
+        fallback.append('time_date')
+    if 'weather' in text_lower:
+        fallback.append('weather')
+    if 'news' in text_lower:
+        fallback.append('news')
+    if any(word in text_lower for word in ['calendar', 'events', 'schedule']):
+        fallback.append('calendar')
+    if any(word in text_lower for word in ['calculate', 'what is', '=']):
+        fallback.append('calculate')
+
+    text_lower = text.lower()
+    if any(word in text_lower for word in ['hello', 'hi', 'hey', 'greetings']):
+        local = 'greeting'
+    elif any(word in text_lower for word in ['bye', 'goodbye', 'exit', 'quit', 'see you']):
+        local = 'farewell'
+    elif any(word in text_lower for word in ['help', 'what can you do', 'capabilities']):
+        local = 'help'
+    elif any(word in text_lower for word in ['thanks', 'thank you', 'appreciate']):
+        local = 'thanks'
+    elif 'time' in text_lower and 'date' not in text_lower:
+        local = 'time'
+    elif 'date' in text_lower:
+        local = 'date'
+    elif 'weather' in text_lower:
+        local = 'weather'
+    elif 'news' in text_lower:
+        local = 'news'
+    elif 'calculate' in text_lower or re.search(r'what is \d+', text_lower):
+        local = 'calculate'
+    elif any(word in text_lower for word in ['who are you', 'your name', 'what are you']):
+        local = 'identity'
+    elif 'how are you' in text_lower:
+        local = 'how_are_you'
+    else:
+        local = 'unknown'
+    return tuple(direct), reminder, tuple(fallback), local
+
+
+def router_route(text):
+    message = intent_router.analyze(text)
+    direct = intent_router.direct_intents(message)
+    reminder = intent_router.parse_reminder(message) if 'reminder' in direct else None
+    return direct, reminder, intent_router.fallback_intents(message), intent_router.local_intent(message)
+
+
+def time_per_command(route, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for command in COMMANDS:
+            route(command)
+    return (time.perf_counter() - start) / (iterations * len(COMMANDS)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    mismatches = [c for c in COMMANDS if legacy_route(c) != router_route(c)]
+    if mismatches:
+        for command in mismatches:
+            print(f"MISMATCH {command!r}:\n  legacy {legacy_route(command)}\n  router {router_route(command)}")
+        sys.exit(1)
+    print(f"{len(COMMANDS)} commands route identically")
+
+    legacy = time_per_command(legacy_route, iterations)
+    router = time_per_command(router_route, iterations)
+    print(f"{'router':<12}{'us/command':>12}")
+    print(f"{'legacy':<12}{legacy:>12.2f}")
+    print(f"{'single-pass':<12}{router:>12.2f}")
+    print(f"speedup {legacy / router:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: full-text search latency over a large conversations table.
+
+Loads synthetic conversation turns through the FTS triggers and times
+Database.search_conversations for a handful of queries, scoped to one
+session and across all sessions.
+
+Usage:
+    python benchmarks/bench_search.py [rows] [sessions]
+"""
+import hashlib
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant.database import Database
+
+COMMON_WORDS = ("the a to is in it you of for on my me what can please and "
+                "weather paris london news reminder meeting call tomorrow").split()
+QUERIES = ["weather paris", "dentist", "python deploy", "birthday gi", "flight hotel"]
+
+
+def build_vocabulary(rng, size=20_000):
+    # Common words plus a long tail of pseudo-words, drawn with Zipf-like weights
+    # so term frequencies resemble real chat text.
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    tail = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)]
+    # Query words sit at mid-frequency ranks, like typical search terms.
+    query_words = [w for q in QUERIES for w in q.split() if w not in COMMON_WORDS]
+    words = COMMON_WORDS + tail[:500] + query_words + tail[500:]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    return words, cum_weights
+
+
+def session_key(n):
+    return hashlib.md5(f"user_{n}".encode()).hexdigest()[:16]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "search.db"))
+        print(f"Loading {rows:,} conversation turns across {sessions:,} sessions...")
+        start = time.perf_counter()
+        words, cum_weights = build_vocabulary(rng)
+        batch = []
+        for i in range(rows):
+            text = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(6, 20)))
+            batch.append((session_key(rng.randrange(sessions)), "user", text, None, 0))
+            if len(batch) == 50_000:
+                db.save_conversations(batch)
+                batch = []
+        if batch:
+            db.save_conversations(batch)
+        print(f"Loaded in {time.perf_counter() - start:.1f}s")
+
+        session_id = session_key(1)
+        print(f"{'query':<16}{'session ms':>12}{'global ms':>12}")
+        for query in QUERIES:
+            timings = []
+            for scope in (session_id, None):
+                start = time.perf_counter()
+                for _ in range(20):
+                    db.search_conversations(scope, query, limit=10)
+                timings.append((time.perf_counter() - start) / 20 * 1000)
+            print(f"{query:<16}{timings[0]:>12.2f}{timings[1]:>12.2f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: a full PersonalAssistant per API session vs. the shared SessionManager.
+
+Creates sessions the way api.get_assistant used to (one PersonalAssistant
+each, with its own Database, PluginRegistry, plugins and Skills) and the way
+it does now (SessionManager), each mode in a fresh subprocess inside a
+temporary directory. Reports the resident memory each extra session adds
+and the latency of a session's first request: creating the session plus
+answering a locally handled command. GEMINI_API_KEY is cleared so nothing
+leaves the machine.
+
+Usage:
+    python benchmarks/bench_sessions.py [sessions]
+"""
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+COMMAND = "what time is it"
+MODES = ["per-session", "shared"]
+
+
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def child(mode, sessions):
+    """Runs inside the subprocess; prints one JSON line of results."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "per-session":
+            from app import PersonalAssistant
+
+            def first_request(session_id):
+                assistant = PersonalAssistant(mode="text", reminder_callback=lambda text: None)
+                return assistant.ai_core.process_command(COMMAND)
+        else:
+            from assistant.session_manager import SessionManager
+            manager = None
+
+            def first_request(session_id):
+                nonlocal manager
+                if manager is None:
+                    manager = SessionManager()
+                return manager.get(session_id).ai_core.process_command(COMMAND)
+
+        # The first session also pays for imports, migrations and shared setup.
+        start = time.perf_counter()
+        first_request("cold")
+        cold = time.perf_counter() - start
+
+        baseline = rss_bytes()
+        latencies = []
+        for i in range(sessions):
+            start = time.perf_counter()
+            first_request(f"session-{i}")
+            latencies.append(time.perf_counter() - start)
+        grown = rss_bytes() - baseline
+
+    print(json.dumps({
+        "cold_ms": cold * 1000,
+        "first_request_ms": statistics.median(latencies) * 1000,
+        "rss_per_session_kb": grown / sessions / 1024
+    }))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], int(sys.argv[3]))
+        return
+
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    env = dict(os.environ, GEMINI_API_KEY="")
+    results = {}
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as workdir:
+            # PluginRegistry.auto_discover looks for assistant/plugins relative to the cwd.
+            os.symlink(os.path.join(ROOT, "assistant"), os.path.join(workdir, "assistant"))
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, str(sessions)],
+                cwd=workdir, env=env, capture_output=True, text=True, check=True
+            ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{sessions} sessions per mode")
+    print(f"{'mode':<14}{'RSS/session (KB)':>18}{'first request (ms)':>20}{'cold start (ms)':>17}")
+    for mode in MODES:
+        r = results[mode]
+        print(f"{mode:<14}{r['rss_per_session_kb']:>18.1f}{r['first_request_ms']:>20.2f}{r['cold_ms']:>17.1f}")
+    before, after = results["per-session"], results["shared"]
+    print(f"First-request speedup: {before['first_request_ms'] / after['first_request_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,70 @@ class Settings:
     DEFAULT_CITY = "London"
     DEFAULT_NEWS_CATEGORY = "technology"
     GEMINI_MODEL = "gemini-pro"
+
+    # Write-behind conversation logging (group commits instead of one per message)
+    WRITE_BEHIND_LOGGING = os.getenv("WRITE_BEHIND_LOGGING", "false").lower() == "true"
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "32"))
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))
+
+    # Shared keep-alive connection pool for Gemini requests (sync and async clients)
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+    # Tool calls from one model turn run concurrently on a shared bounded pool
+    TOOL_CALL_WORKERS = int(os.getenv("TOOL_CALL_WORKERS", "8"))
+    TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "20"))
+
+    # Results of plugins with user-ready output are returned as the reply,
+    # skipping the second model call that would only rephrase them
+    DIRECT_TOOL_REPLIES = os.getenv("DIRECT_TOOL_REPLIES", "true").lower() == "true"
+
+    # Only the TOOL_SELECTION_TOP_K tool schemas most relevant to a request are
+    # sent to the model (all of them when none match)
+    TOOL_SELECTION = os.getenv("TOOL_SELECTION", "true").lower() == "true"
+    TOOL_SELECTION_TOP_K = int(os.getenv("TOOL_SELECTION_TOP_K", "5"))
+
+    # Results of cacheable plugins (weather, news, web search) are reused for their TTL
+    PLUGIN_CACHE_SIZE = int(os.getenv("PLUGIN_CACHE_SIZE", "512"))
+    PLUGIN_CACHE_PERSIST = os.getenv("PLUGIN_CACHE_PERSIST", "false").lower() == "true"
+
+    # Opt-in exact-match cache of Gemini replies (skips tool use and time-sensitive prompts)
+    LLM_RESPONSE_CACHE = os.getenv("LLM_RESPONSE_CACHE", "false").lower() == "true"
+    LLM_RESPONSE_CACHE_TTL = float(os.getenv("LLM_RESPONSE_CACHE_TTL", "86400"))
+    LLM_RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "5000"))
+
+    # Prompt history is packed into this many (estimated) tokens; older turns
+    # are folded into a rolling per-session summary ("extractive" or "gemini")
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+    CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "300"))
+    CONTEXT_SUMMARIZER = os.getenv("CONTEXT_SUMMARIZER", "extractive").lower()
+
+    # Opt-in local intent classifier (train with train_intent_classifier.py); requests
+    # it routes to a plugin with at least this confidence skip the LLM
+    INTENT_CLASSIFIER = os.getenv("INTENT_CLASSIFIER", "false").lower() == "true"
+    INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", "intent_model.json")
+    INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.7"))
+
+    # API sessions kept in memory (least recently used evicted first) and seconds
+    # of inactivity before one is dropped (0 = never); evicted sessions are
+    # rebuilt from the database when they return
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+    SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))
+
+    # Commands served at once across all sessions, how many more may wait and
+    # for how many seconds (0 = no limit), and how many of one session's
+    # commands may wait behind its running one; beyond these the API answers 429
+    MAX_IN_FLIGHT_REQUESTS = int(os.getenv("MAX_IN_FLIGHT_REQUESTS", "64"))
+    ADMISSION_QUEUE_DEPTH = int(os.getenv("ADMISSION_QUEUE_DEPTH", "256"))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+    SESSION_QUEUE_DEPTH = int(os.getenv("SESSION_QUEUE_DEPTH", "8"))
+
+    # Seconds a cached user_settings row is trusted (0 = until updated in this process)
+    SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL", "0"))
+
+    # Conversation retention (0 keeps everything); expired rows are deleted in batches
+    CONVERSATION_RETENTION_DAYS = int(os.getenv("CONVERSATION_RETENTION_DAYS", "0"))
+    RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
     
     # FIXED: Remove {tool_list} placeholder since we're not using it yet
     SYSTEM_PROMPT = """You are Jarvis, an intelligent AI assistant with access to tools. You have a distinct personality: concise, professional, slightly witty, and adaptive.
@@ -0,0 +1,78 @@
+"""
+Cross-validate the local intent classifier on the data train_intent_classifier.py uses.
+
+For each confidence threshold it reports how many requests would skip the
+LLM and how many of those would go to the wrong plugin, which is what
+INTENT_CONFIDENCE_THRESHOLD trades off.
+
+Usage:
+    python evaluate_intent_classifier.py [--db assistant.db] [--folds 5]
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from assistant.intent_classifier import NO_TOOL, train
+from train_intent_classifier import load_examples
+
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+
+
+def cross_validate(examples, folds, epochs, seed=13):
+    """Out-of-fold (true label, predicted label, confidence) for every example."""
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    predictions = []
+    for fold in range(folds):
+        held_out = shuffled[fold::folds]
+        training = [e for i, e in enumerate(shuffled) if i % folds != fold]
+        classifier = train(training, epochs=epochs)
+        for text, label in held_out:
+            predicted, confidence = classifier.predict(text)
+            predictions.append((label, predicted, confidence))
+    return predictions, classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="assistant.db")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--epochs", type=int, default=30)
+    args = parser.parse_args()
+
+    examples = load_examples(args.db, args.limit)
+    predictions, classifier = cross_validate(examples, max(2, args.folds), args.epochs)
+
+    accuracy = sum(label == predicted for label, predicted, _ in predictions) / len(predictions)
+    print(f"{len(examples)} examples, {args.folds}-fold accuracy {accuracy:.1%}\n")
+
+    support = Counter(label for label, _, _ in predictions)
+    predicted_counts = Counter(predicted for _, predicted, _ in predictions)
+    correct = Counter(label for label, predicted, _ in predictions if label == predicted)
+    print(f"{'label':<20}{'support':>8}{'precision':>11}{'recall':>8}")
+    for label in sorted(support):
+        precision = correct[label] / predicted_counts[label] if predicted_counts[label] else 0.0
+        print(f"{label:<20}{support[label]:>8}{precision:>11.1%}{correct[label] / support[label]:>8.1%}")
+
+    # A request skips the LLM when a plugin (not NO_TOOL) is predicted at or above the threshold.
+    print(f"\n{'threshold':<11}{'skip LLM':>10}{'correct':>9}{'wrong plugin':>14}")
+    for threshold in THRESHOLDS:
+        dispatched = [(label, predicted) for label, predicted, confidence in predictions
+                      if predicted != NO_TOOL and confidence >= threshold]
+        right = sum(label == predicted for label, predicted in dispatched)
+        share = len(dispatched) / len(predictions)
+        precision = right / len(dispatched) if dispatched else 0.0
+        print(f"{threshold:<11}{share:>10.1%}{precision:>9.1%}{len(dispatched) - right:>14}")
+
+    texts = [text for text, _ in examples]
+    start = time.perf_counter()
+    for text in texts:
+        classifier.predict(text)
+    elapsed = (time.perf_counter() - start) / len(texts) * 1e6
+    print(f"\nPrediction takes {elapsed:.0f} us per request")
+
+
+if __name__ == "__main__":
+    main()
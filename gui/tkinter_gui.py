@@ -176,6 +176,20 @@ class AssistantGUI:
         self.conversation_text.config(state=tk.DISABLED)
         self.conversation_text.see(tk.END)
 
+    def begin_streamed_message(self):
+        self.conversation_text.config(state=tk.NORMAL)
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.conversation_text.insert(tk.END, f"[{timestamp}] ", 'timestamp')
+        self.conversation_text.insert(tk.END, "Assistant: ", 'assistant_label')
+        self.conversation_text.config(state=tk.DISABLED)
+        self.conversation_text.see(tk.END)
+
+    def append_streamed_text(self, text):
+        self.conversation_text.config(state=tk.NORMAL)
+        self.conversation_text.insert(tk.END, text, 'assistant_message')
+        self.conversation_text.config(state=tk.DISABLED)
+        self.conversation_text.see(tk.END)
+
     def add_system_message(self, message):
         self.conversation_text.config(state=tk.NORMAL)
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -211,8 +225,13 @@ class AssistantGUI:
             elif lower == 'stats':
                 self.message_queue.put(("stats", None))
             else:
-                response = self.assistant.ai_core.process_command(message)
-                self.message_queue.put(("response", response))
+                # Pieces are shown as they arrive instead of after the full reply
+                self.message_queue.put(("stream_start", None))
+                try:
+                    for piece in self.assistant.ai_core.process_command_stream(message):
+                        self.message_queue.put(("stream", piece))
+                finally:
+                    self.message_queue.put(("stream_end", None))
         except Exception as e:
             self.message_queue.put(("error", str(e)))
 
@@ -432,6 +451,16 @@ class AssistantGUI:
                     self.status_var.set("Ready")
                     self.input_entry.config(state='normal')
                     self.input_entry.focus()
+                elif msg_type == "stream_start":
+                    self.begin_streamed_message()
+                elif msg_type == "stream":
+                    self.append_streamed_text(data)
+                    self.status_var.set("Responding...")
+                elif msg_type == "stream_end":
+                    self.append_streamed_text("\n\n")
+                    self.status_var.set("Ready")
+                    self.input_entry.config(state='normal')
+                    self.input_entry.focus()
                 elif msg_type == "error":
                     self.add_system_message(f"Error: {data}")
                     self.status_var.set(f"Error: {data}")
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant import core
+from assistant.core import AICore
+from assistant.database import Database
+from assistant.plugin_base import AssistantPlugin
+from assistant.plugin_registry import PluginRegistry
+from assistant.result_cache import ResultCache
+from config.settings import Settings
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = Database(str(tmp_path / "assistant.db"))
+    yield db
+    db.close()
+
+
+def tool_call(name, arguments=None, call_id=None):
+    """A scripted model turn that calls one tool; pass a list of these to call several."""
+    return SimpleNamespace(
+        id=call_id or f"call_{name}",
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments or {}))
+    )
+
+
+class FakeLLM:
+    """
+    Stands in for the OpenAI-compatible Gemini client. Each create() call
+    takes the next scripted reply: a string, or a list of tool_call()s.
+    Streaming requests get the string a word at a time and tool calls as
+    fragments, as the real API sends them. ``requests`` records every call.
+    """
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.open_streams = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create_async)))
+
+    def _next(self, request):
+        self.requests.append(request)
+        if not self.replies:
+            raise AssertionError("unexpected model call")
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def create(self, **request):
+        reply = self._next(request)
+        if request.get("stream"):
+            return FakeStream(self._chunks(reply), self)
+        return self._response(reply)
+
+    async def create_async(self, **request):
+        reply = self._next(request)
+        if request.get("stream"):
+            return FakeAsyncStream(self._chunks(reply), self)
+        return self._response(reply)
+
+    @staticmethod
+    def _response(reply):
+        if isinstance(reply, str):
+            message = SimpleNamespace(content=reply, tool_calls=None)
+        else:
+            message = SimpleNamespace(content=None, tool_calls=reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    @staticmethod
+    def _chunks(reply):
+        def chunk(content=None, tool_calls=None):
+            return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+        if isinstance(reply, str):
+            words = reply.split(" ")
+            return [chunk(content=w if i == 0 else f" {w}") for i, w in enumerate(words)]
+        chunks = []
+        for index, call in enumerate(reply):
+            arguments = call.function.arguments
+            half = len(arguments) // 2
+            chunks.append(chunk(tool_calls=[SimpleNamespace(
+                index=index, id=call.id, function=SimpleNamespace(name=call.function.name, arguments=arguments[:half])
+            )]))
+            chunks.append(chunk(tool_calls=[SimpleNamespace(
+                index=index, id=None, function=SimpleNamespace(name=None, arguments=arguments[half:])
+            )]))
+        return chunks
+
+
+class FakeStream:
+    """Iterator over chunks that, like openai's Stream, must be closed."""
+
+    def __init__(self, chunks, llm):
+        self._chunks = iter(chunks)
+        self.llm = llm
+        llm.open_streams += 1
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        self.llm.open_streams -= 1
+
+
+class FakeAsyncStream:
+    """Async iterator over chunks that, like openai's AsyncStream, must be closed."""
+
+    def __init__(self, chunks, llm):
+        self._chunks = iter(chunks)
+        self.llm = llm
+        llm.open_streams += 1
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.llm.open_streams -= 1
+
+
+class EchoPlugin(AssistantPlugin):
+    """Returns its arguments; ``delay`` seconds per call, ``ttl`` for the result cache."""
+
+    def __init__(self, name="echo", user_ready=False, delay=0.0, ttl=0, examples=()):
+        self.name = name
+        self.user_ready = user_ready
+        self.delay = delay
+        self.ttl = ttl
+        self.examples = list(examples)
+        self.calls = []
+
+    def get_name(self):
+        return self.name
+
+    def get_description(self):
+        return f"{self.name} plugin"
+
+    def get_parameters(self):
+        return {"type": "object", "properties": {"text": {"type": "string"}}, "required": []}
+
+    def execute(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.delay:
+            time.sleep(self.delay)
+        return f"{self.name}: {kwargs.get('text', '')}"
+
+    def has_user_ready_output(self):
+        return self.user_ready
+
+    def get_cache_ttl(self):
+        return self.ttl
+
+    def get_examples(self):
+        return self.examples
+
+
+@pytest.fixture
+def make_core(database, monkeypatch):
+    """
+    Builds AICores on the test database whose model is a FakeLLM. Plugins
+    are registered on a fresh registry with its own result cache.
+    """
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(Settings, "INTENT_CLASSIFIER", False)
+    monkeypatch.setattr(Settings, "TOOL_SELECTION", False)
+    monkeypatch.setattr(Settings, "LLM_RESPONSE_CACHE", False)
+
+    def make(llm=None, plugins=(), session_id="s", **settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(Settings, name, value)
+        llm = llm or FakeLLM()
+        monkeypatch.setattr(core, "get_openai_client", lambda api_key: llm)
+        monkeypatch.setattr(core, "get_async_openai_client", lambda api_key: llm.async_client)
+        registry = PluginRegistry(database, result_cache=ResultCache())
+        for plugin in plugins:
+            registry.register(plugin)
+        return AICore(plugin_registry=registry, session_id=session_id,
+                      write_behind=False, database=database)
+
+    return make
+
+
+@pytest.fixture
+def make_manager(database, monkeypatch):
+    """Builds SessionManagers on the test database with no plugins, no skills and no model."""
+    from assistant.session_manager import SessionManager
+
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr(Settings, "INTENT_CLASSIFIER", False)
+    managers = []
+
+    def make(**options):
+        options.setdefault("idle_timeout", 0)
+        manager = SessionManager(
+            database=database,
+            plugin_registry=PluginRegistry(database, result_cache=ResultCache()),
+            skills=SimpleNamespace(),
+            **options
+        )
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        for session_id in list(manager._sessions):
+            manager._evict(session_id)
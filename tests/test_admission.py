@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from assistant.admission import AdmissionController, Overloaded
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.001)
+
+
+def test_threads_are_admitted_in_arrival_order():
+    controller = AdmissionController(1)
+    order = []
+
+    def worker(i):
+        with controller.admit():
+            order.append(i)
+
+    threads = []
+    with controller.admit():
+        for i in range(5):
+            thread = threading.Thread(target=worker, args=(i,))
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda: controller.stats()["queue_depth"] == i + 1)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == [0, 1, 2, 3, 4]
+    assert controller.stats()["in_flight"] == 0 and not controller.busy
+
+
+def test_coroutines_are_admitted_in_arrival_order():
+    async def run():
+        controller = AdmissionController(2)
+        order = []
+
+        async def worker(i):
+            async with controller.admit_async():
+                order.append(i)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(worker(i) for i in range(6)))
+        return controller, order
+
+    controller, order = asyncio.run(run())
+    assert order == list(range(6))
+    assert controller.stats()["admitted"] == 6 and controller.stats()["queued"] == 4
+
+
+def test_full_queue_is_rejected_with_a_retry_hint():
+    controller = AdmissionController(1, max_queue=0)
+    with controller.admit():
+        with pytest.raises(Overloaded) as error:
+            with controller.admit():
+                pass
+    assert error.value.retry_after >= 1
+    assert controller.stats()["rejected"] == 1
+
+
+def test_waiting_past_the_queue_timeout_is_overloaded():
+    controller = AdmissionController(1, queue_timeout=0.05)
+    with controller.admit():
+        with pytest.raises(Overloaded, match="Timed out"):
+            with controller.admit():
+                pass
+
+        async def wait():
+            async with controller.admit_async():
+                pass
+
+        with pytest.raises(Overloaded, match="Timed out"):
+            asyncio.run(wait())
+    assert controller.stats()["timed_out"] == 2
+    assert controller.stats()["queue_depth"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        controller = AdmissionController(1)
+        order = []
+
+        async def worker(name):
+            async with controller.admit_async():
+                order.append(name)
+
+        async with controller.admit_async():
+            cancelled = asyncio.ensure_future(worker("cancelled"))
+            after = asyncio.ensure_future(worker("after"))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.sleep(0.01)
+            assert controller.stats()["queue_depth"] == 1
+        await after
+        return controller, order
+
+    controller, order = asyncio.run(run())
+    assert order == ["after"]
+    assert not controller.busy
+
+
+def test_cancelled_waiter_passes_on_a_slot_it_was_granted():
+    async def run():
+        controller = AdmissionController(1)
+        order = []
+
+        async def worker(name):
+            async with controller.admit_async():
+                order.append(name)
+
+        holder = controller.admit_async()
+        await holder.__aenter__()
+        cancelled = asyncio.ensure_future(worker("cancelled"))
+        after = asyncio.ensure_future(worker("after"))
+        await asyncio.sleep(0.01)
+        # The slot goes to "cancelled" but it is cancelled before it runs
+        await holder.__aexit__(None, None, None)
+        cancelled.cancel()
+        await after
+        return controller, order
+
+    controller, order = asyncio.run(run())
+    assert order == ["after"]
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_stats_report_queue_waits():
+    controller = AdmissionController(4, max_queue=8)
+    with controller.admit():
+        pass
+    stats = controller.stats()
+    assert {"in_flight", "queue_depth", "admitted", "rejected", "timed_out",
+            "queue_wait_p95_ms", "queue_wait_max_ms"} <= set(stats)
+    assert stats["admitted"] == 1 and stats["max_queue"] == 8
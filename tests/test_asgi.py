@@ -0,0 +1,216 @@
+import asyncio
+import json
+
+import pytest
+
+import asgi
+from assistant import core, metrics
+from assistant.admission import AdmissionController
+
+from conftest import EchoPlugin, FakeLLM, tool_call
+
+
+async def call(method, path, payload=None, body=None, headers=()):
+    """Sends one request through asgi.app in-process; returns (status, headers, body bytes)."""
+    if body is None:
+        body = json.dumps(payload).encode() if payload is not None else b""
+    scope = {"type": "http", "method": method, "path": path,
+             "headers": [(b"content-type", b"application/json")] + list(headers)}
+    sent = False
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message.get("headers", []))
+        else:
+            response["body"] += message.get("body", b"")
+
+    await asgi.app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+def request(method, path, payload=None, **kwargs):
+    status, headers, body = asyncio.run(call(method, path, payload, **kwargs))
+    if headers.get(b"content-type") == b"text/event-stream":
+        return status, headers, events(body)
+    return status, headers, json.loads(body) if body else None
+
+
+def events(body):
+    return [json.loads(line[len("data: "):]) for line in body.decode().split("\n\n") if line]
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(core, "get_openai_client", lambda api_key: llm)
+    monkeypatch.setattr(core, "get_async_openai_client", lambda api_key: llm.async_client)
+    return llm
+
+
+@pytest.fixture
+def manager(make_manager, llm, monkeypatch):
+    manager = make_manager()
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(asgi, "get_session_manager", lambda: manager)
+    monkeypatch.setattr(metrics, "get_session_manager", lambda: manager)
+    return manager
+
+
+def test_health():
+    assert request("GET", "/api/health")[::2] == (200, {"status": "healthy"})
+
+
+def test_command_answers_through_the_async_client(manager, llm):
+    llm.replies.append("Hi!")
+    status, headers, body = request("POST", "/api/command", {"command": "hello there", "session_id": "s"})
+    assert (status, body) == (200, {"response": "Hi!"})
+    assert headers[b"access-control-allow-origin"] == b"*"
+    assert [m["content"] for m in manager.get("s").ai_core.conversation_history] == ["hello there", "Hi!"]
+
+
+@pytest.mark.parametrize("body", [b"", b"not json", b'{"command": "x"}', b'{"session_id": "s"}', b"[1]"])
+def test_command_needs_a_command_and_session(manager, body):
+    status, _, payload = request("POST", "/api/command", body=body)
+    assert (status, payload) == (400, asgi.MISSING_FIELDS)
+    assert request("POST", "/api/command/stream", body=body)[0] == 400
+
+
+def test_stream_sends_pieces_then_done(manager, llm):
+    llm.replies.append("one two three")
+    status, headers, body = asyncio.run(call("POST", "/api/command/stream", {"command": "count", "session_id": "s"}))
+    assert status == 200
+    assert headers[b"content-type"] == b"text/event-stream"
+    sent = events(body)
+    assert "".join(e["delta"] for e in sent[:-1]) == "one two three"
+    assert sent[-1]["done"] is True and sent[-1]["ttft"] is not None
+    assert llm.open_streams == 0
+
+
+@pytest.mark.parametrize("failing_send", [False, True])
+def test_stream_stops_when_the_client_disconnects(manager, llm, failing_send):
+    llm.replies.append(" ".join(f"w{i}" for i in range(50)))
+    scope = {"type": "http", "method": "POST", "path": "/api/command/stream", "headers": []}
+    body = json.dumps({"command": "long story", "session_id": "s"}).encode()
+    pieces = []
+
+    async def run():
+        gone = asyncio.Event()
+        messages = iter([{"type": "http.request", "body": body, "more_body": False}])
+
+        async def receive():
+            for message in messages:
+                return message
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if gone.is_set() and failing_send:
+                raise OSError("client went away")
+            if message.get("body"):
+                pieces.append(json.loads(message["body"].decode()[len("data: "):]))
+                if len(pieces) == 2:
+                    gone.set()
+
+        await asgi.app(scope, receive, send)
+
+    asyncio.run(run())
+    assert 2 <= len(pieces) < 50
+    assert not any(p.get("done") for p in pieces)
+    assert llm.open_streams == 0
+    session = manager.get("s")
+    assert not session.gate.busy and session.pins == 0
+    assert manager.admission.stats()["in_flight"] == 0
+    streamed = "".join(p["delta"] for p in pieces)
+    saved = [(m["role"], m["content"]) for m in manager.database.get_conversation_history("s")]
+    assert saved[0] == ("user", "long story")
+    assert saved[1][0] == "assistant" and saved[1][1].startswith(streamed) and len(saved) == 2
+
+
+def test_stream_runs_tool_calls(manager, llm):
+    manager.plugin_registry.register(EchoPlugin("clock", user_ready=True))
+    llm.replies.append([tool_call("clock", {"text": "3pm"})])
+    _, _, body = asyncio.run(call("POST", "/api/command/stream", {"command": "time?", "session_id": "s"}))
+    assert [e.get("delta") for e in events(body)[:-1]] == ["clock: 3pm"]
+
+
+def test_history_and_reminders(manager, llm):
+    llm.replies.append("noted")
+    request("POST", "/api/command", {"command": "note: milk", "session_id": "s"})
+    status, _, history = request("GET", "/api/history/s")
+    assert status == 200 and [m["content"] for m in history][-1] == "noted"
+
+    manager.get("s").deliver_reminder({"reminder_text": "buy milk"})
+    assert request("GET", "/api/reminders/s")[::2] == (200, ["buy milk"])
+    assert request("GET", "/api/reminders/s")[::2] == (200, [])
+
+
+def test_plugins_and_metrics(manager):
+    manager.plugin_registry.register(EchoPlugin("echo"))
+    assert request("GET", "/api/plugins")[::2] == (200, [{"name": "echo", "description": "echo plugin"}])
+    status, _, body = request("GET", "/api/metrics")
+    assert status == 200
+    assert {"sessions", "admission", "tool_selection"} <= set(body)
+
+
+@pytest.mark.parametrize("path", ["/api/missing", "/api/history/", "/api/history/a/b", "/"])
+def test_unknown_paths_are_404(path):
+    assert request("GET", path)[::2] == (404, {"error": "Not found"})
+
+
+def test_wrong_method_is_405_with_allow():
+    status, headers, body = request("GET", "/api/command")
+    assert (status, body) == (405, {"error": "Method not allowed"})
+    assert headers[b"allow"] == b"POST"
+
+
+def test_options_preflight():
+    status, headers, body = request("OPTIONS", "/api/command",
+                                    headers=[(b"access-control-request-headers", b"X-Custom")])
+    assert (status, body) == (204, None)
+    assert headers[b"access-control-allow-methods"] == b"POST, OPTIONS"
+    assert headers[b"access-control-allow-headers"] == b"X-Custom"
+
+
+def test_saturated_server_answers_429_with_retry_after(manager):
+    manager.admission = AdmissionController(1, max_queue=0)
+    with manager.admission.admit():
+        status, headers, body = request("POST", "/api/command", {"command": "hi", "session_id": "s"})
+        stream_status = request("POST", "/api/command/stream", {"command": "hi", "session_id": "s"})[0]
+    assert status == 429 and stream_status == 429
+    assert body == {"error": "Too many requests queued"}
+    assert int(headers[b"retry-after"]) >= 1
+
+
+def test_handler_errors_are_500(manager, monkeypatch):
+    def broken(session_id):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(manager, "get", broken)
+    assert request("GET", "/api/history/s")[::2] == (500, {"error": "Internal server error"})
+
+
+def test_lifespan_starts_and_stops(monkeypatch, manager):
+    stopped = []
+    worker = type("Worker", (), {"stop": lambda self: stopped.append(True)})()
+    monkeypatch.setattr(asgi, "start_retention_worker", lambda: worker)
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(asgi.app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert stopped == [True]
@@ -0,0 +1,110 @@
+from assistant.context_window import ContextWindow, clip_to_tokens, estimate_tokens
+
+from conftest import FakeLLM
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.folded = []
+
+    def __call__(self, previous, messages, max_tokens):
+        self.folded.extend(m["id"] for m in messages)
+        return f"{previous} +{len(messages)}".strip()
+
+
+def history(*contents, start=1):
+    roles = ("user", "assistant")
+    return [{"role": roles[i % 2], "content": c, "id": start + i} for i, c in enumerate(contents)]
+
+
+def window(database, summarizer, budget=120):
+    return ContextWindow(database, "s", budget_tokens=budget, summary_tokens=20, summarizer=summarizer)
+
+
+def test_estimates_err_high_and_clipping_marks_the_cut():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello, world") == 3
+    clipped = clip_to_tokens("word " * 100, 10)
+    assert clipped.endswith("[truncated]")
+    assert estimate_tokens(clipped) <= 10
+
+
+def test_newest_turns_are_kept_and_older_ones_summarised(database):
+    summarizer = RecordingSummarizer()
+    turns = history(*(f"message number {i} " + "pad " * 10 for i in range(10)))
+    messages = window(database, summarizer).build("system", turns, "now")
+
+    assert messages[0] == {"role": "system", "content": "system"}
+    assert messages[1]["content"].startswith("Summary of the earlier conversation:")
+    assert messages[-1] == {"role": "user", "content": "now"}
+    kept = [m["content"] for m in messages[2:-1]]
+    assert kept == [t["content"] for t in turns[-len(kept):]]
+    assert summarizer.folded == [t["id"] for t in turns[:len(turns) - len(kept)]]
+
+
+def test_repeated_messages_are_each_folded_exactly_once(database):
+    summarizer = RecordingSummarizer()
+    ctx = window(database, summarizer)
+    turns = history(*(["ok " + "pad " * 10, "sure " + "pad " * 10] * 6))
+    for end in range(2, len(turns) + 1):
+        ctx.build("system", turns[:end], "next")
+    assert len(summarizer.folded) > 2
+    assert summarizer.folded == sorted(set(summarizer.folded))
+    assert summarizer.folded == list(range(1, summarizer.folded[-1] + 1))
+
+
+def test_last_folded_turn_survives_a_new_window(database):
+    first = RecordingSummarizer()
+    turns = history(*("pad " * 12 for _ in range(8)))
+    window(database, first).build("system", turns, "now")
+    assert database.get_conversation_summary("s")["last_turn"] == first.folded[-1]
+
+    second = RecordingSummarizer()
+    window(database, second).build("system", turns + history("pad " * 12, start=9), "later")
+    assert second.folded and second.folded[0] == first.folded[-1] + 1
+
+
+def test_reset_starts_the_summary_over(database):
+    ctx = window(database, RecordingSummarizer())
+    ctx.build("system", history(*("pad " * 12 for _ in range(8))), "now")
+    ctx.reset()
+    assert ctx.summary == ""
+    assert database.get_conversation_summary("s") is None
+
+
+def test_ai_core_ids_turns_across_restarts(database, make_core):
+    ai = make_core(FakeLLM("one", "two"))
+    ai.process_command("first")
+    ai.process_command("second")
+    assert all("id" not in m for m in ai.conversation_history)
+
+    restarted = make_core(FakeLLM("three"))
+    ids = [m["id"] for m in restarted.conversation_history]
+    assert ids == database.get_latest_conversation_ids("s", 4)
+    restarted.process_command("third")
+    restarted.context_window._assign_ids(restarted.conversation_history)
+    assert [m["id"] for m in restarted.conversation_history] == database.get_latest_conversation_ids("s", 6)
+
+
+def test_turns_after_retention_still_reach_the_summary(database, make_core):
+    summarizer = RecordingSummarizer()
+    settings = {"CONTEXT_TOKEN_BUDGET": 200, "CONTEXT_SUMMARY_TOKENS": 20}
+    ai = make_core(FakeLLM(*("ok " + "pad " * 20 for _ in range(10))), **settings)
+    ai.context_window.summarizer = summarizer
+    for i in range(10):
+        ai.process_command(f"question {i} " + "pad " * 20)
+    watermark = database.get_conversation_summary("s")["last_turn"]
+    assert watermark == summarizer.folded[-1]
+
+    # Retention drops the oldest rows, then the session is rebuilt
+    with database._write() as cursor:
+        cursor.execute("DELETE FROM conversations WHERE id <= ?", (watermark,))
+    restarted = make_core(FakeLLM(*("ok " + "pad " * 20 for _ in range(6))), **settings)
+    restarted.context_window.summarizer = summarizer
+    for i in range(6):
+        restarted.process_command(f"later {i} " + "pad " * 20)
+
+    folded_after = summarizer.folded[summarizer.folded.index(watermark) + 1:]
+    assert folded_after and folded_after[0] == watermark + 1
+    assert folded_after == list(range(watermark + 1, folded_after[-1] + 1))
+    assert database.get_conversation_summary("s")["last_turn"] == folded_after[-1]
@@ -0,0 +1,84 @@
+from unittest import mock
+
+import pytest
+
+from assistant.conversation_logger import ConversationLogger, get_conversation_logger
+
+
+@pytest.fixture
+def logger(database):
+    log = ConversationLogger(database, batch_size=100, flush_interval=3600)
+    yield log
+    log.close()
+
+
+def contents(database, session_id="s"):
+    return [m["content"] for m in database.get_conversation_history(session_id)]
+
+
+def test_rows_are_buffered_until_flushed(database, logger):
+    with mock.patch.object(database, "save_conversations") as write:
+        logger.save_conversation("s", "user", "hello")
+        write.assert_not_called()
+    assert logger.pending_count() == 1
+
+
+def test_history_read_flushes_pending_rows_in_order(database, logger):
+    for i in range(5):
+        logger.save_conversation("s", "user", f"m{i}")
+    assert contents(database) == [f"m{i}" for i in range(5)]
+    assert logger.pending_count() == 0
+
+
+def test_full_batch_wakes_the_writer(database):
+    log = ConversationLogger(database, batch_size=3, flush_interval=3600)
+    try:
+        with mock.patch.object(log, "flush", wraps=log.flush) as flush:
+            for i in range(3):
+                log.save_conversation("s", "user", f"m{i}")
+            for _ in range(50):
+                if log.pending_count() == 0:
+                    break
+                log._thread.join(0.02)
+            assert log.pending_count() == 0
+            assert flush.called
+    finally:
+        log.close()
+
+
+def test_failed_flush_keeps_rows_in_front(database, logger):
+    logger.save_conversation("s", "user", "first")
+    with mock.patch.object(database, "save_conversations", side_effect=RuntimeError("locked")):
+        with pytest.raises(RuntimeError):
+            logger.flush()
+    logger.save_conversation("s", "user", "second")
+    logger.flush()
+    assert contents(database) == ["first", "second"]
+
+
+def test_failed_flush_does_not_fail_reads(database, logger):
+    database.save_conversation("s", "user", "written")
+    logger.save_conversation("s", "user", "pending")
+    with mock.patch.object(database, "save_conversations", side_effect=RuntimeError("locked")):
+        assert contents(database) == ["written"]
+        assert contents(database) == ["written"]
+    assert logger.pending_count() == 1
+    assert contents(database) == ["written", "pending"]
+
+
+def test_close_flushes_and_unhooks(database, logger):
+    logger.save_conversation("s", "user", "bye")
+    logger.close()
+    assert contents(database) == ["bye"]
+    assert logger.flush not in database._flush_hooks.get(database.db_path, [])
+
+
+def test_one_logger_per_database_file(database):
+    first = get_conversation_logger(database)
+    try:
+        assert get_conversation_logger(database) is first
+    finally:
+        first.close()
+    replacement = get_conversation_logger(database)
+    assert replacement is not first
+    replacement.close()
@@ -0,0 +1,61 @@
+import sqlite3
+import threading
+
+import pytest
+
+from assistant.database import ConnectionPool
+
+
+def test_connections_start_in_wal_mode(database):
+    with database._read() as cursor:
+        assert cursor.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert cursor.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+
+def test_connections_are_reused(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(pool._all) == 1
+    pool.close()
+
+
+def test_pool_never_opens_more_than_max_size(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=2, timeout=0.1)
+    a, b = pool.acquire(), pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+    pool.release(a)
+    assert pool.acquire() is a
+    pool.release(a)
+    pool.release(b)
+    pool.close()
+
+
+def test_memory_database_shares_one_connection():
+    assert ConnectionPool(":memory:", max_size=8).max_size == 1
+
+
+def test_release_rolls_back_an_open_transaction(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=1)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_readers_are_not_blocked_by_an_open_write(database):
+    database.save_conversation("s", "user", "before")
+    reads = []
+    with database._write() as cursor:
+        cursor.execute("INSERT INTO conversations (session_id, role, content) VALUES ('s', 'user', 'during')")
+        reader = threading.Thread(target=lambda: reads.append(database.get_conversation_history("s")))
+        reader.start()
+        reader.join(timeout=5)
+    assert [m["content"] for m in reads[0]] == ["before"]
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+
+def plan(database, sql, params=()):
+    with database._read() as cursor:
+        return " ".join(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall())
+
+
+def test_history_reads_use_the_session_created_index(database):
+    detail = plan(database, '''
+        SELECT role, content FROM conversations WHERE session_id = ?
+        ORDER BY created_at DESC, id DESC LIMIT 20
+    ''', ("s",))
+    assert "idx_conversations_session_created" in detail
+
+
+def test_due_reminder_lookup_is_a_range_scan(database):
+    detail = plan(database, '''
+        SELECT id FROM reminders WHERE session_id = ? AND completed = 0 AND due_at <= ?
+        ORDER BY due_at ASC
+    ''', ("s", 0))
+    assert "idx_reminders_session_due" in detail
+    assert "due_at<?" in detail.replace(" ", "")
+
+
+def test_due_reminders_compare_epoch_seconds(database):
+    now = datetime.now()
+    database.save_reminder("s", "overdue", now - timedelta(minutes=5))
+    database.save_reminder("s", "future", now + timedelta(minutes=5))
+    database.save_reminder("other", "overdue elsewhere", now - timedelta(minutes=5))
+    assert [r["reminder_text"] for r in database.get_due_reminders("s")] == ["overdue"]
+
+
+def test_completed_reminders_are_not_due(database):
+    reminder_id = database.save_reminder("s", "done", datetime.now() - timedelta(minutes=5))
+    database.mark_reminder_completed(reminder_id)
+    assert database.get_due_reminders("s") == []
+    assert database.get_open_reminders("s") == []
+
+
+def test_history_is_returned_oldest_first(database):
+    for i in range(5):
+        database.save_conversation("s", "user", f"m{i}")
+    assert [m["content"] for m in database.get_conversation_history("s", limit=3)] == ["m2", "m3", "m4"]
@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from assistant import intent_classifier
+from assistant.intent_classifier import (
+    CLASSIFIER_SOURCE_PREFIX, NO_TOOL, IntentClassifier, examples_from_conversations,
+    examples_from_plugins, featurize, train
+)
+
+from conftest import EchoPlugin, FakeLLM
+
+WEATHER = ["weather in paris", "is it raining in london", "forecast for tomorrow in rome",
+           "how hot is it in madrid", "will it snow in oslo", "temperature in berlin"]
+CHAT = ["tell me a joke", "write a poem about cats", "explain photosynthesis",
+        "who wrote hamlet", "recommend a book", "how are you doing"]
+
+
+def weather_model():
+    examples = [(t, "weather") for t in WEATHER] + [(t, NO_TOOL) for t in CHAT]
+    return train(examples, epochs=40)
+
+
+def test_features_are_normalised_and_digit_insensitive():
+    features = featurize("Remind me in 5 minutes")
+    assert math.isclose(sum(v * v for v in features.values()), 1.0, rel_tol=1e-6)
+    assert featurize("in 5 minutes") == featurize("in 7 minutes")
+
+
+def test_trained_model_separates_plugin_and_chat_requests():
+    model = weather_model()
+    label, confidence = model.predict("what's the weather in lisbon")
+    assert label == "weather" and confidence > 0.5
+    assert model.predict("tell me a story about a dragon")[0] == NO_TOOL
+    assert sum(model.predict_proba("anything").values()) == pytest.approx(1.0)
+
+
+def test_saved_model_predicts_the_same(tmp_path):
+    model = weather_model()
+    path = str(tmp_path / "model.json")
+    model.save(path)
+    loaded = IntentClassifier.load(path)
+    for text in ["weather in lisbon", "write a song"]:
+        assert loaded.predict(text)[0] == model.predict(text)[0]
+        assert loaded.predict(text)[1] == pytest.approx(model.predict(text)[1], abs=1e-4)
+
+
+def test_pure_python_fallback_matches_numpy(monkeypatch):
+    if intent_classifier.np is None:
+        pytest.skip("numpy not installed")
+    with_numpy = weather_model().predict_proba("weather in lisbon")
+    monkeypatch.setattr(intent_classifier, "np", None)
+    without_numpy = weather_model().predict_proba("weather in lisbon")
+    for label, p in with_numpy.items():
+        assert without_numpy[label] == pytest.approx(p, abs=1e-3)
+
+
+def test_plugin_metadata_becomes_examples():
+    examples = examples_from_plugins([EchoPlugin("get_weather", examples=["weather in paris"])])
+    assert ("get weather", "get_weather") in examples
+    assert ("weather in paris", "get_weather") in examples
+
+
+def test_logged_replies_become_examples_except_the_classifiers_own(database):
+    database.save_conversations([
+        ("s", "user", "weather in paris", None, 0),
+        ("s", "assistant", "sunny", "get_weather", 0),
+        ("s", "user", "remind me to stretch in 5 minutes", None, 0),
+        ("s", "assistant", "ok", "reminder", 0),
+        ("s", "user", "tell me a joke", None, 0),
+        ("s", "assistant", "ha", None, 0),
+        ("s", "user", "weather in rome", None, 0),
+        ("s", "assistant", "rainy", CLASSIFIER_SOURCE_PREFIX + "get_weather", 0),
+        ("s", "user", "break it", None, 0),
+        ("s", "assistant", "oops", "error", 0),
+        ("s", "user", "old plugin", None, 0),
+        ("s", "assistant", "gone", "retired_plugin", 0),
+    ])
+    examples = examples_from_conversations(database, ["get_weather", "set_reminder"])
+    assert sorted(examples) == sorted([
+        ("weather in paris", "get_weather"),
+        ("remind me to stretch in 5 minutes", "set_reminder"),
+        ("tell me a joke", NO_TOOL),
+    ])
+
+
+def test_confident_prediction_skips_the_model_and_is_tagged(database, make_core):
+    echo = EchoPlugin("weather")
+    llm = FakeLLM("chatty reply")
+    ai = make_core(llm, plugins=[echo], INTENT_CONFIDENCE_THRESHOLD=0.5)
+    ai.intent_classifier = weather_model()
+
+    assert ai.process_command("weather in lisbon") == "weather: "
+    assert llm.requests == []
+    assert database.get_conversation_history("s")[-1]["plugin_used"] == "classifier:weather"
+
+    assert ai.process_command("tell me a story about a dragon") == "chatty reply"
+    assert examples_from_conversations(database, ["weather"]) == [("tell me a story about a dragon", NO_TOOL)]
+
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from assistant import intent_router
+from assistant.intent_router import KEYWORDS, KeywordScanner, analyze
+
+
+def test_scanner_matches_substring_semantics():
+    scanner = KeywordScanner(KEYWORDS)
+    rng = random.Random(7)
+    vocabulary = sorted(KEYWORDS) + ["the", "me", "ere", "rem", "x", "1", "+", "paris"]
+    for _ in range(500):
+        text = "".join(rng.choice(vocabulary) + rng.choice(["", " "]) for _ in range(rng.randint(0, 8)))
+        assert scanner.scan(text) == frozenset(k for k in KEYWORDS if k in text), text
+
+
+def test_overlapping_keywords_are_all_reported():
+    scanner = KeywordScanner(["remind", "reminder", "mind", "remember"])
+    assert scanner.scan("reminders") == {"remind", "reminder", "mind"}
+    assert scanner.scan("nothing here") == frozenset()
+
+
+@pytest.mark.parametrize("text, intents", [
+    ("remind me to call mom in 2 hours", ("reminder",)),
+    ("please organize files in ~/Downloads", ("organize_files",)),
+    ("what is 12 * 4", ("calculate",)),
+    ("12+4", ("calculate",)),
+    ("remind me what is 2 plus 2", ("reminder", "calculate")),
+    ("tell me a joke", ()),
+])
+def test_direct_intents_in_priority_order(text, intents):
+    assert intent_router.direct_intents(analyze(text)) == intents
+
+
+@pytest.mark.parametrize("text, parsed", [
+    ("remind me to call mom in 2 hours", ("call mom", "2 hours")),
+    ("set a reminder for meeting tomorrow at 2pm", ("meeting tomorrow", "2pm")),
+    ("at 5pm remind me to stretch", ("stretch", "5pm")),
+    ("remind me", None),
+])
+def test_parse_reminder(text, parsed):
+    assert intent_router.parse_reminder(analyze(text)) == parsed
+
+
+@pytest.mark.parametrize("text, intents", [
+    ("what's the date and weather", ("time_date", "weather")),
+    ("news about sports", ("news",)),
+    ("any events on my calendar", ("calendar",)),
+    ("calculate 3*3", ("calculate",)),
+])
+def test_fallback_intents(text, intents):
+    assert intent_router.fallback_intents(analyze(text)) == intents
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("hello there", "greeting"),
+    ("ok bye", "farewell"),
+    ("what can you do", "help"),
+    ("thank you", "thanks"),
+    ("what time is it", "time"),
+    ("what is the date", "date"),
+    ("who are you", "identity"),
+    ("how are you", "how_are_you"),
+    ("zzz", "unknown"),
+])
+def test_local_intent(text, intent):
+    assert intent_router.local_intent(analyze(text)) == intent
+
+
+def test_message_is_lowercased_once():
+    message = analyze("REMIND me")
+    assert message.text == "REMIND me"
+    assert message.lower == "remind me"
+    assert message.has("remind") and message.has_any(intent_router.REMINDER_WORDS)
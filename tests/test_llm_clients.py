@@ -0,0 +1,30 @@
+import asyncio
+
+from assistant import llm_clients
+
+
+def test_sync_client_is_shared_per_key():
+    client = llm_clients.get_openai_client("key-a")
+    assert llm_clients.get_openai_client("key-a") is client
+    assert llm_clients.get_openai_client("key-b") is not client
+    assert str(client.base_url) == llm_clients.GEMINI_BASE_URL
+
+
+def test_async_client_is_shared_within_a_loop_only():
+    async def twice():
+        return llm_clients.get_async_openai_client("key-a"), llm_clients.get_async_openai_client("key-a")
+
+    first, again = asyncio.run(twice())
+    assert first is again
+    other_loop, _ = asyncio.run(twice())
+    assert other_loop is not first
+
+
+def test_ai_cores_share_one_client(make_core, monkeypatch, database):
+    from assistant import core
+    from assistant.core import AICore
+
+    monkeypatch.setattr(core, "get_openai_client", llm_clients.get_openai_client)
+    a = AICore(session_id="a", write_behind=False, database=database)
+    b = AICore(session_id="b", write_behind=False, database=database)
+    assert a.client is b.client
@@ -0,0 +1,150 @@
+import sqlite3
+import time
+
+import pytest
+
+from assistant.database import Database
+from assistant.migrations import LATEST_VERSION, MIGRATIONS, get_schema_version, migrate
+
+
+def migrate_to(conn, version):
+    """Apply the steps up to ``version`` only, like an older release would have."""
+    conn.execute('CREATE TABLE schema_version (version INTEGER PRIMARY KEY, description TEXT, '
+                 'applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+    cursor = conn.cursor()
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            step(cursor)
+            cursor.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                           (step_version, description))
+    conn.commit()
+
+
+@pytest.fixture
+def pre_search_db(tmp_path):
+    """A version-2 database with rows written before full-text search existed."""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    migrate_to(conn, 2)
+    conn.executemany("INSERT INTO conversations (session_id, role, content) VALUES (?, 'user', ?)",
+                     [("s", f"message {i} about {'paris' if i % 10 == 0 else 'nothing'}") for i in range(250)])
+    conn.executemany("INSERT INTO notes (session_id, title, content) VALUES ('s', ?, ?)",
+                     [(f"note {i}", f"groceries {i}") for i in range(30)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def integrity_ok(db):
+    with db._write() as cursor:
+        cursor.execute("INSERT INTO conversations_fts(conversations_fts) VALUES ('integrity-check')")
+        cursor.execute("INSERT INTO notes_fts(notes_fts) VALUES ('integrity-check')")
+    return True
+
+
+def drain_backfill(db, timeout=10):
+    deadline = time.time() + timeout
+    while db.search_index_backlog() and time.time() < deadline:
+        db.backfill_search_index(batch_size=50)
+    assert db.search_index_backlog() == 0
+
+
+def test_fresh_database_is_at_latest_version(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "new.db"))
+    assert migrate(conn) == [version for version, _, _ in MIGRATIONS]
+    assert get_schema_version(conn) == LATEST_VERSION
+    conn.close()
+
+
+def test_migrate_is_idempotent(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "new.db"))
+    migrate(conn)
+    assert migrate(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == len(MIGRATIONS)
+    conn.close()
+
+
+def test_unversioned_database_keeps_its_rows(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    MIGRATIONS[0][2](conn.cursor())
+    conn.execute("INSERT INTO conversations (session_id, role, content) VALUES ('s', 'user', 'hello')")
+    conn.execute("INSERT INTO reminders (session_id, reminder_text, due_time) VALUES ('s', 'x', '2030-01-01 09:00:00')")
+    conn.commit()
+    assert migrate(conn)[-1] == LATEST_VERSION
+    assert conn.execute("SELECT content FROM conversations").fetchall() == [("hello",)]
+    assert conn.execute("SELECT due_at FROM reminders").fetchone()[0] is not None
+    conn.close()
+
+
+def test_failed_step_leaves_the_database_untouched(tmp_path, monkeypatch):
+    def broken(cursor):
+        cursor.execute("CREATE TABLE half_done (x)")
+        raise sqlite3.OperationalError("boom")
+
+    monkeypatch.setattr("assistant.migrations.MIGRATIONS", MIGRATIONS + [(LATEST_VERSION + 1, "broken", broken)])
+    monkeypatch.setattr("assistant.migrations.LATEST_VERSION", LATEST_VERSION + 1)
+    conn = sqlite3.connect(str(tmp_path / "new.db"))
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+    assert get_schema_version(conn) == 0
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
+
+
+def test_search_migration_leaves_existing_rows_to_the_backfill(pre_search_db):
+    conn = sqlite3.connect(pre_search_db)
+    migrate(conn)
+    assert conn.execute("SELECT COUNT(*) FROM conversations_fts WHERE conversations_fts MATCH 'paris'").fetchone()[0] == 0
+    assert dict(conn.execute("SELECT table_name, target FROM search_index_backfill").fetchall()) == {
+        "conversations": 250, "notes": 30}
+    conn.close()
+
+
+def test_backfill_indexes_old_rows_in_batches(pre_search_db):
+    db = Database(pre_search_db)
+    try:
+        drain_backfill(db)
+        assert len(db.search_conversations("s", "paris", limit=100)) == 25
+        assert len(db.search_notes("s", "groceries", limit=100)) == 30
+        assert integrity_ok(db)
+    finally:
+        db.close()
+
+
+def test_changes_to_rows_awaiting_backfill_keep_the_index_consistent(pre_search_db, monkeypatch):
+    # This test drives the backfill itself
+    monkeypatch.setattr(Database, "_run_search_index_backfill", lambda self: None)
+    db = Database(pre_search_db)
+    try:
+        assert db.search_index_backlog() == 280
+        with db._write() as cursor:
+            cursor.execute("DELETE FROM conversations WHERE content = 'message 10 about paris'")
+            cursor.execute("UPDATE notes SET content = 'renamed' WHERE id = 5")
+        db.save_conversation("s", "user", "new paris trip")
+        drain_backfill(db)
+        assert integrity_ok(db)
+        # 25 old mentions, one deleted, one new
+        assert len(db.search_conversations("s", "paris", limit=100)) == 25
+        assert [r["id"] for r in db.search_notes("s", "renamed")] == [5]
+    finally:
+        db.close()
+
+
+def test_summaries_from_version_6_gain_last_turn(tmp_path):
+    path = str(tmp_path / "v6.db")
+    conn = sqlite3.connect(path)
+    migrate_to(conn, 6)
+    conn.execute("INSERT INTO conversation_summaries (session_id, summary, last_message_hash) VALUES ('s', 'old', 'abc')")
+    conn.commit()
+    assert migrate(conn) == [7]
+    assert migrate(conn) == []
+    conn.close()
+
+    db = Database(path)
+    try:
+        assert db.get_conversation_summary("s")["last_turn"] is None
+        db.save_conversation_summary("s", "new", 12, 3)
+        assert db.get_conversation_summary("s")["last_turn"] == 12
+    finally:
+        db.close()
@@ -0,0 +1,57 @@
+from unittest import mock
+
+import pytest
+
+from assistant.plugin_metrics import PluginStatsAccumulator
+
+
+@pytest.fixture
+def accumulator(database):
+    acc = PluginStatsAccumulator(database, flush_interval=3600)
+    yield acc
+    acc.close()
+
+
+def executions(database):
+    return {(row["plugin_name"]): row["total_executions"] for row in database.get_plugin_stats()["plugins"]}
+
+
+def test_record_only_counts_in_memory(database, accumulator):
+    with mock.patch.object(database, "add_plugin_stats") as write:
+        accumulator.record("weather", "s1")
+        accumulator.record("weather", "s1")
+        write.assert_not_called()
+    assert accumulator.pending() == {("weather", "s1"): 2}
+
+
+def test_flush_upserts_aggregated_deltas(database, accumulator):
+    for _ in range(3):
+        accumulator.record("weather", "s1")
+    accumulator.record("weather", "s2")
+    accumulator.flush()
+    accumulator.record("weather", "s1")
+    accumulator.flush()
+    assert executions(database) == {"weather": 5}
+    assert accumulator.pending() == {}
+
+
+def test_stats_read_flushes_pending_counts(database, accumulator):
+    accumulator.record("news", "s1")
+    assert executions(database) == {"news": 1}
+
+
+def test_failed_flush_keeps_counts_for_retry(database, accumulator):
+    accumulator.record("news", "s1")
+    with mock.patch.object(database, "add_plugin_stats", side_effect=RuntimeError("locked")):
+        with pytest.raises(RuntimeError):
+            accumulator.flush()
+    accumulator.record("news", "s1")
+    assert accumulator.pending() == {("news", "s1"): 2}
+    accumulator.flush()
+    assert executions(database) == {"news": 2}
+
+
+def test_update_plugin_stats_writes_one_use(database):
+    database.update_plugin_stats("calculator", "s1")
+    database.update_plugin_stats("calculator", "s1")
+    assert executions(database) == {"calculator": 2}
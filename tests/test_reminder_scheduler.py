@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from assistant.database import Database
+from assistant.reminder_scheduler import ReminderScheduler, due_timestamp, get_reminder_scheduler
+
+
+class Inbox:
+    def __init__(self):
+        self.fired = []
+        self.event = threading.Event()
+
+    def __call__(self, reminder):
+        self.fired.append(reminder['reminder_text'])
+        self.event.set()
+
+    def wait(self, timeout=3.0):
+        fired = self.event.wait(timeout)
+        self.event.clear()
+        return fired
+
+
+@pytest.fixture
+def scheduler(database):
+    sched = ReminderScheduler(database)
+    sched.start()
+    yield sched
+    sched.stop()
+
+
+def is_completed(database, reminder_id):
+    with database._read() as cursor:
+        return cursor.execute("SELECT completed FROM reminders WHERE id = ?", (reminder_id,)).fetchone()[0] == 1
+
+
+def test_due_timestamp_formats():
+    assert due_timestamp("2030-01-02 03:04:05") == datetime(2030, 1, 2, 3, 4, 5).timestamp()
+    assert due_timestamp(datetime(2030, 1, 2)) == datetime(2030, 1, 2).timestamp()
+    assert due_timestamp("not a date") is None
+    assert due_timestamp(None) is None
+
+
+def test_overdue_reminder_fires_on_subscribe_and_completes(database, scheduler):
+    reminder_id = database.save_reminder("s1", "stretch", datetime.now() - timedelta(minutes=1))
+    inbox = Inbox()
+    scheduler.subscribe("s1", inbox)
+    assert inbox.wait()
+    assert inbox.fired == ["stretch"]
+    deadline = time.time() + 3
+    while not is_completed(database, reminder_id) and time.time() < deadline:
+        time.sleep(0.02)
+    assert is_completed(database, reminder_id)
+
+
+def test_added_reminder_wakes_the_sleeping_worker(database, scheduler):
+    inbox = Inbox()
+    scheduler.subscribe("s1", inbox)
+    database.save_reminder("s1", "later", datetime.now() + timedelta(hours=1))
+    database.save_reminder("s1", "now", datetime.now() - timedelta(seconds=1))
+    assert inbox.wait()
+    assert inbox.fired == ["now"]
+    assert scheduler.pending_count() == 1
+
+
+def test_completed_reminder_is_cancelled(database, scheduler):
+    inbox = Inbox()
+    scheduler.subscribe("s1", inbox)
+    reminder_id = database.save_reminder("s1", "cancelled", datetime.now() + timedelta(seconds=1))
+    database.mark_reminder_completed(reminder_id)
+    assert not inbox.wait(timeout=2.0)
+    assert inbox.fired == []
+
+
+def test_reminders_go_only_to_their_session(database, scheduler):
+    first, second = Inbox(), Inbox()
+    scheduler.subscribe("s1", first)
+    scheduler.subscribe("s2", second)
+    database.save_reminder("s2", "for two", datetime.now() - timedelta(seconds=1))
+    assert second.wait()
+    assert first.fired == [] and second.fired == ["for two"]
+
+
+def test_unsubscribed_session_gets_its_reminder_on_return(database, scheduler):
+    inbox = Inbox()
+    scheduler.subscribe("s1", inbox)
+    scheduler.unsubscribe("s1", inbox)
+    reminder_id = database.save_reminder("s1", "while away", datetime.now() - timedelta(seconds=1))
+    assert not inbox.wait(timeout=0.5)
+    assert not is_completed(database, reminder_id)
+    scheduler.subscribe("s1", inbox)
+    assert inbox.wait()
+    assert inbox.fired == ["while away"]
+
+
+def test_one_started_scheduler_per_database_file(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = Database(path), Database(path)
+    scheduler = get_reminder_scheduler(first)
+    try:
+        assert get_reminder_scheduler(second) is scheduler
+        assert scheduler._thread is not None and scheduler._thread.is_alive()
+        inbox = Inbox()
+        scheduler.subscribe("s1", inbox)
+        # A reminder saved through another Database on the same file still reaches it
+        second.save_reminder("s1", "shared", datetime.now() - timedelta(seconds=1))
+        assert inbox.wait()
+    finally:
+        scheduler.stop()
+        first.close()
+        second.close()
@@ -0,0 +1,57 @@
+from assistant.response_cache import ResponseCache, is_cacheable_prompt
+
+from conftest import EchoPlugin, FakeLLM, tool_call
+
+
+def test_time_sensitive_prompts_are_not_cacheable():
+    assert is_cacheable_prompt("explain recursion")
+    assert not is_cacheable_prompt("what's the weather today")
+    assert not is_cacheable_prompt("remind me at 5pm")
+    assert not is_cacheable_prompt("   ")
+
+
+def test_key_normalises_the_prompt_but_not_the_context():
+    key = ResponseCache.make_key("m", "sys", [], [], "Explain recursion?")
+    assert key == ResponseCache.make_key("m", "sys", [], [], "  explain   RECURSION ")
+    history = [{"role": "user", "content": "hi"}]
+    assert key != ResponseCache.make_key("m", "sys", history, [], "Explain recursion?")
+
+
+def test_same_prompt_in_same_context_is_answered_from_cache(database, make_core):
+    llm = FakeLLM("Recursion is a function calling itself")
+    first = make_core(llm, session_id="a", LLM_RESPONSE_CACHE=True)
+    second = make_core(llm, session_id="b", LLM_RESPONSE_CACHE=True)
+
+    assert first.process_command("explain recursion") == "Recursion is a function calling itself"
+    assert second.process_command("Explain recursion?") == "Recursion is a function calling itself"
+    assert len(llm.requests) == 1
+    assert database.get_conversation_history("b")[-1]["content"] == "Recursion is a function calling itself"
+
+
+def test_streamed_replies_share_the_cache(make_core):
+    llm = FakeLLM("a streamed answer")
+    make_core(llm, session_id="a", LLM_RESPONSE_CACHE=True).process_command("define entropy")
+    second = make_core(llm, session_id="b", LLM_RESPONSE_CACHE=True)
+    assert list(second.process_command_stream("define entropy")) == ["a streamed answer"]
+    assert len(llm.requests) == 1
+
+
+def test_time_sensitive_prompts_always_reach_the_model(make_core):
+    llm = FakeLLM("It is late", "It is later")
+    make_core(llm, session_id="a", LLM_RESPONSE_CACHE=True).process_command("what happens now")
+    make_core(llm, session_id="b", LLM_RESPONSE_CACHE=True).process_command("what happens now")
+    assert len(llm.requests) == 2
+
+
+def test_replies_built_from_tool_output_are_not_cached(make_core):
+    echo = EchoPlugin(user_ready=True)
+    llm = FakeLLM([tool_call("echo", {"text": "x"})], [tool_call("echo", {"text": "x"})])
+    make_core(llm, plugins=[echo], session_id="a", LLM_RESPONSE_CACHE=True).process_command("echo x")
+    make_core(llm, plugins=[echo], session_id="b", LLM_RESPONSE_CACHE=True).process_command("echo x")
+    assert len(echo.calls) == 2
+
+
+def test_cache_is_off_by_default(make_core):
+    llm = FakeLLM("one", "two")
+    make_core(llm, session_id="a").process_command("define entropy")
+    assert make_core(llm, session_id="b").process_command("define entropy") == "two"
@@ -0,0 +1,76 @@
+from assistant import result_cache
+from assistant.plugin_registry import PluginRegistry
+from assistant.result_cache import ResultCache, make_cache_key
+
+from conftest import EchoPlugin
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_keys_ignore_case_whitespace_and_unset_arguments():
+    assert make_cache_key("weather", {"city": " London "}) == make_cache_key("weather", {"city": "LONDON", "units": None})
+    assert make_cache_key("weather", {"city": "London"}) != make_cache_key("news", {"city": "London"})
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, "time", clock.time)
+    cache = ResultCache()
+    cache.put("k", "sunny", ttl=60)
+    clock.now += 59
+    assert cache.get("k") == "sunny"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", "1", ttl=60)
+    cache.put("b", "2", ttl=60)
+    cache.get("a")
+    cache.put("c", "3", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persistent_cache_survives_a_new_instance(database):
+    ResultCache(database=database).put("k", "stored", ttl=60, plugin_name="weather")
+    fresh = ResultCache(database=database)
+    assert fresh.get("k") == "stored"
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_registry_only_caches_plugins_that_opt_in(database):
+    registry = PluginRegistry(database, result_cache=ResultCache())
+    cached, uncached = EchoPlugin("cached", ttl=60), EchoPlugin("uncached")
+    registry.register(cached)
+    registry.register(uncached)
+
+    for _ in range(3):
+        registry.execute_plugin("cached", text="London")
+        registry.execute_plugin("uncached", text="London")
+    registry.execute_plugin("cached", text=" london ")
+
+    assert len(cached.calls) == 1
+    assert len(uncached.calls) == 3
+
+
+def test_results_the_plugin_rejects_are_not_cached(database):
+    class Flaky(EchoPlugin):
+        def should_cache_result(self, result):
+            return False
+
+    registry = PluginRegistry(database, result_cache=ResultCache())
+    plugin = Flaky("flaky", ttl=60)
+    registry.register(plugin)
+    registry.execute_plugin("flaky", text="x")
+    registry.execute_plugin("flaky", text="x")
+    assert len(plugin.calls) == 2
@@ -0,0 +1,74 @@
+from assistant.retention import RetentionWorker
+
+
+def age_conversations(database, days, session_id="old"):
+    with database._write() as cursor:
+        cursor.execute(
+            "UPDATE conversations SET created_at = datetime('now', ?) WHERE session_id = ?",
+            (f"-{days} days", session_id)
+        )
+
+
+def session_count(database, session_id):
+    with database._read() as cursor:
+        return cursor.execute(
+            "SELECT COUNT(*) FROM conversations WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+
+def test_deletes_only_expired_rows_in_batches(database):
+    database.save_conversations([("old", "user", f"m{i}", None, 0) for i in range(25)])
+    database.save_conversations([("new", "user", f"m{i}", None, 0) for i in range(5)])
+    age_conversations(database, 40)
+
+    progress = []
+    worker = RetentionWorker(database, days_to_keep=30, batch_size=10, pause=0,
+                             progress_callback=progress.append)
+    result = worker.run_once()
+
+    assert result["deleted"] == 25
+    assert result["batches"] == 3
+    assert result["done"]
+    assert [p["deleted"] for p in progress[:3]] == [10, 20, 25]
+    assert session_count(database, "old") == 0
+    assert session_count(database, "new") == 5
+
+
+def test_nothing_to_expire(database):
+    database.save_conversation("new", "user", "hello")
+    result = RetentionWorker(database, days_to_keep=30).run_once()
+    assert result["deleted"] == 0
+    assert result["batches"] == 0
+    assert session_count(database, "new") == 1
+
+
+def test_stopped_worker_reports_incomplete_run(database):
+    database.save_conversations([("old", "user", f"m{i}", None, 0) for i in range(10)])
+    age_conversations(database, 40)
+    worker = RetentionWorker(database, days_to_keep=30, batch_size=2, pause=0,
+                             progress_callback=lambda progress: worker.stop())
+    result = worker.run_once()
+    assert result["deleted"] == 2
+    assert not result["done"]
+
+
+def test_new_files_use_incremental_vacuum(database):
+    assert database.get_auto_vacuum_mode() == 2
+
+
+def test_callback_errors_do_not_stop_the_run(database):
+    database.save_conversations([("old", "user", f"m{i}", None, 0) for i in range(4)])
+    age_conversations(database, 40)
+
+    def explode(progress):
+        raise RuntimeError("boom")
+
+    result = RetentionWorker(database, days_to_keep=30, batch_size=2, pause=0,
+                             progress_callback=explode).run_once()
+    assert result["deleted"] == 4
+
+
+def test_cleanup_old_conversations_returns_deleted_count(database):
+    database.save_conversations([("old", "user", f"m{i}", None, 0) for i in range(3)])
+    age_conversations(database, 40)
+    assert database.cleanup_old_conversations(days_to_keep=30) == 3
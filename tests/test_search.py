@@ -0,0 +1,78 @@
+from assistant.database import build_fts_query
+
+
+def test_build_fts_query_quotes_words_and_prefixes_the_last():
+    assert build_fts_query("buy milk") == '"buy" "milk"*'
+    assert build_fts_query("buy milk", prefix=False) == '"buy" "milk"'
+
+
+def test_build_fts_query_neutralises_operators():
+    assert build_fts_query('NOT "x" OR y*') == '"NOT" "x" "OR" "y"*'
+    assert build_fts_query("  --  ") == ""
+    assert build_fts_query(None) == ""
+
+
+def test_build_fts_query_scopes_to_a_column():
+    assert build_fts_query("abc", "session_id", prefix=False) == 'session_id : ("abc")'
+
+
+def test_search_notes_ranks_title_matches_first(database):
+    database.save_note("s", "a long body that mentions groceries once", title="Errands")
+    database.save_note("s", "eggs, bread", title="Groceries")
+    results = database.search_notes("s", "groceries")
+    assert [r["title"] for r in results] == ["Groceries", "Errands"]
+    assert "[groceries]" in results[1]["snippet"].lower()
+
+
+def test_search_notes_prefix_matches_as_you_type(database):
+    database.save_note("s", "dentist appointment on friday", title="Health")
+    assert [r["title"] for r in database.search_notes("s", "denti")] == ["Health"]
+
+
+def test_search_is_scoped_to_the_session(database):
+    database.save_note("mine", "project kickoff notes", title="Kickoff")
+    database.save_note("theirs", "project retro notes", title="Retro")
+    assert [r["title"] for r in database.search_notes("mine", "project")] == ["Kickoff"]
+    assert len(database.search_notes(None, "project")) == 2
+
+
+def test_sessions_sharing_a_token_stay_apart(database):
+    database.save_note("work", "budget review", title="Mine")
+    database.save_note("alice-work", "budget draft", title="Theirs")
+    database.save_conversation("a", "user", "standup at nine")
+    database.save_conversation("team-a", "user", "standup moved")
+    assert [r["title"] for r in database.search_notes("work", "budget")] == ["Mine"]
+    assert [r["session_id"] for r in database.search_conversations("a", "standup")] == ["a"]
+    # The session id is not searchable text either
+    assert database.search_notes(None, "alice") == []
+
+
+def test_search_conversations_sees_updates_and_deletes(database):
+    database.save_conversation("s", "user", "what is the weather in Paris")
+    database.save_conversation("s", "assistant", "It is sunny in Paris")
+    database.save_conversation("other", "user", "Paris trip ideas")
+
+    results = database.search_conversations("s", "paris")
+    assert {r["role"] for r in results} == {"user", "assistant"}
+
+    with database._write() as cursor:
+        cursor.execute("UPDATE conversations SET content = 'rainy in Rome' WHERE role = 'assistant'")
+    assert [r["role"] for r in database.search_conversations("s", "paris")] == ["user"]
+    assert [r["role"] for r in database.search_conversations("s", "rome")] == ["assistant"]
+
+    with database._write() as cursor:
+        cursor.execute("DELETE FROM conversations WHERE session_id = 's'")
+    assert database.search_conversations("s", "paris") == []
+    assert len(database.search_conversations(None, "paris")) == 1
+
+
+def test_empty_query_returns_nothing(database):
+    database.save_note("s", "anything", title="x")
+    assert database.search_notes("s", "?!") == []
+    assert database.search_conversations("s", "") == []
+
+
+def test_deleted_notes_leave_the_index(database):
+    note_id = database.save_note("s", "temporary thought", title="Temp")
+    database.delete_note(note_id)
+    assert database.search_notes("s", "temporary") == []
@@ -0,0 +1,70 @@
+import hashlib
+import os
+
+import pytest
+
+import app
+from assistant.core import AICore
+
+
+@pytest.fixture(scope="module")
+def module_dir(tmp_path_factory):
+    # PersonalAssistant opens ./assistant.db; one directory per module keeps
+    # every per-path singleton (schema check, scheduler) on the same file.
+    path = tmp_path_factory.mktemp("cwd")
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture
+def workdir(module_dir, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    config = module_dir / "user_config.json"
+    if config.exists():
+        config.unlink()
+    app.get_user_identifier.cache_clear()
+    yield module_dir
+    app.get_user_identifier.cache_clear()
+
+
+def close(assistant):
+    assistant.reminder_scheduler.unsubscribe(assistant.ai_core.session_id, assistant._deliver_reminder)
+
+
+def test_explicit_session_id_never_touches_user_config(workdir):
+    assistant = app.PersonalAssistant(session_id="api-session-1")
+    try:
+        assert assistant.ai_core.session_id == "api-session-1"
+        assert assistant.skills.session_id == "api-session-1"
+        assert not os.path.exists(workdir / "user_config.json")
+    finally:
+        close(assistant)
+
+
+def test_user_identifier_derives_the_session(workdir):
+    assistant = app.PersonalAssistant(user_identifier="alice@example.com")
+    try:
+        assert assistant.ai_core.session_id == hashlib.md5(b"alice@example.com").hexdigest()[:16]
+        assert not os.path.exists(workdir / "user_config.json")
+    finally:
+        close(assistant)
+
+
+def test_machine_identity_is_read_once_per_process(workdir, monkeypatch):
+    first = app.get_user_identifier()
+    assert os.path.exists(workdir / "user_config.json")
+    os.remove(workdir / "user_config.json")
+    assert app.get_user_identifier() == first
+    assert not os.path.exists(workdir / "user_config.json")
+
+
+def test_sessions_keep_separate_histories(database, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    a = AICore(session_id="a", database=database, write_behind=False)
+    b = AICore(session_id="b", database=database, write_behind=False)
+    a.process_command("hello from a")
+    assert [m["content"] for m in database.get_conversation_history("a")][0] == "hello from a"
+    assert database.get_conversation_history("b") == []
+    assert b.conversation_history == []
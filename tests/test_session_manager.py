@@ -0,0 +1,180 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from assistant import core
+from assistant.session_manager import SessionManager
+
+
+def test_sessions_are_reused(make_manager):
+    manager = make_manager()
+    assert manager.get("a") is manager.get("a")
+    assert manager.stats()["hits"] == 1 and manager.stats()["misses"] == 1
+
+
+def test_building_a_session_does_not_block_other_sessions(make_manager, monkeypatch):
+    manager = make_manager()
+    manager.get("warm")
+    building, release = threading.Event(), threading.Event()
+    original = SessionManager._create_core
+
+    def slow_create(self, session_id):
+        if session_id == "slow":
+            building.set()
+            release.wait(5)
+        return original(self, session_id)
+
+    monkeypatch.setattr(SessionManager, "_create_core", slow_create)
+    with ThreadPoolExecutor(1) as pool:
+        slow = pool.submit(manager.get, "slow")
+        assert building.wait(5)
+        started = time.perf_counter()
+        manager.get("warm")
+        manager.get("other")
+        assert time.perf_counter() - started < 1
+        release.set()
+        assert slow.result(5).session_id == "slow"
+
+
+def test_concurrent_misses_share_one_session(make_manager, monkeypatch):
+    manager = make_manager()
+    barrier = threading.Barrier(4)
+    original = SessionManager._create_core
+
+    def racing_create(self, session_id):
+        core = original(self, session_id)
+        barrier.wait(5)
+        return core
+
+    monkeypatch.setattr(SessionManager, "_create_core", racing_create)
+    with ThreadPoolExecutor(4) as pool:
+        sessions = list(pool.map(lambda _: manager.get("same"), range(4)))
+
+    assert all(s is sessions[0] for s in sessions)
+    assert len(manager) == 1
+    assert manager.reminder_scheduler._subscribers["same"] == [sessions[0].deliver_reminder]
+
+
+def test_least_recently_used_sessions_are_evicted(make_manager):
+    manager = make_manager(max_sessions=2)
+    manager.get("a")
+    manager.get("b")
+    manager.get("a")
+    manager.get("c")
+    assert sorted(manager._sessions) == ["a", "c"]
+    assert manager.stats()["lru_evictions"] == 1
+
+
+def test_idle_sessions_are_swept(make_manager, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("assistant.session_manager.time.time", lambda: clock[0])
+    manager = make_manager(idle_timeout=60)
+    manager.get("old")
+    clock[0] += 30
+    manager.get("recent")
+    clock[0] += 40
+    manager.get("recent")
+    assert sorted(manager._sessions) == ["recent"]
+    assert manager.stats()["idle_evictions"] == 1
+
+
+def test_evicted_session_is_rehydrated_from_the_database(make_manager, database):
+    manager = make_manager(max_sessions=1)
+    manager.get("a").ai_core.process_command("hello")
+    manager.get("b")
+    assert "a" not in manager._sessions
+
+    history = manager.get("a").ai_core.conversation_history
+    assert [m["content"] for m in history][:1] == ["hello"]
+    assert manager.stats()["rehydrated"] == 1
+
+
+def test_reminders_fired_for_an_evicted_session_are_kept(make_manager):
+    manager = make_manager(max_sessions=1)
+    manager.get("a").deliver_reminder({"reminder_text": "stretch"})
+    manager.get("b")
+    assert "a" not in manager._sessions
+    assert manager.drain_reminders("a") == ["stretch"]
+    assert manager.drain_reminders("a") == []
+
+
+def test_undelivered_reminders_move_into_the_rebuilt_session(make_manager):
+    manager = make_manager(max_sessions=1)
+    manager.get("a").deliver_reminder({"reminder_text": "stretch"})
+    manager.get("b")
+    assert list(manager.get("a").reminders) == ["stretch"]
+
+
+def test_stats_report_size_and_hit_rate(make_manager):
+    manager = make_manager(max_sessions=5)
+    for session_id in ["a", "b", "a", "a"]:
+        manager.get(session_id)
+    stats = manager.stats()
+    assert stats["sessions"] == 2 and stats["max_sessions"] == 5
+    assert stats["hit_rate"] == 0.5
+
+
+def test_pinned_and_busy_sessions_are_not_evicted(make_manager):
+    manager = make_manager(max_sessions=1)
+    pinned = manager.get("pinned", pin=True)
+    manager.get("b")
+    assert "pinned" in manager._sessions
+
+    manager.unpin(pinned)
+    with manager.get("b").gate.admit():
+        manager.get("c")
+        assert "b" in manager._sessions
+    manager.get("d")
+    assert sorted(manager._sessions) == ["d"]
+
+
+def test_pinned_sessions_survive_the_idle_sweep(make_manager, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("assistant.session_manager.time.time", lambda: clock[0])
+    manager = make_manager(idle_timeout=60)
+    session = manager.get("long", pin=True)
+    clock[0] += 120
+    manager.get("other")
+    assert manager._sessions["long"] is session
+
+    manager.unpin(session)
+    clock[0] += 120
+    manager.get("other")
+    assert "long" not in manager._sessions
+
+
+def test_serve_keeps_the_session_until_the_command_is_done(make_manager, monkeypatch):
+    manager = make_manager(max_sessions=1)
+    waiting, release = threading.Event(), threading.Event()
+    original = manager.admission.admit
+
+    def slow_admit():
+        # Holds the command between get() and admission while "b" arrives
+        waiting.set()
+        release.wait(5)
+        return original()
+
+    monkeypatch.setattr(manager.admission, "admit", slow_admit)
+
+    def command():
+        with manager.serve("a") as session:
+            return session
+
+    with ThreadPoolExecutor(1) as pool:
+        served = pool.submit(command)
+        assert waiting.wait(5)
+        manager.get("b")
+        assert "a" in manager._sessions
+        release.set()
+        session = served.result(5)
+    assert session is manager._sessions["a"] and session.pins == 0
+
+
+def test_environment_is_loaded_once_not_per_session(make_manager, monkeypatch):
+    loads = []
+    monkeypatch.setattr(core, "load_dotenv", lambda: loads.append(True))
+    monkeypatch.setattr(core, "_environment_loaded", False)
+    manager = make_manager()
+    for session_id in ["a", "b", "c"]:
+        manager.get(session_id)
+    assert loads == [True]
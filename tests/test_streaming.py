@@ -0,0 +1,115 @@
+from conftest import EchoPlugin, FakeLLM, tool_call
+
+
+def saved_replies(database, session_id="s"):
+    return [(m["role"], m["content"]) for m in database.get_conversation_history(session_id)]
+
+
+def test_reply_is_streamed_in_pieces_and_saved_whole(database, make_core):
+    llm = FakeLLM("Hello there, how can I help")
+    ai = make_core(llm)
+
+    pieces = list(ai.process_command_stream("hi"))
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == "Hello there, how can I help"
+    assert llm.requests[0]["stream"] is True
+    assert ai.last_ttft is not None
+    assert saved_replies(database) == [("user", "hi"), ("assistant", "Hello there, how can I help")]
+
+
+def test_nothing_is_saved_until_the_stream_is_exhausted(database, make_core):
+    ai = make_core(FakeLLM("one two three"))
+    stream = ai.process_command_stream("count")
+    next(stream)
+    assert saved_replies(database) == [("user", "count")]
+    list(stream)
+    assert saved_replies(database)[-1] == ("assistant", "one two three")
+
+
+def test_closing_the_stream_early_saves_the_partial_reply(database, make_core):
+    llm = FakeLLM("one two three four")
+    ai = make_core(llm)
+    stream = ai.process_command_stream("count")
+    assert [next(stream), next(stream)] == ["one", " two"]
+    stream.close()
+
+    assert llm.open_streams == 0
+    assert saved_replies(database) == [("user", "count"), ("assistant", "one two")]
+    assert [m["content"] for m in ai.conversation_history] == ["count", "one two"]
+
+
+def test_streamed_tool_call_fragments_are_reassembled(database, make_core):
+    echo = EchoPlugin()
+    llm = FakeLLM([tool_call("echo", {"text": "ping"})], "The echo said ping")
+    ai = make_core(llm, plugins=[echo], DIRECT_TOOL_REPLIES=False)
+
+    reply = "".join(ai.process_command_stream("echo ping"))
+
+    assert echo.calls == [{"text": "ping"}]
+    assert reply == "The echo said ping"
+    tool_message = llm.requests[1]["messages"][-1]
+    assert tool_message == {"role": "tool", "tool_call_id": "call_echo", "content": "echo: ping"}
+    assert llm.requests[1]["stream"] is True
+
+
+def test_local_replies_are_yielded_whole(database, make_core):
+    llm = FakeLLM()
+    ai = make_core(llm)
+    assert list(ai.process_command_stream("remind me to stretch in 2 hours")) == ["Reminder system not available."]
+    assert llm.requests == []
+
+
+def test_model_error_before_any_piece_falls_back(database, make_core):
+    ai = make_core(FakeLLM(RuntimeError("unavailable")))
+    pieces = list(ai.process_command_stream("hello"))
+    assert len(pieces) == 1 and pieces[0]
+
+
+async def collect(stream):
+    return [piece async for piece in stream]
+
+
+def test_async_stream_matches_the_sync_one(database, make_core):
+    import asyncio
+
+    llm = FakeLLM("Hello there, how can I help")
+    ai = make_core(llm)
+    pieces = asyncio.run(collect(ai.process_command_stream_async("hi")))
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == "Hello there, how can I help"
+    assert ai.last_ttft is not None
+    assert llm.open_streams == 0
+    assert saved_replies(database) == [("user", "hi"), ("assistant", "Hello there, how can I help")]
+
+
+def test_async_stream_reassembles_tool_calls(database, make_core):
+    import asyncio
+
+    echo = EchoPlugin()
+    llm = FakeLLM([tool_call("echo", {"text": "ping"})], "The echo said ping")
+    ai = make_core(llm, plugins=[echo], DIRECT_TOOL_REPLIES=False)
+
+    assert "".join(asyncio.run(collect(ai.process_command_stream_async("echo ping")))) == "The echo said ping"
+    assert echo.calls == [{"text": "ping"}]
+    assert llm.requests[1]["messages"][-1]["content"] == "echo: ping"
+    assert llm.open_streams == 0
+
+
+def test_closing_the_async_stream_early_closes_the_model_stream(database, make_core):
+    import asyncio
+
+    llm = FakeLLM("one two three four")
+    ai = make_core(llm)
+
+    async def first_piece():
+        stream = ai.process_command_stream_async("count")
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    assert asyncio.run(first_piece()) == "one"
+    assert llm.open_streams == 0
+    assert saved_replies(database) == [("user", "count"), ("assistant", "one")]
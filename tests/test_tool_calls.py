@@ -0,0 +1,86 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from assistant import core
+
+from conftest import EchoPlugin, FakeLLM, tool_call
+
+
+class FailingPlugin(EchoPlugin):
+    def execute(self, **kwargs):
+        raise RuntimeError("broken")
+
+
+def tool_results(llm):
+    return [m["content"] for m in llm.requests[-1]["messages"] if m["role"] == "tool"]
+
+
+def test_tool_calls_of_one_turn_run_concurrently_in_call_order(make_core):
+    slow, fast = EchoPlugin("slow", delay=0.3), EchoPlugin("fast", delay=0.3)
+    llm = FakeLLM([tool_call("slow", {"text": "a"}), tool_call("fast", {"text": "b"})], "done")
+    ai = make_core(llm, plugins=[slow, fast], DIRECT_TOOL_REPLIES=False)
+
+    started = time.perf_counter()
+    assert ai.process_command("do both") == "done"
+    assert time.perf_counter() - started < 0.55
+    assert tool_results(llm) == ["slow: a", "fast: b"]
+
+
+def test_slow_tool_times_out_without_holding_up_the_others(make_core):
+    stuck, quick = EchoPlugin("stuck", delay=1.0), EchoPlugin("quick")
+    llm = FakeLLM([tool_call("stuck"), tool_call("quick", {"text": "x"})], "partial")
+    ai = make_core(llm, plugins=[stuck, quick], DIRECT_TOOL_REPLIES=False, TOOL_CALL_TIMEOUT=0.2)
+
+    started = time.perf_counter()
+    ai.process_command("try both")
+    assert time.perf_counter() - started < 0.8
+    assert tool_results(llm) == ["Plugin 'stuck' timed out after 0.2 seconds but is still running and may yet finish", "quick: x"]
+
+
+def test_plugin_errors_become_tool_results(make_core):
+    llm = FakeLLM([tool_call("broken")], "sorry")
+    ai = make_core(llm, plugins=[FailingPlugin("broken")], DIRECT_TOOL_REPLIES=False)
+    ai.process_command("break it")
+    assert tool_results(llm) == ["Error executing plugin 'broken': broken"]
+
+
+def test_async_path_runs_tool_calls_concurrently_too(make_core):
+    slow, fast = EchoPlugin("slow", delay=0.3), EchoPlugin("fast", delay=0.3)
+    stuck = EchoPlugin("stuck", delay=1.0)
+    llm = FakeLLM([tool_call("slow", {"text": "a"}), tool_call("fast", {"text": "b"}), tool_call("stuck")], "done")
+    ai = make_core(llm, plugins=[slow, fast, stuck], DIRECT_TOOL_REPLIES=False, TOOL_CALL_TIMEOUT=0.5)
+
+    started = time.perf_counter()
+    assert asyncio.run(ai.process_command_async("do all")) == "done"
+    assert time.perf_counter() - started < 0.9
+    assert tool_results(llm) == ["slow: a", "fast: b", "Plugin 'stuck' timed out after 0.5 seconds but is still running and may yet finish"]
+
+
+@pytest.fixture
+def one_worker(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(core, "_tool_executor", executor)
+    yield
+    executor.shutdown(wait=True)
+
+
+@pytest.mark.parametrize("run_async", [False, True])
+def test_queued_call_that_times_out_is_never_run(make_core, one_worker, run_async):
+    stuck, queued = EchoPlugin("stuck", delay=0.4), EchoPlugin("save_note")
+    llm = FakeLLM([tool_call("stuck"), tool_call("save_note", {"text": "x"})], "done")
+    ai = make_core(llm, plugins=[stuck, queued], DIRECT_TOOL_REPLIES=False, TOOL_CALL_TIMEOUT=0.1)
+
+    if run_async:
+        asyncio.run(ai.process_command_async("both"))
+    else:
+        ai.process_command("both")
+    time.sleep(0.5)
+
+    assert queued.calls == []
+    assert tool_results(llm) == [
+        "Plugin 'stuck' timed out after 0.1 seconds but is still running and may yet finish",
+        "Plugin 'save_note' timed out after 0.1 seconds waiting for a free worker and was not run"
+    ]
@@ -0,0 +1,88 @@
+from assistant.tool_selector import ToolSelectionStats, ToolSelector, get_tool_selector, terms
+from assistant.plugin_registry import PluginRegistry
+from assistant.result_cache import ResultCache
+
+from conftest import EchoPlugin, FakeLLM
+
+
+def tool(name, description, **properties):
+    return {
+        "name": name,
+        "description": description,
+        "parameters": {"type": "object", "properties": {k: {"type": "string", "description": v} for k, v in properties.items()}}
+    }
+
+
+TOOLS = [
+    tool("get_weather", "Current weather and forecast for a city", city="city name"),
+    tool("get_news", "Latest news headlines", category="news category"),
+    tool("set_reminder", "Remind the user about a task at a time", task="what to remember", time="when"),
+    tool("take_note", "Save a note", content="note text"),
+    tool("search_web", "Search the web for information", query="search terms"),
+    tool("calculate", "Evaluate a math expression", expression="expression"),
+]
+
+
+def selector(**kwargs):
+    return ToolSelector(TOOLS, stats=ToolSelectionStats(), **kwargs)
+
+
+def test_terms_drop_stopwords_and_stem():
+    assert terms("Show me the reminders for my notes") == ["remind", "note"]
+
+
+def test_only_matching_tools_are_sent():
+    tools, report = selector(top_k=2).select("what's the weather forecast in Paris")
+    assert [t["name"] for t in tools] == ["get_weather"]
+    assert report["tokens_saved"] > 0 and not report["fallback"]
+
+
+def test_no_match_sends_every_tool():
+    tools, report = selector(top_k=2).select("hmm")
+    assert len(tools) == len(TOOLS)
+    assert report["fallback"] and report["tokens_saved"] == 0
+
+
+def test_examples_make_a_tool_findable():
+    plain = selector(top_k=2).select("jot this down")[1]
+    assert plain["fallback"]
+    tools, _ = selector(top_k=2, examples={"take_note": ["jot this down"]}).select("jot this down")
+    assert [t["name"] for t in tools] == ["take_note"]
+
+
+def test_recent_tools_are_kept_for_follow_ups():
+    tools, _ = selector(top_k=2).select("search the news", recent=["get_weather"])
+    names = [t["name"] for t in tools]
+    assert "get_weather" in names and len(names) == 2
+
+
+def test_usage_breaks_ties_but_never_selects_alone():
+    both = [tool("get_weather", "city info"), tool("get_news", "city info")] + TOOLS[2:]
+    ranked = ToolSelector(both, usage={"get_news": 50, "get_weather": 1}, top_k=1, stats=ToolSelectionStats())
+    assert [t["name"] for t in ranked.select("city info")[0]] == ["get_news"]
+    assert ranked.select("zzz")[1]["fallback"]
+
+
+def test_stats_count_savings():
+    stats = ToolSelectionStats()
+    s = ToolSelector(TOOLS, top_k=2, stats=stats)
+    s.select("weather in rome")
+    s.select("hmm")
+    report = stats.stats()
+    assert report["requests"] == 2 and report["fallbacks"] == 1
+    assert report["tokens_saved"] > 0
+
+
+def test_selector_is_shared_per_registry_until_tools_change(database):
+    registry = PluginRegistry(database, result_cache=ResultCache())
+    assert get_tool_selector(registry, TOOLS, top_k=3) is get_tool_selector(registry, TOOLS, top_k=3)
+    assert get_tool_selector(registry, TOOLS[:4], top_k=3) is not get_tool_selector(registry, TOOLS, top_k=3)
+
+
+def test_ai_core_sends_only_selected_schemas(make_core):
+    plugins = [EchoPlugin(name) for name in ("weather", "news", "notes", "search", "calc", "clock")]
+    llm = FakeLLM("sunny")
+    ai = make_core(llm, plugins=plugins, TOOL_SELECTION=True, TOOL_SELECTION_TOP_K=2)
+    ai.process_command("weather please")
+    assert [t["function"]["name"] for t in llm.requests[0]["tools"]] == ["weather"]
+    assert ai.last_tool_selection["tools"] == ["weather"]
@@ -0,0 +1,38 @@
+from conftest import EchoPlugin, FakeLLM, tool_call
+
+
+def test_user_ready_results_skip_the_second_model_call(make_core):
+    llm = FakeLLM([tool_call("clock", {"text": "3pm"})])
+    ai = make_core(llm, plugins=[EchoPlugin("clock", user_ready=True)])
+    assert ai.process_command("what time is it") == "clock: 3pm"
+    assert len(llm.requests) == 1
+
+
+def test_results_of_several_user_ready_calls_are_joined_in_order(make_core):
+    llm = FakeLLM([tool_call("clock", {"text": "3pm"}), tool_call("calc", {"text": "4"})])
+    ai = make_core(llm, plugins=[EchoPlugin("clock", user_ready=True), EchoPlugin("calc", user_ready=True)])
+    assert ai.process_command("time and 2+2") == "clock: 3pm\n\ncalc: 4"
+
+
+def test_any_raw_result_sends_the_turn_back_to_the_model(make_core):
+    llm = FakeLLM([tool_call("clock"), tool_call("search")], "summary of both")
+    ai = make_core(llm, plugins=[EchoPlugin("clock", user_ready=True), EchoPlugin("search")])
+    assert ai.process_command("time and search") == "summary of both"
+    assert len(llm.requests) == 2
+
+
+def test_setting_off_always_asks_the_model(make_core):
+    llm = FakeLLM([tool_call("clock")], "It is 3pm")
+    ai = make_core(llm, plugins=[EchoPlugin("clock", user_ready=True)], DIRECT_TOOL_REPLIES=False)
+    assert ai.process_command("what time is it") == "It is 3pm"
+    assert len(llm.requests) == 2
+
+
+def test_streamed_and_async_paths_return_user_ready_results_too(make_core):
+    import asyncio
+
+    llm = FakeLLM([tool_call("clock", {"text": "3pm"})], [tool_call("clock", {"text": "4pm"})])
+    ai = make_core(llm, plugins=[EchoPlugin("clock", user_ready=True)])
+    assert "".join(ai.process_command_stream("time please")) == "clock: 3pm"
+    assert asyncio.run(ai.process_command_async("time again")) == "clock: 4pm"
+    assert len(llm.requests) == 2
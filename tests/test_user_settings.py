@@ -0,0 +1,81 @@
+from assistant.database import Database
+
+
+def count_loads(database, monkeypatch):
+    loads = []
+    original = Database._load_user_settings
+
+    def load(self, user_id):
+        loads.append(user_id)
+        return original(self, user_id)
+
+    monkeypatch.setattr(Database, "_load_user_settings", load)
+    return loads
+
+
+def test_settings_are_cached_until_updated(database, monkeypatch):
+    loads = count_loads(database, monkeypatch)
+    assert database.get_user_settings("u")["default_city"] == "London"
+    database.get_user_settings("u")
+    assert loads == ["u"]
+
+    database.update_user_settings("u", {"default_city": "Paris"})
+    assert database.get_user_settings("u")["default_city"] == "Paris"
+
+
+def test_cached_settings_are_copies(database):
+    database.get_user_settings("u")["default_city"] = "Nowhere"
+    assert database.get_user_settings("u")["default_city"] == "London"
+
+
+def test_ttl_reloads_changes_from_other_connections(tmp_path):
+    path = str(tmp_path / "shared.db")
+    reader = Database(path, settings_ttl=0)
+    writer = Database(path)
+    try:
+        reader.get_user_settings("u")
+        with writer._write() as cursor:
+            cursor.execute("INSERT INTO user_settings (user_id, default_city) VALUES ('u', 'Oslo')")
+        assert reader.get_user_settings("u")["default_city"] == "Oslo"
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_load_racing_an_update_does_not_cache_the_stale_row(database, monkeypatch):
+    original = Database._load_user_settings
+    raced = []
+
+    def slow_load(self, user_id):
+        row = original(self, user_id)
+        if not raced:
+            # An update lands after this load read the row but before it is cached.
+            raced.append(True)
+            self.update_user_settings(user_id, {"default_city": "Paris"})
+        return row
+
+    monkeypatch.setattr(Database, "_load_user_settings", slow_load)
+    assert database.get_user_settings("u")["default_city"] == "London"
+    assert database.get_user_settings("u")["default_city"] == "Paris"
+
+
+def test_invalidating_every_user_also_blocks_stale_loads(database, monkeypatch):
+    original = Database._load_user_settings
+
+    def load(self, user_id):
+        row = original(self, user_id)
+        self.invalidate_user_settings()
+        return row
+
+    monkeypatch.setattr(Database, "_load_user_settings", load)
+    database.get_user_settings("u")
+    assert (database.db_path, "u") not in Database._settings_cache
+
+
+def test_cache_keeps_only_the_most_recently_used_users(database, monkeypatch):
+    monkeypatch.setattr(Database, "_settings_cache_size", 2)
+    loads = count_loads(database, monkeypatch)
+    for user_id in ["a", "b", "a", "c", "a", "b"]:
+        database.get_user_settings(user_id)
+    assert loads == ["a", "b", "c", "b"]
+    assert len([k for k in Database._settings_cache if k[0] == database.db_path]) == 2
@@ -0,0 +1,70 @@
+"""
+Train the local intent classifier from plugin metadata and logged conversations.
+
+Usage:
+    python train_intent_classifier.py [--db assistant.db] [--output intent_model.json]
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+
+from assistant.intent_classifier import (
+    NO_TOOL, NO_TOOL_EXAMPLES, examples_from_conversations, examples_from_plugins, train
+)
+
+
+def load_plugins():
+    """The plugins PersonalAssistant registers; no database or skills are needed for their metadata."""
+    from assistant.plugins import create_default_plugins
+    return create_default_plugins()
+
+
+def load_examples(db_path, limit=5000):
+    plugins = load_plugins()
+    examples = examples_from_plugins(plugins)
+    examples += [(text, NO_TOOL) for text in NO_TOOL_EXAMPLES]
+    if db_path and os.path.exists(db_path):
+        from assistant.database import Database
+        database = Database(db_path)
+        try:
+            examples += examples_from_conversations(database, [p.get_name() for p in plugins], limit)
+        finally:
+            database.close()
+    else:
+        print(f"No database at {db_path}; training on plugin metadata only")
+    return examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="assistant.db", help="conversation database to learn from")
+    parser.add_argument("--output", default=None, help="model file (default: Settings.INTENT_MODEL_PATH)")
+    parser.add_argument("--limit", type=int, default=5000, help="most recent logged replies to use")
+    parser.add_argument("--epochs", type=int, default=30)
+    args = parser.parse_args()
+
+    output = args.output
+    if output is None:
+        from config.settings import Settings
+        output = Settings.INTENT_MODEL_PATH
+
+    examples = load_examples(args.db, args.limit)
+    if not examples:
+        print("No training examples found")
+        sys.exit(1)
+
+    classifier = train(examples, epochs=args.epochs)
+    classifier.save(output)
+
+    counts = Counter(label for _, label in examples)
+    correct = sum(classifier.predict(text)[0] == label for text, label in examples)
+    print(f"{'label':<20}{'examples':>10}")
+    for label, count in sorted(counts.items()):
+        print(f"{label:<20}{count:>10}")
+    print(f"Trained on {len(examples)} examples, training accuracy {correct / len(examples):.1%}")
+    print(f"Saved to {output}; run evaluate_intent_classifier.py to pick INTENT_CONFIDENCE_THRESHOLD")
+
+
+if __name__ == "__main__":
+    main()